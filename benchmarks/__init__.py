@@ -0,0 +1,19 @@
+# benchmarks/__init__.py
+
+# Import the scale benchmark of the scoring pipeline from pipeline_benchmark.py
+from .pipeline_benchmark import (
+    STAGES,
+    synthetic_banknotes,
+    run_benchmarks,
+    compare_to_baseline,
+    faster_predictor,
+)
+
+# Optional: Define __all__ to explicitly declare the public API of this package.
+__all__ = [
+    "STAGES",
+    "synthetic_banknotes",
+    "run_benchmarks",
+    "compare_to_baseline",
+    "faster_predictor"
+]
@@ -0,0 +1,3 @@
+from .pipeline_benchmark import main
+
+main()
@@ -0,0 +1,302 @@
+"""
+Scale benchmark of the scoring pipeline.
+
+Generates synthetic banknote measurements modeled on
+data/raw/BankNote_Authentication.csv at sizes from 1k to 10M rows and measures
+every stage on its own: key generation, feature creation, model prediction,
+CSV parsing, cached CSV loading and a database insert against the local SQLite stand-in. Each
+stage reports its best and median wall time over a few repeats and, from a
+separate tracemalloc run, the peak memory it allocated. Results are written as
+JSON and compared to a stored baseline with a relative tolerance. The report
+also names the faster predictor at each size: the compiled forest wins on
+small batches and sklearn on large ones, which is why batch scoring uses the
+sklearn estimator and only the prediction server uses the compiled forest
+(see src/models/model_utils.load_model).
+
+Run from the project root:
+    python -m benchmarks --sizes 1000 100000
+    python -m benchmarks --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+from src.data import ConnectionPool, SnowflakeDB, local_backend, read_csv
+from src.features import BASE_COLUMNS, FeatureCreation, FeatureEngine
+from src.models import compile_forest
+from src.preprocessing import DataCleaning
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SOURCE_CSV = os.path.join(PROJECT_ROOT, "data", "raw", "BankNote_Authentication.csv")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+RESULTS_PATH = os.path.join(PROJECT_ROOT, "artifacts", "benchmarks", "latest.json")
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BENCH_TABLE = "BANK_NOTE_BENCH"
+
+
+def synthetic_banknotes(n_rows: int, seed: int = 0, source_csv: str = SOURCE_CSV) -> pd.DataFrame:
+    """
+    Draws `n_rows` synthetic banknotes with the same class balance, per-class means
+    and per-class covariance as the source CSV.
+
+    Returns:
+        pd.DataFrame: Columns VARIANCE, SKEWNESS, CURTOSIS, ENTROPY and CLASS.
+    """
+    source = pd.read_csv(source_csv)
+    source.columns = [col.upper() for col in source.columns]
+    rng = np.random.default_rng(seed)
+    classes = source["CLASS"].to_numpy()
+    labels = rng.choice(classes, size=n_rows)
+    values = np.empty((n_rows, len(BASE_COLUMNS)))
+    for label in np.unique(classes):
+        rows = labels == label
+        measurements = source.loc[source["CLASS"] == label, list(BASE_COLUMNS)].to_numpy()
+        values[rows] = rng.multivariate_normal(measurements.mean(axis=0), np.cov(measurements, rowvar=False),
+                                               size=int(rows.sum()))
+    df = pd.DataFrame(values, columns=list(BASE_COLUMNS))
+    df["CLASS"] = labels
+    return df
+
+
+def _train_reference_model(source_csv=SOURCE_CSV):
+    """Fits the production model configuration on the real data, so prediction cost is realistic."""
+    source = pd.read_csv(source_csv)
+    source.columns = [col.upper() for col in source.columns]
+    featured = FeatureCreation.main_feature_creation(source)
+    model = RandomForestClassifier(n_estimators=100, random_state=0)
+    model.fit(featured.drop(columns=["CLASS"]), featured["CLASS"])
+    return model
+
+
+class _Context:
+    """Inputs shared by the stages at one size; building them is not timed."""
+
+    def __init__(self, n_rows, work_dir, model, compiled, seed):
+        self.n_rows = n_rows
+        self.raw = synthetic_banknotes(n_rows, seed)
+        self.features = FeatureCreation.main_feature_creation(self.raw).drop(columns=["CLASS"])
+        self.model = model
+        self.compiled = compiled
+        self.csv_name = f"banknotes_{n_rows}.csv"
+        self.csv_dir = work_dir
+        self.raw.rename(columns=str.lower).to_csv(os.path.join(work_dir, self.csv_name), index=False)
+        read_csv(self.csv_name, base_path=work_dir)
+        db_path = os.path.join(work_dir, f"warehouse_{n_rows}.db")
+        self.db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path), min_size=1, max_size=1))
+
+    def close(self):
+        self.db.disconnect()
+
+
+def _stage_unique_key(ctx):
+    DataCleaning.add_realtime_unique_key(ctx.raw)
+
+
+def _stage_feature_creation(ctx):
+    FeatureCreation.main_feature_creation(ctx.raw)
+
+
+def _stage_predict(ctx):
+    ctx.model.predict(ctx.features)
+
+
+def _stage_predict_compiled(ctx):
+    ctx.compiled.predict(ctx.features)
+
+
+def _stage_read_csv(ctx):
+    read_csv(ctx.csv_name, base_path=ctx.csv_dir, cache=False)
+
+
+def _stage_read_csv_cached(ctx):
+    # The first (untimed) _Context read fills the sidecar cache; this measures the memory-mapped load.
+    read_csv(ctx.csv_name, base_path=ctx.csv_dir)
+
+
+def _stage_db_insert(ctx):
+    ctx.db.insert_dataframe(ctx.raw, BENCH_TABLE, if_exists="replace")
+
+
+# Stage name -> callable taking the size's _Context; each is timed and profiled separately.
+STAGES = {
+    "add_realtime_unique_key": _stage_unique_key,
+    "main_feature_creation": _stage_feature_creation,
+    "predict": _stage_predict,
+    "predict_compiled": _stage_predict_compiled,
+    "read_csv": _stage_read_csv,
+    "read_csv_cached": _stage_read_csv_cached,
+    "db_insert": _stage_db_insert,
+}
+
+
+def _measure(stage, ctx, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        stage(ctx)
+        timings.append(time.perf_counter() - started)
+
+    # Memory is measured in its own run since tracemalloc slows allocation down.
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+        stage(ctx)
+        peak_bytes = tracemalloc.get_traced_memory()[1] - baseline_bytes
+    finally:
+        tracemalloc.stop()
+    return min(timings), statistics.median(timings), peak_bytes
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, stages=None, repeat=3, seed=0) -> dict:
+    """
+    Runs every stage at every size.
+
+    Parameters:
+        sizes (iterable): Row counts to benchmark.
+        stages (list, optional): Names from STAGES; defaults to all of them.
+        repeat (int): Timed runs per stage; the best and median are reported.
+        seed (int): Seed for the synthetic data.
+
+    Returns:
+        dict: 'meta' describing the machine and run, and one 'results' entry per stage and size.
+    """
+    stages = list(stages or STAGES)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stages {sorted(unknown)}; choose from {list(STAGES)}")
+
+    model = _train_reference_model()
+    compiled = compile_forest(model, feature_names=FeatureEngine().feature_names)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="banknote_bench_") as work_dir:
+        for n_rows in sizes:
+            ctx = _Context(n_rows, work_dir, model, compiled, seed)
+            try:
+                for name in stages:
+                    best, median, peak_bytes = _measure(STAGES[name], ctx, repeat)
+                    results.append({
+                        "stage": name,
+                        "rows": n_rows,
+                        "seconds": best,
+                        "median_seconds": median,
+                        "rows_per_sec": n_rows / best if best else None,
+                        "peak_memory_bytes": peak_bytes,
+                    })
+                    print(f"{name:<24} {n_rows:>10,} rows  {best:9.4f}s  "
+                          f"{n_rows / best if best else 0:14,.0f} rows/s  {peak_bytes / 2 ** 20:9.1f} MiB")
+            finally:
+                ctx.close()
+                SnowflakeDB.forget_tables()
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def faster_predictor(report: dict) -> dict:
+    """
+    Names the faster of 'predict' (sklearn) and 'predict_compiled' at every size where both ran.
+
+    Returns:
+        dict: Row count -> the stage name with the lower best time.
+    """
+    seconds = {(entry["stage"], entry["rows"]): entry["seconds"] for entry in report["results"]}
+    return {
+        rows: "predict" if seconds[("predict", rows)] <= seconds[("predict_compiled", rows)] else "predict_compiled"
+        for stage, rows in seconds if stage == "predict" and ("predict_compiled", rows) in seconds
+    }
+
+
+def compare_to_baseline(current: dict, baseline: dict, tolerance: float = 0.25, min_seconds: float = 0.005) -> list:
+    """
+    Finds stages that got slower or use more memory than the baseline allows.
+
+    A stage regresses when its best time exceeds the baseline by more than
+    `tolerance` (relative) and by more than `min_seconds`, which keeps timer noise
+    on tiny inputs from failing the comparison, or when its peak memory exceeds the
+    baseline by more than `tolerance`. Stages or sizes missing from the baseline
+    are skipped.
+
+    Returns:
+        list: One dict per regression with the stage, rows, metric, baseline and current values.
+    """
+    reference = {(entry["stage"], entry["rows"]): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in current["results"]:
+        previous = reference.get((entry["stage"], entry["rows"]))
+        if previous is None:
+            continue
+        if (entry["seconds"] > previous["seconds"] * (1 + tolerance)
+                and entry["seconds"] - previous["seconds"] > min_seconds):
+            regressions.append({"stage": entry["stage"], "rows": entry["rows"], "metric": "seconds",
+                                "baseline": previous["seconds"], "current": entry["seconds"]})
+        if entry["peak_memory_bytes"] > previous["peak_memory_bytes"] * (1 + tolerance):
+            regressions.append({"stage": entry["stage"], "rows": entry["rows"], "metric": "peak_memory_bytes",
+                                "baseline": previous["peak_memory_bytes"], "current": entry["peak_memory_bytes"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each stage of the BankNote scoring pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline.")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, args.stages, args.repeat)
+    report["faster_predictor"] = faster_predictor(report)
+    for rows, stage in report["faster_predictor"].items():
+        print(f"Faster predictor at {rows:,} rows: {stage}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated at {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one.")
+        return
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(report, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression['stage']} at {regression['rows']:,} rows: {regression['metric']} "
+              f"{regression['baseline']:.4g} -> {regression['current']:.4g}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} of the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,30 @@
 # src/data/__init__.py
+from src.utils.lazy import lazy_exports
 
-# Import the database connection class from db.py
-from .db import MySQLConnector, SnowflakeDB
-
-# Import file reading functions from file_loader.py
-from .file_loader import read_csv, read_txt
-
-# Import the ORM models (and the Base if needed) from models.py.
-# Adjust the names below according to the actual objects defined in your models.py.
-from .models import BANKNOTE_ORI_TABLE
+# Public names and the submodule defining each. Submodules are imported on first
+# attribute access (PEP 562), so `import src.data` loads no driver, pandas or config.
+_EXPORTS = {
+    # The database connection classes from db.py
+    "MySQLConnector": ".db",
+    "SnowflakeDB": ".db",
+    # The connection pool from pool.py
+    "ConnectionPool": ".pool",
+    "PoolTimeoutError": ".pool",
+    # The per-source scoring checkpoints from checkpoints.py
+    "CheckpointStore": ".checkpoints",
+    # The single-round-trip schema migration planner from migrations.py
+    "MigrationManager": ".migrations",
+    # File reading functions from file_loader.py
+    "read_csv": ".file_loader",
+    "read_txt": ".file_loader",
+    # The table definitions from models.py
+    "BANKNOTE_ORI_TABLE": ".models",
+    "BANKNOTE_PRED_TABLE": ".models",
+    "BANKNOTE_SOURCE_TABLE": ".models",
+    "WATERMARK_COLUMN": ".models",
+    "TABLE_SCHEMAS": ".models",
+}
 
 # Optional: Define __all__ to explicitly declare the public API of this package.
-__all__ = [
-    "MySQLConnector",
-    "read_csv",
-    "read_txt",
-    "BANKNOTE_ORI_TABLE",
-    "SnowflakeDB"
-]
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,109 @@
+# src/data/bulk_loader.py
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from .local_backend import LocalConnection
+
+
+def sql_type_for(dtype) -> str:
+    """Maps a pandas dtype to the Snowflake column type used when no schema is defined."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return "BOOLEAN"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "INT"
+    if pd.api.types.is_float_dtype(dtype):
+        return "FLOAT"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP_NTZ"
+    return "VARCHAR"
+
+
+def column_definitions(df: pd.DataFrame, table_def=None) -> str:
+    """
+    Builds the column list of a CREATE TABLE statement for a DataFrame.
+
+    Types come from the table definition in models.py when it declares the
+    column; other columns are typed from their pandas dtype. Names are quoted to
+    preserve case.
+    """
+    declared = {}
+    if table_def is not None:
+        declared = {
+            col: spec["type"] if isinstance(spec, dict) else spec
+            for col, spec in table_def["columns"].items()
+        }
+    return ", ".join(f'"{col}" {declared.get(col, sql_type_for(df[col].dtype))}' for col in df.columns)
+
+
+def _write_parquet_chunk(df, path, compression):
+    df.to_parquet(path, index=False, compression=compression)
+    return path
+
+
+def stage_and_copy(connection, df, table_name, chunk_rows=250_000, parallel=4, compression="snappy"):
+    """
+    Bulk loads a DataFrame through the table stage as compressed Parquet files.
+
+    The frame is split into chunks of `chunk_rows` rows that are written to
+    Parquet and uploaded to a unique path in the table stage by `parallel`
+    threads at a time, then loaded with one COPY INTO, which Snowflake runs
+    across the files in parallel.
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    stage_path = f"@%{table_name}/bulk_{uuid.uuid4().hex}"
+    with tempfile.TemporaryDirectory(prefix="bulk_load_") as tmp_dir:
+        chunks = [
+            (df.iloc[start:start + chunk_rows], os.path.join(tmp_dir, f"chunk_{i:05d}.parquet"))
+            for i, start in enumerate(range(0, len(df), chunk_rows))
+        ]
+
+        def put(chunk_and_path):
+            path = _write_parquet_chunk(*chunk_and_path, compression)
+            cursor = connection.cursor()
+            try:
+                cursor.execute(f"PUT 'file://{path}' {stage_path} PARALLEL={parallel} AUTO_COMPRESS=FALSE")
+            finally:
+                cursor.close()
+
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            list(pool.map(put, chunks))
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            f"COPY INTO {table_name} FROM {stage_path} FILE_FORMAT = (TYPE = PARQUET) "
+            f"MATCH_BY_COLUMN_NAME = CASE_SENSITIVE PURGE = TRUE"
+        )
+        # COPY returns one row per file: (file, status, rows_parsed, rows_loaded, ...).
+        return sum(int(row[3]) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def insert_rows(connection, df, table_name, batch_size=10_000):
+    """Inserts a DataFrame with batched executemany; used for the local stand-in backend."""
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+    placeholders = ", ".join(["%s"] * len(df.columns))
+    query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+    cursor = connection.cursor()
+    try:
+        for start in range(0, len(df), batch_size):
+            chunk = df.iloc[start:start + batch_size]
+            rows = chunk.astype(object).where(chunk.notna(), None)
+            cursor.executemany(query, rows.itertuples(index=False, name=None))
+    finally:
+        cursor.close()
+    return len(df)
+
+
+def load_dataframe(connection, df, table_name, chunk_rows=250_000, parallel=4, compression="snappy"):
+    """Loads a DataFrame with the fastest path the connection supports."""
+    if isinstance(connection, LocalConnection):
+        return insert_rows(connection, df, table_name)
+    return stage_and_copy(connection, df, table_name, chunk_rows, parallel, compression)
@@ -0,0 +1,46 @@
+# src/data/checkpoints.py
+from datetime import datetime, timezone
+
+from .models import SCORING_CHECKPOINT_TABLE
+
+
+class CheckpointStore:
+    """
+    Persists the last processed watermark per source table in the warehouse itself.
+
+    Watermarks are stored as strings and bound back into queries as parameters,
+    so numeric IDs and timestamps both work as watermark columns.
+    """
+
+    def __init__(self, db, table_def=SCORING_CHECKPOINT_TABLE):
+        self.db = db
+        self.table_def = table_def
+        self.table_name = table_def["name"]
+        self._table_ready = False
+
+    def _ensure_table(self):
+        if self._table_ready:
+            return
+        cols = ", ".join(f'"{col}" {spec["type"]}' for col, spec in self.table_def["columns"].items())
+        self.db.execute_query(f"CREATE TABLE IF NOT EXISTS {self.table_name} ({cols})")
+        self._table_ready = True
+
+    def get(self, source_table):
+        """Returns the stored watermark for a source table, or None if it has never been processed."""
+        self._ensure_table()
+        rows = self.db.execute_query(
+            f'SELECT "WATERMARK" FROM {self.table_name} WHERE "SOURCE_TABLE" = %s', (source_table,))
+        return rows[0][0] if rows else None
+
+    def set(self, source_table, watermark):
+        """Stores the watermark for a source table."""
+        self._ensure_table()
+        updated_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        if self.get(source_table) is None:
+            self.db.execute_query(
+                f'INSERT INTO {self.table_name} ("SOURCE_TABLE", "WATERMARK", "UPDATED_AT") VALUES (%s, %s, %s)',
+                (source_table, str(watermark), updated_at))
+        else:
+            self.db.execute_query(
+                f'UPDATE {self.table_name} SET "WATERMARK" = %s, "UPDATED_AT" = %s WHERE "SOURCE_TABLE" = %s',
+                (str(watermark), updated_at, source_table))
@@ -1,70 +1,266 @@
-import mysql.connector
-from mysql.connector import Error
-import snowflake.connector
-import pandas as pd
-from snowflake.connector.pandas_tools import write_pandas
-import yaml
+import functools
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from .models import TABLE_SCHEMAS
+from .pool import ConnectionPool
+from src.utils.logger import METRICS, get_logger
+
+# The database drivers, pandas, yaml and the bulk loader are imported inside the
+# methods that need them, so importing this module stays cheap and never fails
+# for a missing driver that the caller does not use.
+
+logger = get_logger("data.db")
+
+# Connection settings, resolved from the project root rather than the working
+# directory. BANKNOTE_CONFIG points at a different file.
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "config",
+                           "snowflake_connection.yaml")
+
+
+@functools.lru_cache(maxsize=None)
+def load_config(path=None) -> dict:
+    """Reads (once per path) and returns the YAML connection config."""
+    import yaml
+
+    path = path or os.environ.get("BANKNOTE_CONFIG", CONFIG_PATH)
+    with open(path, "r") as file:
+        return yaml.safe_load(file)
 
-with open("../../config/snowflake_connection.yaml", "r") as file:
-    config = yaml.safe_load(file)
-sf_config = config["snowflake"]
 
 class MySQLConnector:
-    def __init__(self, host, user, password, database):
+    def __init__(self, host, user, password, database, pool=None):
         self.host = host
         self.user = user
         self.password = password
         self.database = database
         self.connection = None
+        # Optional ConnectionPool; when set, every query checks a connection out of it.
+        self.pool = pool
+
+    def _open_connection(self):
+        import mysql.connector
+
+        return mysql.connector.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database
+        )
+
+    def enable_pooling(self, min_size=1, max_size=8, timeout=30.0):
+        """
+        Routes all queries through a thread-safe pool of connections so one
+        MySQLConnector can be shared by concurrent workers.
+
+        Args:
+            min_size (int): Connections opened up front.
+            max_size (int): Upper bound on open connections.
+            timeout (float): Seconds a checkout waits before raising PoolTimeoutError.
+
+        Returns:
+            MySQLConnector: self, for chaining.
+        """
+        self.pool = ConnectionPool(self._open_connection, min_size=min_size, max_size=max_size, timeout=timeout)
+        return self
+
+    @contextmanager
+    def _connection(self):
+        """Yields a pooled connection when pooling is enabled, otherwise the shared one."""
+        if self.pool is not None:
+            with self.pool.connection() as connection:
+                yield connection
+        else:
+            if self.connection is None:
+                self.connect()
+            yield self.connection
 
     def connect(self):
         """Establishes the MySQL database connection."""
+        from mysql.connector import Error
+
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database
-            )
+            self.connection = self._open_connection()
             if self.connection.is_connected():
-                print("Connection established successfully.")
+                logger.info("Connection established successfully.")
         except Error as e:
-            print(f"Error connecting to MySQL: {e}")
+            logger.error(f"Error connecting to MySQL: {e}")
             # Optionally, raise the exception or handle it as needed.
         return self.connection
 
     def execute_query(self, query, params=None):
-        """Executes a given SQL query with optional parameters."""
-        if self.connection is None:
-            self.connect()
-        cursor = self.connection.cursor(dictionary=True)
-        try:
-            cursor.execute(query, params)
-            result = cursor.fetchall()
-            return result
-        except Error as e:
-            print(f"Error executing query: {e}")
-            return None
-        finally:
-            cursor.close()
+        """
+        Executes a given SQL query with optional parameters and returns all rows as dicts.
+        For large results use stream_query, which does not materialize the result.
+        """
+        with self._connection() as connection:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                with METRICS.timer("query_seconds", backend="mysql"):
+                    cursor.execute(query, params)
+                    result = cursor.fetchall() if cursor.description else []
+                return result
+            except Exception as e:
+                METRICS.increment("query_errors_total", backend="mysql")
+                raise Exception(f"Error executing query: {e}")
+            finally:
+                cursor.close()
+
+    def stream_query(self, query, params=None, batch_size=10_000, output="tuples"):
+        """
+        Runs a query and yields its result in batches, in constant memory.
+
+        The cursor is unbuffered, so rows are read from the server as each batch
+        is fetched with fetchmany instead of being loaded up front. The connection
+        is held until the iterator is exhausted or closed.
+
+        Args:
+            query (str): SQL query.
+            params (tuple or dict, optional): Parameters bound into the query.
+            batch_size (int): Rows per yielded batch.
+            output (str): 'tuples' for lists of row tuples, 'numpy' for dicts of
+                column arrays, or 'pandas' for DataFrames.
+
+        Returns:
+            Iterator: Batches in the requested output format.
+        """
+        if output not in ("tuples", "numpy", "pandas"):
+            raise ValueError(f"Unknown output format '{output}'")
+        return self._stream_batches(query, params, batch_size, output)
+
+    def _stream_batches(self, query, params, batch_size, output):
+        import numpy as np
+
+        with self._connection() as connection:
+            cursor = connection.cursor(buffered=False)
+            exhausted = False
+            try:
+                with METRICS.timer("query_seconds", backend="mysql"):
+                    cursor.execute(query, params)
+                names = [column[0] for column in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        exhausted = True
+                        break
+                    METRICS.increment("rows_read_total", len(rows), backend="mysql")
+                    if output == "tuples":
+                        yield rows
+                        continue
+                    columns = {name: np.array(values) for name, values in zip(names, zip(*rows))}
+                    if output == "numpy":
+                        yield columns
+                    else:
+                        import pandas as pd
+
+                        yield pd.DataFrame(columns, copy=False)
+            except Exception as e:
+                METRICS.increment("query_errors_total", backend="mysql")
+                raise Exception(f"Error streaming query: {e}")
+            finally:
+                if not exhausted:
+                    # An unbuffered result must be read to the end before the
+                    # connection can run another statement.
+                    try:
+                        while cursor.fetchmany(batch_size):
+                            pass
+                    except Exception:
+                        pass
+                cursor.close()
+
+    def insert_rows(self, table_name, data, columns=None, batch_size=10_000):
+        """
+        Inserts rows in batches with executemany, which the MySQL driver sends as
+        multi-row INSERT statements, committing once at the end.
+
+        Args:
+            table_name (str): Target table.
+            data: A DataFrame, an iterable of DataFrames (e.g. from stream_query with
+                output='pandas'), or an iterable of row tuples.
+            columns (list, optional): Column names; required for row tuples, taken
+                from the DataFrames otherwise.
+            batch_size (int): Rows per executemany call.
+
+        Returns:
+            int: Number of rows inserted.
+        """
+        import pandas as pd
+
+        if isinstance(data, pd.DataFrame):
+            data = [data]
+        inserted = 0
+        with self._connection() as connection:
+            cursor = connection.cursor()
+            try:
+                for batch_columns, rows in self._row_batches(data, columns, batch_size):
+                    column_list = ", ".join(f"`{col}`" for col in batch_columns)
+                    placeholders = ", ".join(["%s"] * len(batch_columns))
+                    with METRICS.timer("write_seconds", table=table_name.upper()):
+                        cursor.executemany(f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})", rows)
+                    inserted += len(rows)
+                connection.commit()
+            except Exception as e:
+                METRICS.increment("query_errors_total", backend="mysql")
+                connection.rollback()
+                raise Exception(f"Error inserting data into table {table_name}: {e}")
+            finally:
+                cursor.close()
+        METRICS.increment("rows_written_total", inserted, backend="mysql")
+        return inserted
+
+    @staticmethod
+    def _row_batches(data, columns, batch_size):
+        """Yields (columns, list of row tuples) of at most batch_size rows from DataFrames or row tuples."""
+        import pandas as pd
+
+        rows = []
+        for item in data:
+            if isinstance(item, pd.DataFrame):
+                for start in range(0, len(item), batch_size):
+                    chunk = item.iloc[start:start + batch_size]
+                    # Object dtype turns NumPy scalars into Python values the driver can bind.
+                    chunk = chunk.astype(object).where(chunk.notna(), None)
+                    yield list(chunk.columns), list(chunk.itertuples(index=False, name=None))
+                continue
+            if columns is None:
+                raise ValueError("insert_rows needs `columns` when given row tuples")
+            rows.append(tuple(item))
+            if len(rows) == batch_size:
+                yield columns, rows
+                rows = []
+        if rows:
+            yield columns, rows
 
     def close(self):
-        """Closes the database connection."""
+        """Closes the database connection and any pooled connections."""
+        if self.pool is not None:
+            self.pool.close()
         if self.connection and self.connection.is_connected():
             self.connection.close()
-            print("Connection closed.")
+            logger.info("Connection closed.")
 
     # Optionally, implement context management:
     def __enter__(self):
-        return self.connect()
+        if self.pool is None:
+            self.connect()
+        return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         self.close()
 
 
 class SnowflakeDB:
-    def __init__(self, user=sf_config["user"], password=sf_config["password"], account=sf_config["account"],
-                 warehouse=sf_config["warehouse"], database=sf_config["database"], schema=sf_config["schema"]):
+    # Tables known to exist, keyed by (account, database, schema, table), shared by
+    # every instance in the process.
+    _known_tables = set()
+    _known_tables_lock = threading.Lock()
+
+    # Settings left as None are read from the config file when the first connection is opened.
+    SETTINGS = ("user", "password", "account", "warehouse", "database", "schema")
+
+    def __init__(self, user=None, password=None, account=None, warehouse=None, database=None, schema=None,
+                 pool=None):
         self.user = user
         self.password = password
         self.account = account
@@ -72,41 +268,118 @@ class SnowflakeDB:
         self.database = database
         self.schema = schema
         self.connection = None
+        # Optional ConnectionPool; when set, every operation checks a connection out of it.
+        self.pool = pool
+
+    def _resolve_settings(self):
+        """Fills connection settings that were not passed explicitly from the config file."""
+        missing = [name for name in self.SETTINGS if getattr(self, name) is None]
+        if missing:
+            sf_config = load_config()["snowflake"]
+            for name in missing:
+                setattr(self, name, sf_config[name])
+
+    def _open_connection(self):
+        import snowflake.connector
+
+        self._resolve_settings()
+        try:
+            return snowflake.connector.connect(
+                user=self.user,
+                password=self.password,
+                account=self.account,
+                warehouse=self.warehouse,
+                database=self.database,
+                schema=self.schema
+            )
+        except Exception as e:
+            raise Exception(f"Error connecting to Snowflake: {e}")
+
+    def enable_pooling(self, min_size=1, max_size=8, timeout=30.0):
+        """
+        Routes all operations through a thread-safe pool of connections so one
+        SnowflakeDB can be shared by concurrent workers without reconnecting.
+
+        Args:
+            min_size (int): Connections opened up front.
+            max_size (int): Upper bound on open connections.
+            timeout (float): Seconds a checkout waits before raising PoolTimeoutError.
+
+        Returns:
+            SnowflakeDB: self, for chaining.
+        """
+        self.pool = ConnectionPool(self._open_connection, min_size=min_size, max_size=max_size, timeout=timeout)
+        return self
+
+    @contextmanager
+    def _connection(self):
+        """Yields a pooled connection when pooling is enabled, otherwise the shared one."""
+        if self.pool is not None:
+            with self.pool.connection() as connection:
+                yield connection
+        else:
+            self.connect()
+            yield self.connection
 
     def connect(self):
         """Establish a connection to Snowflake if not already connected."""
         if self.connection is None:
-            try:
-                self.connection = snowflake.connector.connect(
-                    user=self.user,
-                    password=self.password,
-                    account=self.account,
-                    warehouse=self.warehouse,
-                    database=self.database,
-                    schema=self.schema
-                )
-            except Exception as e:
-                raise Exception(f"Error connecting to Snowflake: {e}")
+            self.connection = self._open_connection()
 
     def disconnect(self):
-        """Close the connection if open."""
+        """Close the connection if open, along with any pooled connections."""
+        if self.pool is not None:
+            self.pool.close()
         if self.connection:
             self.connection.close()
             self.connection = None
 
     def execute_query(self, query, params=None):
         """Execute a given query with optional parameters."""
-        self.connect()
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(query, params)
-            return cursor.fetchall()
-        except Exception as e:
-            raise Exception(f"Error executing query: {e}")
-        finally:
-            cursor.close()
+        with self._connection() as connection:
+            cursor = connection.cursor()
+            try:
+                with METRICS.timer("query_seconds", backend="snowflake"):
+                    cursor.execute(query, params)
+                    return cursor.fetchall()
+            except Exception as e:
+                METRICS.increment("query_errors_total", backend="snowflake")
+                raise Exception(f"Error executing query: {e}")
+            finally:
+                cursor.close()
+
+    def execute_script(self, statements):
+        """
+        Execute several statements in a single round trip as one multi-statement request.
 
-    def read_table(self, table_name, batch_size=None, query=None, stream=False):
+        Args:
+            statements (list): SQL statements, without trailing semicolons.
+        """
+        if not statements:
+            return
+        with self._connection() as connection:
+            cursor = connection.cursor()
+            try:
+                with METRICS.timer("query_seconds", backend="snowflake"):
+                    cursor.execute(";\n".join(statements), num_statements=len(statements))
+            except Exception as e:
+                METRICS.increment("query_errors_total", backend="snowflake")
+                raise Exception(f"Error executing script: {e}")
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _build_query(table_name, query=None, stream=False, columns=None):
+        """Returns the custom query if given, otherwise a SELECT over the table (or its stream)."""
+        # If a custom query is provided, use that; otherwise, adjust based on the stream flag.
+        if query:
+            return query
+        # Append _STREAM to the table name if stream is True.
+        target_table = f"{table_name}_STREAM" if stream else table_name
+        select_list = ", ".join(columns) if columns else "*"
+        return f"SELECT {select_list} FROM {target_table}"
+
+    def read_table(self, table_name, batch_size=None, query=None, stream=False, columns=None, params=None):
         """
         Read data from Snowflake as a pandas DataFrame or an iterator of DataFrame chunks.
 
@@ -116,76 +389,313 @@ class SnowflakeDB:
             query (str, optional): Custom SQL query. If provided, this query is used
                 to load data. Otherwise, the entire table is read.
             stream (bool, optional): If True, read from the table's stream (e.g., BANK_NOTE_TB_STREAM).
+            columns (list, optional): Columns to select instead of SELECT *. Ignored when query is given.
+            params (tuple or dict, optional): Parameters bound into a custom query.
 
         Returns:
             pd.DataFrame or Iterator[pd.DataFrame]: The full DataFrame if batch_size is None,
             otherwise an iterator yielding DataFrame chunks.
         """
-        self.connect()
+        import pandas as pd
 
-        # If a custom query is provided, use that; otherwise, adjust based on the stream flag.
-        if query:
-            final_query = query
-        else:
-            # Append _STREAM to the table name if stream is True.
-            target_table = f"{table_name}_STREAM" if stream else table_name
-            final_query = f"SELECT * FROM {target_table}"
+        final_query = self._build_query(table_name, query, stream, columns)
+        if batch_size:
+            return self._read_chunks(final_query, batch_size, params)
+        with self._connection() as connection:
+            try:
+                df = pd.read_sql(final_query, connection, params=params)
+            except Exception as e:
+                raise Exception(f"Error reading data: {e}")
+        self._record_io("read", len(df), df.memory_usage(index=False).sum())
+        return df
 
-        try:
-            if batch_size:
-                return pd.read_sql(final_query, self.connection, chunksize=batch_size)
-            else:
-                return pd.read_sql(final_query, self.connection)
-        except Exception as e:
-            raise Exception(f"Error reading data: {e}")
+    def _read_chunks(self, query, batch_size, params=None):
+        """Yields DataFrame chunks, holding one connection until the iterator is exhausted."""
+        import pandas as pd
+
+        with self._connection() as connection:
+            try:
+                for chunk in pd.read_sql(query, connection, params=params, chunksize=batch_size):
+                    self._record_io("read", len(chunk), chunk.memory_usage(index=False).sum())
+                    yield chunk
+            except Exception as e:
+                raise Exception(f"Error reading data: {e}")
 
-    def insert_dataframe(self, df, table_name, if_exists="append"):
+    def read_table_arrow(self, table_name, columns=None, query=None, stream=False, batch_size=None,
+                         output="pandas"):
+        """
+        Read data as an iterator of columnar batches using the connector's Arrow result format.
+
+        Results are fetched as Arrow record batches and converted column-wise, so no
+        Python object is created per row as with read_table.
+
+        Args:
+            table_name (str): Name of the table to read.
+            columns (list, optional): Columns to select instead of SELECT *. Ignored when query is given.
+            query (str, optional): Custom SQL query.
+            stream (bool, optional): If True, read from the table's stream.
+            batch_size (int, optional): Maximum rows per yielded batch. Larger result
+                chunks are sliced without copying; by default chunks are yielded as received.
+            output (str): 'pandas' for DataFrames, 'numpy' for dicts of column arrays,
+                or 'arrow' for pyarrow Tables.
+
+        Returns:
+            Iterator: Batches in the requested output format.
+        """
+        if output not in ("pandas", "numpy", "arrow"):
+            raise ValueError(f"Unknown output format '{output}'")
+        final_query = self._build_query(table_name, query, stream, columns)
+        return self._read_arrow_batches(final_query, batch_size, output)
+
+    def _read_arrow_batches(self, query, batch_size, output):
+        with self._connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query)
+                for table in cursor.fetch_arrow_batches():
+                    self._record_io("read", table.num_rows, table.nbytes)
+                    step = batch_size or max(table.num_rows, 1)
+                    for offset in range(0, table.num_rows, step):
+                        batch = table.slice(offset, step)
+                        if output == "pandas":
+                            yield batch.to_pandas(split_blocks=True)
+                        elif output == "numpy":
+                            yield {name: batch.column(name).to_numpy() for name in batch.column_names}
+                        else:
+                            yield batch
+            except Exception as e:
+                raise Exception(f"Error reading data: {e}")
+            finally:
+                cursor.close()
+
+    def insert_dataframe(self, df, table_name, if_exists="append", table_def=None, chunk_rows=250_000,
+                         parallel=4):
         """
         Insert a pandas DataFrame into a Snowflake table.
         - If if_exists is 'replace', the table is recreated and then data is inserted.
         - If if_exists is 'append', the code checks if the table exists; if not, it creates the table with
           column names quoted (preserving case), otherwise it appends rows.
 
+        Column types come from the table's definition in models.py (or `table_def`),
+        falling back to the DataFrame dtypes. Whether a table exists is remembered for
+        the life of the process, so repeated appends skip the SHOW TABLES round trip.
+        Rows are loaded as compressed Parquet chunks staged in parallel and copied
+        in with a single COPY INTO.
+
         Args:
             df (pd.DataFrame): The DataFrame to insert.
             table_name (str): Target table name.
             if_exists (str): 'append' to add rows or 'replace' to recreate the table.
+            table_def (dict, optional): Schema dict like those in models.py.
+            chunk_rows (int): Rows per staged Parquet file.
+            parallel (int): Number of files written and uploaded concurrently.
 
         Returns:
             int: Number of rows inserted.
         """
-        self.connect()
-        cursor = self.connection.cursor()
+        from .bulk_loader import load_dataframe
+
+        if table_def is None:
+            table_def = TABLE_SCHEMAS.get(table_name.upper())
+        with self._connection() as connection:
+            cursor = connection.cursor()
+            try:
+                self._ensure_table(cursor, df, table_name, if_exists, table_def)
+            except Exception as e:
+                raise Exception(f"Error inserting data into table {table_name}: {e}")
+            finally:
+                cursor.close()
+            if df.empty:
+                return 0
+            try:
+                with METRICS.timer("write_seconds", table=table_name.upper()):
+                    rows = load_dataframe(connection, df, table_name, chunk_rows=chunk_rows, parallel=parallel)
+            except Exception as e:
+                raise Exception(f"Error inserting data into table {table_name}: {e}")
+        self._record_io("written", rows, df.memory_usage(index=False).sum())
+        return rows
+
+    @staticmethod
+    def _record_io(direction, rows, nbytes):
+        METRICS.increment(f"rows_{direction}_total", rows, backend="snowflake")
+        METRICS.increment(f"bytes_{direction}_total", int(nbytes), backend="snowflake")
+
+    def _table_key(self, table_name):
+        return (self.account, self.database, self.schema, table_name.upper())
+
+    def _ensure_table(self, cursor, df, table_name, if_exists, table_def):
+        """Creates or recreates the target table as needed, consulting the per-process table cache."""
+        from .bulk_loader import column_definitions
+
+        key = self._table_key(table_name)
+        cols = column_definitions(df, table_def)
+        if if_exists == "replace":
+            # Recreate the table with the new schema.
+            cursor.execute(f"CREATE OR REPLACE TABLE {table_name} ({cols})")
+        elif if_exists == "append":
+            with SnowflakeDB._known_tables_lock:
+                if key in SnowflakeDB._known_tables:
+                    return
+            # Check if the table exists.
+            cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
+            if cursor.fetchone() is None:
+                # Create the table with quoted column names.
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({cols})")
+        with SnowflakeDB._known_tables_lock:
+            SnowflakeDB._known_tables.add(key)
+
+    @classmethod
+    def forget_tables(cls):
+        """Clears the per-process table cache, e.g. after tables were dropped outside this process."""
+        with cls._known_tables_lock:
+            cls._known_tables.clear()
+
+    @contextmanager
+    def _staging_table(self, connection, cursor, df, table_name, table_def):
+        """Loads `df` into a uniquely named temporary table, yields its name and drops it afterwards."""
+        from .bulk_loader import column_definitions, load_dataframe
+
+        staging_table = f"{table_name}_STAGE_{uuid.uuid4().hex[:8]}".upper()
+        cursor.execute(f"CREATE TEMPORARY TABLE {staging_table} ({column_definitions(df, table_def)})")
         try:
-            # Create a simple schema with quoted column names to preserve lowercase.
-            cols = ", ".join([f'"{col}" VARCHAR' for col in df.columns])
-
-            if if_exists == "replace":
-                # Recreate the table with the new schema.
-                create_query = f"CREATE OR REPLACE TABLE {table_name} ({cols})"
-                cursor.execute(create_query)
-            elif if_exists == "append":
-                # Check if the table exists.
-                cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
-                table_exists = cursor.fetchone() is not None
-                if not table_exists:
-                    # Create the table with quoted column names.
-                    create_query = f"CREATE TABLE {table_name} ({cols})"
-                    cursor.execute(create_query)
-
-            # Insert data using write_pandas.
-            success, nchunks, nrows, _ = write_pandas(self.connection, df, table_name)
-            if not success:
-                raise Exception("Failed to write DataFrame to Snowflake")
-            return nrows
-        except Exception as e:
-            raise Exception(f"Error inserting data into table {table_name}: {e}")
+            load_dataframe(connection, df, staging_table)
+            yield staging_table
         finally:
-            cursor.close()
+            cursor.execute(f"DROP TABLE IF EXISTS {staging_table}")
+
+    def insert_missing(self, df, table_name, key_column, table_def=None):
+        """
+        Insert only the rows whose key is not already present in the target table.
+
+        The rows are loaded into a temporary staging table and copied across with a
+        single INSERT ... SELECT ... WHERE NOT EXISTS, so re-running a load with the
+        same keys writes nothing twice.
+
+        Args:
+            df (pd.DataFrame): Rows to insert, including `key_column`.
+            table_name (str): Target table name; created if missing.
+            key_column (str): Column holding a deterministic row key.
+            table_def (dict, optional): Schema dict like those in models.py.
+
+        Returns:
+            int: Number of rows actually inserted.
+        """
+        if table_def is None:
+            table_def = TABLE_SCHEMAS.get(table_name.upper())
+        df = df.drop_duplicates(subset=[key_column])
+        cols = ", ".join(f'"{col}"' for col in df.columns)
+        staged_cols = ", ".join(f's."{col}"' for col in df.columns)
+        with self._connection() as connection:
+            cursor = connection.cursor()
+            try:
+                self._ensure_table(cursor, df, table_name, "append", table_def)
+                if df.empty:
+                    return 0
+                with self._staging_table(connection, cursor, df, table_name, table_def) as staging_table:
+                    cursor.execute(
+                        f"INSERT INTO {table_name} ({cols}) SELECT {staged_cols} FROM {staging_table} s "
+                        f'WHERE NOT EXISTS (SELECT 1 FROM {table_name} t WHERE t."{key_column}" = s."{key_column}")'
+                    )
+                    inserted = cursor.rowcount
+                self._record_io("written", inserted, df.memory_usage(index=False).sum())
+                return inserted
+            except Exception as e:
+                raise Exception(f"Error inserting data into table {table_name}: {e}")
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _key_condition(key_columns, target, staged):
+        return " AND ".join(f'{target}."{col}" = {staged}."{col}"' for col in key_columns)
+
+    def update_from_dataframe(self, df, table_name, key_columns, table_def=None):
+        """
+        Apply new values to many rows at once with one set-based MERGE.
+
+        The DataFrame is loaded into a temporary staging table (through the same
+        bulk path as insert_dataframe), then a single MERGE ... WHEN MATCHED THEN
+        UPDATE sets every non-key column from the staged row with the same key.
+        Rows whose key is not in the table are ignored. If a key appears more than
+        once, the last row wins.
+
+        Args:
+            df (pd.DataFrame): Key columns plus the columns to update.
+            table_name (str): Table to update.
+            key_columns (list): Columns identifying a row, e.g. ["ROW_KEY"].
+            table_def (dict, optional): Schema dict like those in models.py, used to type the staged columns.
+
+        Returns:
+            int: Number of rows updated.
+
+        Example:
+            update_from_dataframe(pd.DataFrame({"ROW_KEY": keys, "prediction": labels}), "BANK_NOTE_PRED",
+                                  ["ROW_KEY"])
+        """
+        key_columns = list(key_columns)
+        set_columns = [col for col in df.columns if col not in key_columns]
+        if not set_columns:
+            raise ValueError("update_from_dataframe needs at least one column besides the keys")
+        if table_def is None:
+            table_def = TABLE_SCHEMAS.get(table_name.upper())
+        df = df.drop_duplicates(subset=key_columns, keep="last")
+        if df.empty:
+            return 0
+        set_clause = ", ".join(f'"{col}" = s."{col}"' for col in set_columns)
+        with self._connection() as connection:
+            cursor = connection.cursor()
+            try:
+                with self._staging_table(connection, cursor, df, table_name, table_def) as staging_table:
+                    with METRICS.timer("write_seconds", table=table_name.upper()):
+                        cursor.execute(
+                            f"MERGE INTO {table_name} t USING {staging_table} s "
+                            f"ON {self._key_condition(key_columns, 't', 's')} "
+                            f"WHEN MATCHED THEN UPDATE SET {set_clause}"
+                        )
+                    updated = cursor.rowcount
+                self._record_io("written", updated, df.memory_usage(index=False).sum())
+                return updated
+            except Exception as e:
+                raise Exception(f"Error updating table {table_name}: {e}")
+            finally:
+                cursor.close()
+
+    def delete_from_dataframe(self, df, table_name, key_columns=None):
+        """
+        Delete every row whose key appears in a DataFrame, with one DELETE ... USING.
+
+        Args:
+            df (pd.DataFrame): Keys of the rows to delete.
+            table_name (str): Table to delete from.
+            key_columns (list, optional): Key columns; defaults to all columns of `df`.
+
+        Returns:
+            int: Number of rows deleted.
+        """
+        key_columns = list(key_columns or df.columns)
+        df = df[key_columns].drop_duplicates()
+        if df.empty:
+            return 0
+        with self._connection() as connection:
+            cursor = connection.cursor()
+            try:
+                with self._staging_table(connection, cursor, df, table_name,
+                                         TABLE_SCHEMAS.get(table_name.upper())) as staging_table:
+                    with METRICS.timer("write_seconds", table=table_name.upper()):
+                        cursor.execute(
+                            f"DELETE FROM {table_name} USING {staging_table} "
+                            f"WHERE {self._key_condition(key_columns, table_name, staging_table)}"
+                        )
+                    return cursor.rowcount
+            except Exception as e:
+                raise Exception(f"Error deleting from table {table_name}: {e}")
+            finally:
+                cursor.close()
 
     def update_table(self, table_name, set_data, where_data):
         """
         Update records in a table using dictionary inputs for SET and WHERE clauses.
+        Values are bound as parameters. To update many rows with different values,
+        use update_from_dataframe.
 
         Args:
             table_name (str): The table to update.
@@ -194,31 +704,22 @@ class SnowflakeDB:
 
         Example:
             update_table("users", {"status": "active"}, {"id": 123})
-            will generate and execute:
-            UPDATE users SET status = 'active' WHERE id = 123
-        """
-        self.connect()
-        # Build SET clause from set_data
-        set_clause = ", ".join(
-            [f"{col} = '{val}'" if isinstance(val, str) else f"{col} = {val}"
-             for col, val in set_data.items()]
-        )
-        # Build WHERE clause from where_data
-        where_clause = " AND ".join(
-            [f"{col} = '{val}'" if isinstance(val, str) else f"{col} = {val}"
-             for col, val in where_data.items()]
-        )
+            will execute, with the values bound:
+            UPDATE users SET status = %s WHERE id = %s
+        """
+        set_clause = ", ".join(f"{col} = %s" for col in set_data)
+        where_clause = " AND ".join(f"{col} = %s" for col in where_data)
         query = f"UPDATE {table_name} SET {set_clause} WHERE {where_clause}"
-        self.execute_query(query)
+        self.execute_query(query, tuple(set_data.values()) + tuple(where_data.values()))
 
-    def delete_from_table(self, table_name, condition):
+    def delete_from_table(self, table_name, condition, params=None):
         """
         Delete records from a table based on a condition.
 
         Args:
             table_name (str): The table from which to delete rows.
-            condition (str): WHERE clause condition (e.g., "id = 123").
+            condition (str): WHERE clause condition with %s placeholders (e.g., "id = %s").
+            params (tuple, optional): Values bound to the placeholders.
         """
-        self.connect()
         query = f"DELETE FROM {table_name} WHERE {condition}"
-        self.execute_query(query)
\ No newline at end of file
+        self.execute_query(query, params)
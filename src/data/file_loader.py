@@ -1,31 +1,150 @@
 # src/data/file_loader.py
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+
+import numpy as np
 import pandas as pd
 
+from .models import BANKNOTE_ORI_TABLE
+from src.utils.logger import get_logger
+
+logger = get_logger("data.file_loader")
+
+# Resolved from the project root, so reads do not depend on the working directory.
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data")
+
+# Schema type -> pandas dtype, and the narrower dtype used in compact mode.
+SCHEMA_DTYPES = {"FLOAT": "float64", "INT": "int64", "BIGINT": "int64", "BOOLEAN": "bool"}
+COMPACT_DTYPES = {"FLOAT": "float32", "INT": "int8"}
+
+CACHE_DIR_NAME = ".cache"
+
 
-def read_csv(file_name, base_path='../../data/'):
+def schema_dtypes(table_def=BANKNOTE_ORI_TABLE, compact=False) -> dict:
     """
-    Reads a CSV file from the specified base path.
+    Maps each column of a models.py table definition (lowercased) to a pandas dtype.
 
-    :param file_name: Name of the CSV file.
-    :param base_path: Relative path to the raw data directory.
-    :return: DataFrame with the CSV data.
+    Parameters:
+        table_def (dict): Table definition whose column types to use.
+        compact (bool): Use float32 for FLOAT and int8 for INT columns. This halves
+            the size of the measurements; INT columns must fit in -128..127.
+
+    Returns:
+        dict: {column name (lowercase): dtype}. Types without a mapping are left out and inferred.
+    """
+    dtypes = {}
+    for col, spec in table_def["columns"].items():
+        sql_type = (spec["type"] if isinstance(spec, dict) else spec).upper()
+        dtype = (COMPACT_DTYPES.get(sql_type) if compact else None) or SCHEMA_DTYPES.get(sql_type)
+        if dtype:
+            dtypes[col.lower()] = dtype
+    return dtypes
+
+
+def _header_dtypes(file_path, dtypes):
+    """Matches schema dtypes to the file's header case-insensitively."""
+    header = pd.read_csv(file_path, nrows=0).columns
+    return {col: dtypes[col.lower()] for col in header if col.lower() in dtypes}
+
+
+def _cache_path(file_path, dtypes):
+    key = hashlib.sha256(json.dumps(sorted(dtypes.items())).encode()).hexdigest()[:12]
+    directory = os.path.join(os.path.dirname(file_path), CACHE_DIR_NAME)
+    return os.path.join(directory, f"{os.path.basename(file_path)}-{key}")
+
+
+def _read_cache(cache_path, stat):
+    meta_path = os.path.join(cache_path, "meta.json")
+    if not os.path.isfile(meta_path):
+        return None
+    with open(meta_path, "r") as file:
+        meta = json.load(file)
+    if meta["mtime_ns"] != stat.st_mtime_ns or meta["size"] != stat.st_size:
+        return None
+    # Copy-on-write maps: the frame is writable like a freshly parsed one, and
+    # writes land in private pages instead of the cache files.
+    arrays = {
+        col: np.load(os.path.join(cache_path, f"{i:03d}.npy"), mmap_mode="c")
+        for i, col in enumerate(meta["columns"])
+    }
+    return pd.DataFrame(arrays, copy=False)
+
+
+def _write_cache(cache_path, stat, df):
+    """Writes one .npy per column and a meta.json, publishing the directory atomically."""
+    if not all(df[col].dtype.kind in "biuf" for col in df.columns):
+        # Only plain numeric columns can be memory-mapped back.
+        return
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=os.path.dirname(cache_path))
+    try:
+        for i, col in enumerate(df.columns):
+            np.save(os.path.join(tmp_dir, f"{i:03d}.npy"), df[col].to_numpy())
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as file:
+            json.dump({"columns": list(df.columns), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}, file)
+        if os.path.isdir(cache_path):
+            shutil.rmtree(cache_path, ignore_errors=True)
+        os.rename(tmp_dir, cache_path)
+    except OSError as e:
+        # A concurrent reader may have published the same cache first; the parse result is still valid.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.warning(f"Could not write CSV cache {cache_path}: {e}")
+
+
+def read_csv(file_name, base_path=DATA_DIR, table_def=BANKNOTE_ORI_TABLE, compact=False, engine="pyarrow",
+             chunksize=None, cache=True):
+    """
+    Reads a CSV file from the specified base path with column types taken from a schema.
+
+    Columns declared in `table_def` are parsed straight into their dtypes instead of
+    being inferred. The default 'pyarrow' engine parses with several threads. The
+    parsed columns are kept in a binary sidecar cache (a '.cache' directory next
+    to the file), so the next read of an unchanged file memory-maps the columns
+    instead of parsing the text again. The cache is keyed on the dtypes and
+    invalidated when the file's mtime or size changes.
+
+    :param file_name: Name of the CSV file, relative to base_path.
+    :param base_path: Directory holding the file; defaults to the project's data directory.
+    :param table_def: Table definition from models.py providing column dtypes, or None to infer them.
+    :param compact: Parse FLOAT columns as float32 and INT columns as int8.
+    :param engine: pandas parser engine ('pyarrow', 'c' or 'python').
+    :param chunksize: If set, return an iterator of DataFrames of this many rows, for
+        files larger than memory. Chunked reads use the 'c' engine and bypass the cache.
+    :param cache: Use the binary sidecar cache.
+    :return: DataFrame with the CSV data, or an iterator of DataFrame chunks.
     """
     file_path = os.path.join(base_path, file_name)
     try:
-        df = pd.read_csv(file_path)
+        dtypes = {}
+        if table_def is not None:
+            dtypes = _header_dtypes(file_path, schema_dtypes(table_def, compact))
+        if chunksize:
+            return pd.read_csv(file_path, dtype=dtypes, engine="c", chunksize=chunksize)
+
+        stat = os.stat(file_path)
+        cache_path = _cache_path(os.path.abspath(file_path), dtypes)
+        if cache:
+            df = _read_cache(cache_path, stat)
+            if df is not None:
+                return df
+        df = pd.read_csv(file_path, dtype=dtypes, engine=engine)
+        if cache:
+            _write_cache(cache_path, stat, df)
         return df
     except Exception as e:
-        print(f"Error reading CSV file at {file_path}: {e}")
+        logger.error(f"Error reading CSV file at {file_path}: {e}")
         raise
 
 
-def read_txt(file_name, base_path='../../data/'):
+def read_txt(file_name, base_path=DATA_DIR):
     """
     Reads a text file from the specified base path.
 
     :param file_name: Name of the text file.
-    :param base_path: Relative path to the raw data directory.
+    :param base_path: Directory holding the file; defaults to the project's data directory.
     :return: Contents of the text file as a string.
     """
     file_path = os.path.join(base_path, file_name)
@@ -34,5 +153,5 @@ def read_txt(file_name, base_path='../../data/'):
             content = file.read()
         return content
     except Exception as e:
-        print(f"Error reading text file at {file_path}: {e}")
+        logger.error(f"Error reading text file at {file_path}: {e}")
         raise
@@ -0,0 +1,125 @@
+# src/data/local_backend.py
+"""
+A SQLite-backed stand-in for the Snowflake and MySQL drivers.
+
+It lets SnowflakeDB, MySQLConnector and ConnectionPool be exercised and
+benchmarked offline. Connections accept the drivers' `%s` / `%(name)s`
+parameter styles and the few Snowflake-only statements and functions the data
+layer issues (SHOW TABLES, CREATE OR REPLACE, update-only MERGE, DELETE ...
+USING and HASH_AGG).
+Use a file path rather than ':memory:' when several connections (e.g. a pool)
+must see the same data.
+"""
+import hashlib
+import re
+import sqlite3
+
+_PARAM = re.compile(r"%\((\w+)\)s|%s")
+_SHOW_TABLES = re.compile(r"^\s*SHOW\s+TABLES\s+LIKE\s+'([^']*)'\s*$", re.IGNORECASE)
+_CREATE_OR_REPLACE = re.compile(r"^\s*CREATE\s+OR\s+REPLACE\s+TABLE\s+([\w.\"]+)", re.IGNORECASE)
+# The update-only MERGE and DELETE ... USING forms that SnowflakeDB issues.
+_MERGE_UPDATE = re.compile(r"^\s*MERGE\s+INTO\s+(\S+)\s+(\w+)\s+USING\s+(\S+)\s+(\w+)\s+ON\s+(.+?)\s+"
+                           r"WHEN\s+MATCHED\s+THEN\s+UPDATE\s+SET\s+(.+?)\s*$", re.IGNORECASE | re.DOTALL)
+_DELETE_USING = re.compile(r"^\s*DELETE\s+FROM\s+(\S+)\s+USING\s+(\S+)\s+WHERE\s+(.+?)\s*$",
+                           re.IGNORECASE | re.DOTALL)
+
+
+def _translate(sql: str) -> str:
+    match = _SHOW_TABLES.match(sql)
+    if match:
+        return f"SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '{match.group(1)}'"
+    match = _MERGE_UPDATE.match(sql)
+    if match:
+        target, target_alias, source, source_alias, condition, assignments = match.groups()
+        sql = (f"UPDATE {target} AS {target_alias} SET {assignments} FROM {source} AS {source_alias} "
+               f"WHERE {condition}")
+    match = _DELETE_USING.match(sql)
+    if match:
+        target, source, condition = match.groups()
+        sql = f"DELETE FROM {target} WHERE EXISTS (SELECT 1 FROM {source} WHERE {condition})"
+    return _PARAM.sub(lambda m: f":{m.group(1)}" if m.group(1) else "?", sql)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class _HashAgg:
+    """An order-independent hash of the rows passed to it, like Snowflake's HASH_AGG."""
+
+    def __init__(self):
+        self.total = 0
+
+    def step(self, *values):
+        digest = hashlib.blake2b(repr(values).encode(), digest_size=8).digest()
+        self.total = (self.total + int.from_bytes(digest, "little")) % 2 ** 63
+
+    def finalize(self):
+        return self.total
+
+
+class LocalCursor(sqlite3.Cursor):
+    """sqlite3 cursor that accepts the Snowflake/MySQL parameter style."""
+
+    def execute(self, sql, params=None):
+        match = _CREATE_OR_REPLACE.match(sql)
+        if match:
+            super().execute(f"DROP TABLE IF EXISTS {match.group(1)}")
+            sql = _CREATE_OR_REPLACE.sub(r"CREATE TABLE \1", sql, count=1)
+        return super().execute(_translate(sql), params if params is not None else ())
+
+    def executemany(self, sql, seq_of_params):
+        return super().executemany(_translate(sql), seq_of_params)
+
+    def fetch_arrow_batches(self, batch_size=65536):
+        """Yields the remaining rows as pyarrow Tables, like the Snowflake connector's method."""
+        import pyarrow as pa
+
+        names = [column[0] for column in self.description]
+        while True:
+            rows = self.fetchmany(batch_size)
+            if not rows:
+                break
+            yield pa.table(dict(zip(names, map(list, zip(*rows)))))
+
+
+class LocalConnection(sqlite3.Connection):
+    """sqlite3 connection exposing the liveness methods of the real drivers."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._closed = False
+
+    def cursor(self, factory=LocalCursor, dictionary=False, **kwargs):
+        # Extra keyword arguments (e.g. MySQL's buffered=) have no SQLite equivalent.
+        cursor = super().cursor(factory)
+        if dictionary:
+            cursor.row_factory = _dict_row
+        return cursor
+
+    def close(self):
+        self._closed = True
+        super().close()
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def is_connected(self) -> bool:
+        return not self._closed
+
+
+def connect(database=":memory:", **kwargs) -> LocalConnection:
+    """
+    Opens a local stand-in connection in autocommit mode.
+
+    Args:
+        database (str): SQLite database file, or ':memory:' for a private in-memory database.
+        **kwargs: Driver connection arguments (user, password, ...) are accepted and ignored.
+    """
+    connection = sqlite3.connect(database, factory=LocalConnection, isolation_level=None, check_same_thread=False)
+    connection.create_aggregate("HASH_AGG", -1, _HashAgg)
+    if database != ":memory:":
+        # WAL lets one connection write while others hold open read cursors, as the
+        # real warehouses do.
+        connection.execute("PRAGMA journal_mode=WAL")
+    return connection
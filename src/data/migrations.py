@@ -1,43 +1,153 @@
 # src/data/migrations.py
+import argparse
 
-from db import SnowflakeDB
-from models import USER_TABLE
+from .db import SnowflakeDB
+from .models import TABLE_SCHEMAS
+from src.utils.logger import get_logger
+
+logger = get_logger("data.migrations")
+
+# INFORMATION_SCHEMA reports the canonical type behind each synonym (INT -> NUMBER,
+# VARCHAR -> TEXT, ...). Declared types are mapped the same way before comparing,
+# so a column declared INT is not re-typed on every run.
+TYPE_SYNONYMS = {
+    "INT": "NUMBER", "INTEGER": "NUMBER", "BIGINT": "NUMBER", "SMALLINT": "NUMBER", "TINYINT": "NUMBER",
+    "BYTEINT": "NUMBER", "DECIMAL": "NUMBER", "NUMERIC": "NUMBER",
+    "DOUBLE": "FLOAT", "DOUBLE PRECISION": "FLOAT", "REAL": "FLOAT", "FLOAT4": "FLOAT", "FLOAT8": "FLOAT",
+    "VARCHAR": "TEXT", "STRING": "TEXT", "CHAR": "TEXT", "CHARACTER": "TEXT",
+    "DATETIME": "TIMESTAMP_NTZ",
+}
+
+# Column properties that may follow a declared type; they are not part of the
+# type INFORMATION_SCHEMA reports. Columns with them are generated by the
+# warehouse and cannot simply be added to a table that already holds rows.
+COLUMN_PROPERTIES = {"AUTOINCREMENT", "IDENTITY"}
 
 
 class MigrationManager:
+    """
+    Brings the tables defined in models.py in line with the warehouse.
+
+    The current schema of every table is read with a single INFORMATION_SCHEMA
+    query and diffed against the definitions into a plan. The plan is rendered
+    as the fewest statements that apply it, with at most one ALTER TABLE per kind
+    of change per table: all added columns in one ADD COLUMN, all dropped
+    columns in one DROP COLUMN, and all type/default changes in one ALTER COLUMN
+    list. The statements are then sent together in one round trip, or only
+    returned in dry-run mode.
+    """
+
     def __init__(self, db: SnowflakeDB):
         self.db = db
 
-    def get_current_schema(self, table_name: str) -> dict:
+    @staticmethod
+    def normalize_type(data_type) -> str:
+        if not data_type:
+            return None
+        data_type = data_type.upper().strip()
+        base = data_type.split("(")[0].strip()
+        # Column properties such as AUTOINCREMENT are not part of the reported type.
+        base = " ".join(word for word in base.split() if word not in COLUMN_PROPERTIES)
+        return TYPE_SYNONYMS.get(base, base)
+
+    @staticmethod
+    def is_generated(data_type) -> bool:
+        """Whether a declared type carries a property such as AUTOINCREMENT."""
+        return bool(data_type) and any(word in COLUMN_PROPERTIES for word in data_type.upper().split())
+
+    @staticmethod
+    def normalize_table_def(table_def: dict) -> dict:
+        """Returns {column (lowercase): {"type", "default"}} for a models.py table definition."""
+        normalized = {}
+        for col, spec in table_def["columns"].items():
+            if isinstance(spec, dict):
+                normalized[col.lower()] = {
+                    "type": spec.get("type", "").upper(),
+                    "default": str(spec.get("default")).upper() if spec.get("default") is not None else None
+                }
+            else:
+                normalized[col.lower()] = {"type": spec.upper(), "default": None}
+        return normalized
+
+    def get_current_schemas(self, table_names) -> dict:
         """
-        Query Snowflake's INFORMATION_SCHEMA to get the current table schema.
-        Returns a dictionary with column names as keys and a dict of type and default.
+        Query Snowflake's INFORMATION_SCHEMA once for the columns of all the given tables.
+        Returns {table name (uppercase): {column (lowercase): {"type", "default"}}};
+        tables that do not exist are absent.
         """
+        table_names = [name.upper() for name in table_names]
+        if not table_names:
+            return {}
+        placeholders = ", ".join(["%s"] * len(table_names))
         sql = f"""
-            SELECT COLUMN_NAME, DATA_TYPE, COLUMN_DEFAULT
+            SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLUMN_DEFAULT
             FROM INFORMATION_SCHEMA.COLUMNS
-            WHERE TABLE_NAME = '{table_name.upper()}'
+            WHERE TABLE_SCHEMA = CURRENT_SCHEMA() AND TABLE_NAME IN ({placeholders})
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
         """
-        rows = self.db.execute_query(sql)
-        schema = {}
-        for row in rows:
-            col_name, data_type, column_default = row
+        schemas = {}
+        for table_name, col_name, data_type, column_default in self.db.execute_query(sql, tuple(table_names)):
             # Normalize column names to lowercase for easier comparison.
-            schema[col_name.lower()] = {
+            schemas.setdefault(table_name.upper(), {})[col_name.lower()] = {
                 "type": data_type.upper() if data_type else None,
                 "default": str(column_default).upper() if column_default is not None else None
             }
-        return schema
+        return schemas
 
-    def create_table(self, table_def: dict):
+    def get_current_schema(self, table_name: str) -> dict:
         """
-        Create a new table in Snowflake based on the desired schema defined in table_def.
+        Returns the current schema of one table as a dictionary with column names
+        as keys and a dict of type and default (empty if the table does not exist).
         """
-        table_name = table_def["name"]
-        desired_columns = table_def["columns"]
+        return self.get_current_schemas([table_name]).get(table_name.upper(), {})
+
+    def plan(self, table_defs=None) -> list:
+        """
+        Diffs the desired schemas against the warehouse.
+
+        Args:
+            table_defs (list, optional): Table definitions; defaults to every table in models.py.
 
+        Returns:
+            list: One entry per table that needs changes, with its 'name', the full
+            'table_def' and 'create' (bool), or the columns to 'add', 'drop' and 'modify'.
+        """
+        table_defs = list(TABLE_SCHEMAS.values()) if table_defs is None else list(table_defs)
+        current_schemas = self.get_current_schemas([table_def["name"] for table_def in table_defs])
+
+        plan = []
+        for table_def in table_defs:
+            table_name = table_def["name"]
+            desired = self.normalize_table_def(table_def)
+            current = current_schemas.get(table_name.upper())
+            if not current:
+                plan.append({"name": table_name, "table_def": table_def, "create": True})
+                continue
+            missing = {col: spec for col, spec in desired.items() if col not in current}
+            generated = [col for col, spec in missing.items() if self.is_generated(spec["type"])]
+            if generated:
+                # Existing rows would need values assigned; that takes a planned backfill.
+                logger.warning(f"Not adding generated column(s) {', '.join(generated)} to existing table "
+                               f"{table_name}; backfill them manually.")
+            change = {
+                "name": table_name,
+                "table_def": table_def,
+                "create": False,
+                "add": {col: spec for col, spec in missing.items() if col not in generated},
+                "drop": [col for col in current if col not in desired],
+                "modify": {
+                    col: spec for col, spec in desired.items()
+                    if col in current and not self.compare_column_specs(spec, current[col])
+                },
+            }
+            if change["add"] or change["drop"] or change["modify"]:
+                plan.append(change)
+        return plan
+
+    @staticmethod
+    def create_table_sql(table_def: dict) -> str:
         columns_defs = []
-        for col, spec in desired_columns.items():
+        for col, spec in table_def["columns"].items():
             if isinstance(spec, dict):
                 col_def = f"{col} {spec.get('type')}"
                 if spec.get("default") is not None:
@@ -46,123 +156,144 @@ class MigrationManager:
                 # If spec is provided as a simple string.
                 col_def = f"{col} {spec}"
             columns_defs.append(col_def)
+        return f"CREATE TABLE {table_def['name']} ({', '.join(columns_defs)})"
 
-        cols_sql = ", ".join(columns_defs)
-        sql = f"CREATE TABLE {table_name} ({cols_sql})"
-        print(f"Creating table with: {sql}")
-        self.db.execute_query(sql)
-        print(f"Table '{table_name}' created successfully.")
+    @staticmethod
+    def add_columns_sql(table_name: str, columns: dict) -> str:
+        """One ALTER TABLE ... ADD COLUMN for all the given columns."""
+        column_defs = []
+        for col, spec in columns.items():
+            col_def = f"{col} {spec['type']}"
+            if spec.get("default"):
+                col_def += f" DEFAULT {spec['default']}"
+            column_defs.append(col_def)
+        return f"ALTER TABLE {table_name} ADD COLUMN {', '.join(column_defs)}"
+
+    @staticmethod
+    def drop_columns_sql(table_name: str, columns) -> str:
+        """One ALTER TABLE ... DROP COLUMN for all the given columns."""
+        return f"ALTER TABLE {table_name} DROP COLUMN {', '.join(columns)}"
 
-    def migrate_table(self, table_def: dict):
+    @staticmethod
+    def modify_columns_sql(table_name: str, columns: dict) -> str:
+        """One ALTER TABLE ... ALTER statement setting the type and default of all the given columns."""
+        actions = []
+        for col, spec in columns.items():
+            actions.append(f"COLUMN {col} TYPE {spec['type']}")
+            if spec.get("default"):
+                actions.append(f"COLUMN {col} SET DEFAULT {spec['default']}")
+            else:
+                actions.append(f"COLUMN {col} DROP DEFAULT")
+        return f"ALTER TABLE {table_name} ALTER {', '.join(actions)}"
+
+    def statements_for(self, plan: list) -> list:
+        """Renders a plan as SQL, with at most one statement per kind of change per table."""
+        statements = []
+        for change in plan:
+            if change["create"]:
+                statements.append(self.create_table_sql(change["table_def"]))
+                continue
+            if change["add"]:
+                statements.append(self.add_columns_sql(change["name"], change["add"]))
+            if change["drop"]:
+                statements.append(self.drop_columns_sql(change["name"], change["drop"]))
+            if change["modify"]:
+                statements.append(self.modify_columns_sql(change["name"], change["modify"]))
+        return statements
+
+    def migrate(self, table_defs=None, dry_run: bool = False) -> list:
+        """
+        Plans and applies the migration of the given tables (default: all of models.py).
+
+        Args:
+            table_defs (list, optional): Table definitions to migrate.
+            dry_run (bool): If True, only log and return the statements.
+
+        Returns:
+            list: The SQL statements of the plan.
+        """
+        statements = self.statements_for(self.plan(table_defs))
+        if not statements:
+            logger.info("Schema is up to date.")
+            return statements
+        for sql in statements:
+            logger.info(f"{'Would execute' if dry_run else 'Executing'}: {sql}")
+        if not dry_run:
+            self.db.execute_script(statements)
+            logger.info(f"Applied {len(statements)} schema statements.")
+        return statements
+
+    def migrate_table(self, table_def: dict, dry_run: bool = False) -> list:
         """
         Compare the desired schema (from models.py) with the current schema in Snowflake.
-        If the table doesn't exist, it creates it.
-        For differences, generate the appropriate ALTER TABLE statements.
+        If the table doesn't exist, it creates it; otherwise the differences are applied
+        as combined ALTER TABLE statements.
         """
-        table_name = table_def["name"]
-        desired_columns = table_def["columns"]
+        return self.migrate([table_def], dry_run=dry_run)
 
-        # Normalize desired schema: ensure column names are lowercase.
-        normalized_desired = {}
-        for col, spec in desired_columns.items():
-            if isinstance(spec, dict):
-                normalized_desired[col.lower()] = {
-                    "type": spec.get("type", "").upper(),
-                    "default": str(spec.get("default")).upper() if spec.get("default") is not None else None
-                }
-            else:
-                normalized_desired[col.lower()] = {"type": spec.upper(), "default": None}
-
-        # Get the current schema from Snowflake.
-        current_schema = self.get_current_schema(table_name)
-        print(f"Current schema for table '{table_name}': {current_schema}")
-        print(f"Desired schema for table '{table_name}': {normalized_desired}")
-
-        # If table does not exist, create it.
-        if not current_schema:
-            print(f"Table '{table_name}' does not exist. Creating new table...")
-            self.create_table(table_def)
-            return
-
-        # 1. Add columns that are in desired but not in current.
-        for col, spec in normalized_desired.items():
-            if col not in current_schema:
-                self.add_column(table_name, col, spec)
-
-        # 2. Drop columns that exist in current but not in desired.
-        for col in current_schema:
-            if col not in normalized_desired:
-                self.drop_column(table_name, col)
-
-        # 3. For columns that exist in both, modify if type or default differ.
-        for col, desired_spec in normalized_desired.items():
-            if col in current_schema:
-                current_spec = current_schema[col]
-                if not self.compare_column_specs(desired_spec, current_spec):
-                    self.modify_column(table_name, col, desired_spec)
+    def create_table(self, table_def: dict):
+        """
+        Create a new table in Snowflake based on the desired schema defined in table_def.
+        """
+        sql = self.create_table_sql(table_def)
+        logger.info(f"Creating table with: {sql}")
+        self.db.execute_query(sql)
+        logger.info(f"Table '{table_def['name']}' created successfully.")
 
     def add_column(self, table_name: str, col: str, spec: dict):
         """Generate and execute ALTER TABLE ADD COLUMN."""
-        sql = f"ALTER TABLE {table_name} ADD COLUMN {col} {spec['type']}"
-        if spec.get("default"):
-            sql += f" DEFAULT {spec['default']}"
-        print(f"Executing: {sql}")
+        sql = self.add_columns_sql(table_name, {col: spec})
+        logger.info(f"Executing: {sql}")
         self.db.execute_query(sql)
-        print(f"Added column '{col}' to table '{table_name}'.")
+        logger.info(f"Added column '{col}' to table '{table_name}'.")
 
     def drop_column(self, table_name: str, col: str):
         """Generate and execute ALTER TABLE DROP COLUMN."""
-        sql = f"ALTER TABLE {table_name} DROP COLUMN {col}"
-        print(f"Executing: {sql}")
+        sql = self.drop_columns_sql(table_name, [col])
+        logger.info(f"Executing: {sql}")
         self.db.execute_query(sql)
-        print(f"Dropped column '{col}' from table '{table_name}'.")
+        logger.info(f"Dropped column '{col}' from table '{table_name}'.")
 
     def modify_column(self, table_name: str, col: str, spec: dict):
         """
-        Generate and execute ALTER TABLE commands to modify the column type
+        Generate and execute one ALTER TABLE statement that modifies the column type
         and default value.
         """
-        sql_type = f"ALTER TABLE {table_name} ALTER COLUMN {col} TYPE {spec['type']}"
-        print(f"Executing: {sql_type}")
-        self.db.execute_query(sql_type)
-
-        if spec.get("default"):
-            sql_default = f"ALTER TABLE {table_name} ALTER COLUMN {col} SET DEFAULT {spec['default']}"
-        else:
-            sql_default = f"ALTER TABLE {table_name} ALTER COLUMN {col} DROP DEFAULT"
-        print(f"Executing: {sql_default}")
-        self.db.execute_query(sql_default)
-        print(f"Modified column '{col}' in table '{table_name}'.")
+        sql = self.modify_columns_sql(table_name, {col: spec})
+        logger.info(f"Executing: {sql}")
+        self.db.execute_query(sql)
+        logger.info(f"Modified column '{col}' in table '{table_name}'.")
 
     def compare_column_specs(self, desired: dict, current: dict) -> bool:
         """
         Compare desired and current column specifications.
         Returns True if they match; otherwise, False.
         """
-        if desired["type"] != current["type"]:
+        if self.normalize_type(desired["type"]) != self.normalize_type(current["type"]):
             return False
         if desired.get("default") != current.get("default"):
             return False
         return True
 
 
-# --- Example Usage ---
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the tables defined in models.py.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without applying it.")
+    parser.add_argument("--table", action="append", help="Only migrate this table (repeatable).")
+    args = parser.parse_args()
 
-if __name__ == "__main__":
-    # Initialize your SnowflakeDB instance.
-    # Replace the placeholders with your actual Snowflake credentials and parameters.
-    db = SnowflakeDB(
-        user="YOUR_USER",
-        password="YOUR_PASSWORD",
-        account="YOUR_ACCOUNT",
-        warehouse="YOUR_WAREHOUSE",
-        database="YOUR_DATABASE",
-        schema="YOUR_SCHEMA"
-    )
-
-    migration_manager = MigrationManager(db)
+    table_defs = None
+    if args.table:
+        table_defs = [TABLE_SCHEMAS[name.upper()] for name in args.table]
+
+    db = SnowflakeDB()
     try:
-        # Migrate the users table defined in models.py.
-        migration_manager.migrate_table(USER_TABLE)
+        statements = MigrationManager(db).migrate(table_defs, dry_run=args.dry_run)
+        for sql in statements:
+            print(f"{sql};")
     finally:
         db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
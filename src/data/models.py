@@ -11,4 +11,56 @@ BANKNOTE_ORI_TABLE = {
         "entropy": {"type": "FLOAT", "default": None},
         "class": {"type": "INT", "default": None},
     }
-}
\ No newline at end of file
+}
+
+# Source table scored by the prediction service and read by training. ID is
+# assigned by the warehouse on insert and only grows, so it is the watermark the
+# incremental scorer checkpoints on. Tables created before ID was declared do
+# not have it, and migrations do not add it to a populated table.
+BANKNOTE_SOURCE_TABLE = {
+    "name": "BANK_NOTE_TB",
+    "columns": {
+        "ID": {"type": "BIGINT AUTOINCREMENT", "default": None},
+        "VARIANCE": {"type": "FLOAT", "default": None},
+        "SKEWNESS": {"type": "FLOAT", "default": None},
+        "CURTOSIS": {"type": "FLOAT", "default": None},
+        "ENTROPY": {"type": "FLOAT", "default": None},
+        "CLASS": {"type": "INT", "default": None},
+    }
+}
+WATERMARK_COLUMN = "ID"
+
+# Output of the prediction service. Column names match the scored DataFrame
+# exactly, since insert_dataframe quotes them to preserve their case.
+BANKNOTE_PRED_TABLE = {
+    "name": "BANK_NOTE_PRED",
+    "columns": {
+        "VARIANCE": {"type": "FLOAT", "default": None},
+        "SKEWNESS": {"type": "FLOAT", "default": None},
+        "CURTOSIS": {"type": "FLOAT", "default": None},
+        "ENTROPY": {"type": "FLOAT", "default": None},
+        "product_feature": {"type": "FLOAT", "default": None},
+        "sum_feature": {"type": "FLOAT", "default": None},
+        "ratio_feature": {"type": "FLOAT", "default": None},
+        "complex_feature": {"type": "FLOAT", "default": None},
+        "prediction": {"type": "INT", "default": None},
+        # Deterministic hash of the source row, used to make writes idempotent.
+        "ROW_KEY": {"type": "BIGINT", "default": None},
+    }
+}
+
+# Last scored watermark per source table, maintained by CheckpointStore.
+SCORING_CHECKPOINT_TABLE = {
+    "name": "SCORING_CHECKPOINTS",
+    "columns": {
+        "SOURCE_TABLE": {"type": "VARCHAR", "default": None},
+        "WATERMARK": {"type": "VARCHAR", "default": None},
+        "UPDATED_AT": {"type": "TIMESTAMP_NTZ", "default": None},
+    }
+}
+
+# Every table definition above, keyed by upper-cased table name.
+TABLE_SCHEMAS = {
+    table_def["name"].upper(): table_def
+    for table_def in (BANKNOTE_ORI_TABLE, BANKNOTE_SOURCE_TABLE, BANKNOTE_PRED_TABLE, SCORING_CHECKPOINT_TABLE)
+}
@@ -0,0 +1,177 @@
+# src/data/pool.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the checkout timeout."""
+
+
+def is_alive(connection) -> bool:
+    """
+    Default liveness check for DB-API connections.
+
+    Uses the driver's own state flag when it has one (Snowflake's is_closed(),
+    MySQL's is_connected()) and then runs a trivial round trip to catch
+    connections the server has dropped.
+    """
+    if hasattr(connection, "is_closed") and connection.is_closed():
+        return False
+    if hasattr(connection, "is_connected") and not connection.is_connected():
+        return False
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        return True
+    except Exception:
+        return False
+    finally:
+        cursor.close()
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of database connections.
+
+    Connections are created by `factory` up to `max_size`, and `min_size` of them
+    are opened eagerly. A checkout waits up to `timeout` seconds for a free
+    connection before raising PoolTimeoutError. Connections idle for longer than
+    `validate_interval` seconds are checked with `validate` on checkout and
+    replaced if they are dead. The most recently returned connection is handed
+    out first so the rest of the pool can age out cleanly.
+    """
+
+    def __init__(self, factory, min_size=1, max_size=8, timeout=30.0, validate=is_alive, validate_interval=30.0):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(f"Invalid pool bounds: min_size={min_size}, max_size={max_size}")
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.validate = validate
+        self.validate_interval = validate_interval
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        for _ in range(min_size):
+            self._idle.append((self.factory(), time.monotonic()))
+            self._size += 1
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, idle or checked out."""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def acquire(self, timeout=None):
+        """
+        Checks out a live connection.
+
+        Args:
+            timeout (float, optional): Seconds to wait; defaults to the pool's timeout.
+
+        Returns:
+            A DB-API connection that must be given back with release().
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise Exception("Connection pool is closed")
+                    if self._idle:
+                        connection, last_used = self._idle.pop()
+                        create = False
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"No connection available after {timeout}s (pool size {self.max_size})")
+                    self._cond.wait(remaining)
+
+            if create:
+                try:
+                    return self.factory()
+                except Exception:
+                    self._forget()
+                    raise
+
+            if self.validate is None or time.monotonic() - last_used < self.validate_interval:
+                return connection
+            if self.validate(connection):
+                return connection
+            # Dead connection: drop it and try again with the same deadline.
+            self._discard(connection)
+
+    def release(self, connection, discard=False):
+        """Returns a connection to the pool, or closes it if `discard` is True or the pool is closed."""
+        with self._cond:
+            if not discard and not self._closed:
+                self._idle.append((connection, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(connection)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Context manager that checks out a connection and always returns it.
+
+        The connection is discarded rather than reused when the block raises a
+        driver error, since its state is then unknown. It is released normally
+        when a streaming reader holding it is closed early (GeneratorExit).
+        """
+        connection = self.acquire(timeout)
+        discard = False
+        try:
+            yield connection
+        except Exception:
+            discard = not (self.validate is None or self.validate(connection))
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    def close(self):
+        """Closes every idle connection; checked-out connections are closed when released."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def _discard(self, connection):
+        self._close_quietly(connection)
+        self._forget()
+
+    def _forget(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
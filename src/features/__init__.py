@@ -1,9 +1,20 @@
-# src/feature_engineering/__init__.py
+# src/features/__init__.py
+from src.utils.lazy import lazy_exports
 
-# Import the database connection class from db.py
-from .feature_engineering import FeatureCreation
+# Public names and the submodule defining each, imported on first access (PEP 562).
+_EXPORTS = {
+    # The feature creation facade from feature_engineering.py
+    "FeatureCreation": ".feature_engineering",
+    # The fused feature engine and its registry from feature_engine.py
+    "FeatureEngine": ".feature_engine",
+    "register_feature": ".feature_engine",
+    "BASE_COLUMNS": ".feature_engine",
+    # The versioned columnar feature store from feature_store.py
+    "FeatureStore": ".feature_store",
+    "feature_definition_hash": ".feature_store",
+    "snapshot_id": ".feature_store",
+}
 
 # Optional: Define __all__ to explicitly declare the public API of this package.
-__all__ = [
-    "FeatureCreation"
-]
\ No newline at end of file
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+
+# Raw measurement columns every feature is derived from, in model order.
+BASE_COLUMNS = ("VARIANCE", "SKEWNESS", "CURTOSIS", "ENTROPY")
+
+# Registry of derived features: name -> function(v, s, c, e, out, scratch).
+# Each function writes its result into the preallocated `out` row and may use
+# `scratch` as a temporary buffer of the same length, so no result arrays are allocated.
+FEATURE_REGISTRY = {}
+
+
+def register_feature(name):
+    """
+    Decorator that registers a derived feature with the engine.
+
+    Features are computed in registration order and appended after BASE_COLUMNS,
+    so adding a feature here adds a column to every engine created afterwards.
+    """
+    def decorator(func):
+        if name in FEATURE_REGISTRY or name in BASE_COLUMNS:
+            raise ValueError(f"Feature '{name}' is already registered.")
+        FEATURE_REGISTRY[name] = func
+        return func
+    return decorator
+
+
+@register_feature("product_feature")
+def _product(v, s, c, e, out, scratch):
+    """VARIANCE * SKEWNESS * CURTOSIS * ENTROPY"""
+    np.multiply(v, s, out=out)
+    np.multiply(out, c, out=out)
+    np.multiply(out, e, out=out)
+
+
+@register_feature("sum_feature")
+def _sum(v, s, c, e, out, scratch):
+    """VARIANCE + SKEWNESS + CURTOSIS + ENTROPY, skipping NaN like DataFrame.sum(axis=1)"""
+    out.fill(0.0)
+    for column in (v, s, c, e):
+        np.copyto(scratch, column)
+        np.nan_to_num(scratch, copy=False, nan=0.0, posinf=np.inf, neginf=-np.inf)
+        np.add(out, scratch, out=out)
+
+
+@register_feature("ratio_feature")
+def _ratio(v, s, c, e, out, scratch):
+    """VARIANCE / (ENTROPY + 1)"""
+    np.add(e, 1.0, out=out)
+    np.divide(v, out, out=out)
+
+
+@register_feature("complex_feature")
+def _complex(v, s, c, e, out, scratch):
+    """(VARIANCE + SKEWNESS) * (CURTOSIS - ENTROPY)"""
+    np.add(v, s, out=out)
+    np.subtract(c, e, out=scratch)
+    np.multiply(out, scratch, out=out)
+
+
+class FeatureEngine:
+    """
+    Computes every registered feature in a single vectorized pass.
+
+    The base columns are copied once into a contiguous float64 block laid out
+    feature-major (one contiguous row per feature), and each registered feature
+    writes straight into its own row of that block, so no intermediate
+    DataFrames are created.
+    """
+
+    def __init__(self, features=None):
+        names = list(FEATURE_REGISTRY) if features is None else list(features)
+        unknown = [name for name in names if name not in FEATURE_REGISTRY]
+        if unknown:
+            raise ValueError(f"Unknown features: {unknown}")
+        self.features = names
+        self._funcs = [FEATURE_REGISTRY[name] for name in names]
+
+    @property
+    def feature_names(self):
+        """Column names of the full feature matrix, in the order the model expects."""
+        return list(BASE_COLUMNS) + self.features
+
+    def allocate(self, n_rows: int) -> np.ndarray:
+        """Allocates an output block that can be reused across calls to compute()."""
+        return np.empty((len(BASE_COLUMNS) + len(self.features), n_rows), dtype=np.float64)
+
+    def compute(self, values: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Computes the feature matrix from raw measurements.
+
+        Parameters:
+            values (np.ndarray): Array of shape (n_rows, 4) holding BASE_COLUMNS.
+            out (np.ndarray, optional): Block from allocate() with at least n_rows columns.
+
+        Returns:
+            np.ndarray: Array of shape (n_rows, n_features), a transposed view of the block.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[1] != len(BASE_COLUMNS):
+            raise ValueError(f"Expected an array of shape (n_rows, {len(BASE_COLUMNS)}), got {values.shape}")
+        n_rows = values.shape[0]
+        if out is None:
+            out = self.allocate(n_rows)
+        elif out.shape[0] != len(self.feature_names) or out.shape[1] < n_rows:
+            raise ValueError(f"Output block of shape {out.shape} is too small for {n_rows} rows")
+        block = out[:, :n_rows]
+        block[:len(BASE_COLUMNS)] = values.T
+        self._fill(block)
+        return block.T
+
+    def transform(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """
+        Adds every registered feature column to a DataFrame.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame containing BASE_COLUMNS.
+            inplace (bool): If True, the feature columns are added to `df` itself
+                instead of to a shallow copy of it.
+
+        Returns:
+            pd.DataFrame: DataFrame with the original columns plus the derived features.
+        """
+        n_rows = len(df)
+        block = np.empty((len(BASE_COLUMNS) + len(self.features), n_rows), dtype=np.float64)
+        for i, col in enumerate(BASE_COLUMNS):
+            block[i] = df[col].to_numpy(dtype=np.float64, copy=False)
+        self._fill(block)
+
+        if not inplace:
+            df = df.copy(deep=False)
+        offset = len(BASE_COLUMNS)
+        for i, name in enumerate(self.features):
+            df[name] = block[offset + i]
+        return df
+
+    def _fill(self, block: np.ndarray):
+        """Runs each registered feature into its row of `block`."""
+        v, s, c, e = block[:len(BASE_COLUMNS)]
+        scratch = np.empty(block.shape[1], dtype=np.float64)
+        offset = len(BASE_COLUMNS)
+        for i, func in enumerate(self._funcs):
+            func(v, s, c, e, block[offset + i], scratch)
@@ -1,4 +1,5 @@
 import pandas as pd
+from .feature_engine import FeatureEngine
 
 
 class FeatureCreation:
@@ -45,18 +46,15 @@ class FeatureCreation:
         return df
 
     @staticmethod
-    def main_feature_creation(df: pd.DataFrame) -> pd.DataFrame:
+    def main_feature_creation(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
-        Applies all feature creation methods one by one.
+        Applies all registered feature creation functions in a single pass.
 
         Parameters:
-            df (pd.DataFrame): DataFrame containing columns 'variance', 'skewness', 'curtosis', and 'entropy'.
+            df (pd.DataFrame): DataFrame containing columns 'VARIANCE', 'SKEWNESS', 'CURTOSIS', and 'ENTROPY'.
+            inplace (bool): If True, add the features to `df` itself rather than to a shallow copy.
 
         Returns:
             pd.DataFrame: DataFrame containing the original columns along with the newly created features.
         """
-        df = FeatureCreation.add_product_feature(df)
-        df = FeatureCreation.add_sum_feature(df)
-        df = FeatureCreation.add_ratio_feature(df)
-        df = FeatureCreation.add_complex_feature(df)
-        return df
\ No newline at end of file
+        return FeatureEngine().transform(df, inplace=inplace)
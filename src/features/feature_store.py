@@ -0,0 +1,182 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .feature_engine import BASE_COLUMNS, FEATURE_REGISTRY, FeatureEngine
+
+# Default location of the store, resolved from the project root so it does not
+# depend on the working directory.
+FEATURE_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "features")
+
+
+def feature_definition_hash(engine: FeatureEngine = None) -> str:
+    """
+    Hashes the engine's feature list and the source of every feature function.
+
+    Editing, adding or removing a registered feature changes the hash, so features
+    computed under an old definition are never read back as current.
+    """
+    engine = engine or FeatureEngine()
+    digest = hashlib.sha256()
+    for name in engine.feature_names:
+        digest.update(name.encode())
+        if name in FEATURE_REGISTRY:
+            digest.update(inspect.getsource(FEATURE_REGISTRY[name]).encode())
+    return digest.hexdigest()[:12]
+
+
+def snapshot_id(*parts) -> str:
+    """Builds a short, stable identifier for a source data snapshot (e.g. table name and row count)."""
+    return hashlib.sha256("|".join(map(str, parts)).encode()).hexdigest()[:12]
+
+
+class FeatureStore:
+    """
+    A local store of computed feature matrices as versioned columnar files.
+
+    A version is named '<snapshot>-<definition hash>' and is a directory holding
+    one .npy file per column per segment plus a manifest.json. Reads memory-map
+    the files, so a single-segment column is returned without copying. append()
+    adds a new segment for a batch of rows and publishes it by atomically
+    replacing the manifest; compact() merges segments back into one.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root=FEATURE_STORE_DIR, engine: FeatureEngine = None):
+        self.root = os.path.abspath(root)
+        self.engine = engine or FeatureEngine()
+        self.definition_hash = feature_definition_hash(self.engine)
+
+    def version_for(self, snapshot: str) -> str:
+        return f"{snapshot}-{self.definition_hash}"
+
+    def exists(self, version: str) -> bool:
+        return os.path.isfile(os.path.join(self.root, version, self.MANIFEST))
+
+    def list_versions(self) -> list:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if self.exists(name))
+
+    def read_manifest(self, version: str) -> dict:
+        with open(os.path.join(self.root, version, self.MANIFEST), "r") as file:
+            return json.load(file)
+
+    def write(self, snapshot: str, df: pd.DataFrame) -> str:
+        """
+        Creates (or replaces) the version for a snapshot from an already featurized DataFrame.
+        Columns must be numeric so they can be stored as plain .npy files.
+
+        Returns:
+            str: The version name.
+        """
+        version = self.version_for(snapshot)
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{version}-", dir=self.root)
+        try:
+            os.chmod(tmp_dir, 0o755)
+            manifest = {
+                "version": version,
+                "snapshot": snapshot,
+                "definition_hash": self.definition_hash,
+                "columns": {col: str(df[col].dtype) for col in df.columns},
+                "segments": [],
+                "rows": 0,
+            }
+            self._write_segment(tmp_dir, manifest, df)
+            self._write_manifest(tmp_dir, manifest)
+            version_dir = os.path.join(self.root, version)
+            old_dir = None
+            if os.path.isdir(version_dir):
+                # Move the old version aside first; open memory maps stay valid.
+                old_dir = tempfile.mkdtemp(prefix=f".{version}-old-", dir=self.root)
+                os.rename(version_dir, os.path.join(old_dir, version))
+            os.rename(tmp_dir, version_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+        return version
+
+    def append(self, version: str, df: pd.DataFrame) -> int:
+        """
+        Adds a batch of featurized rows to a version as a new segment.
+
+        Returns:
+            int: Total rows in the version after the append.
+        """
+        manifest = self.read_manifest(version)
+        if list(df.columns) != list(manifest["columns"]):
+            raise ValueError(f"Columns {list(df.columns)} do not match version {version}: "
+                             f"{list(manifest['columns'])}")
+        version_dir = os.path.join(self.root, version)
+        self._write_segment(version_dir, manifest, df)
+        self._write_manifest(version_dir, manifest)
+        return manifest["rows"]
+
+    def read(self, version: str, columns=None) -> dict:
+        """
+        Returns the version's columns as NumPy arrays.
+
+        Single-segment columns are read-only memory maps of the stored files; columns
+        spread over several segments are concatenated (call compact() to avoid that).
+        """
+        manifest = self.read_manifest(version)
+        columns = list(manifest["columns"]) if columns is None else list(columns)
+        version_dir = os.path.join(self.root, version)
+        arrays = {}
+        for col in columns:
+            parts = [
+                np.load(self._column_path(version_dir, col, segment["id"]), mmap_mode="r")
+                for segment in manifest["segments"]
+            ]
+            arrays[col] = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return arrays
+
+    def read_frame(self, version: str, columns=None) -> pd.DataFrame:
+        """Returns the version as a DataFrame."""
+        return pd.DataFrame(self.read(version, columns), copy=False)
+
+    def compact(self, version: str):
+        """Merges all segments of a version into a single segment."""
+        manifest = self.read_manifest(version)
+        if len(manifest["segments"]) > 1:
+            self.write(manifest["snapshot"], self.read_frame(version))
+
+    def featurize_and_write(self, snapshot: str, df: pd.DataFrame, keep_columns=()) -> str:
+        """Computes features for raw rows with the store's engine and writes them as the snapshot's version."""
+        return self.write(snapshot, self._featurize(df, keep_columns))
+
+    def featurize_and_append(self, version: str, df: pd.DataFrame, keep_columns=()) -> int:
+        """Computes features for a new batch of raw rows (e.g. a stream chunk) and appends them."""
+        return self.append(version, self._featurize(df, keep_columns))
+
+    def _featurize(self, df, keep_columns):
+        features = self.engine.transform(df[list(BASE_COLUMNS) + list(keep_columns)])
+        return features[self.engine.feature_names + list(keep_columns)]
+
+    def _write_segment(self, version_dir, manifest, df):
+        segment_id = len(manifest["segments"])
+        for col in manifest["columns"]:
+            os.makedirs(os.path.join(version_dir, col), exist_ok=True)
+            np.save(self._column_path(version_dir, col, segment_id), df[col].to_numpy())
+        manifest["segments"].append({"id": segment_id, "rows": len(df)})
+        manifest["rows"] += len(df)
+
+    def _write_manifest(self, version_dir, manifest):
+        fd, tmp_path = tempfile.mkstemp(prefix=".manifest-", dir=version_dir)
+        with os.fdopen(fd, "w") as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(tmp_path, os.path.join(version_dir, self.MANIFEST))
+
+    @staticmethod
+    def _column_path(version_dir, col, segment_id):
+        return os.path.join(version_dir, col, f"{segment_id:05d}.npy")
@@ -0,0 +1,23 @@
+# src/models/__init__.py
+from src.utils.lazy import lazy_exports
+
+# Public names and the submodule defining each, imported on first access (PEP 562).
+_EXPORTS = {
+    # The compiled, array-backed forest predictor from prediction_model.py
+    "CompiledForest": ".prediction_model",
+    "compile_forest": ".prediction_model",
+    # Latency-budgeted tree selection and depth capping from compaction.py
+    "compact": ".compaction",
+    "compact_forest": ".compaction",
+    # The versioned, memory-mapped model store from artifact_store.py
+    "ModelArtifactStore": ".artifact_store",
+    "HotSwapModel": ".artifact_store",
+    "load_model": ".model_utils",
+    "predict_features": ".model_utils",
+    # The fingerprint-keyed prediction cache from prediction_cache.py
+    "PredictionCache": ".prediction_cache",
+}
+
+# Optional: Define __all__ to explicitly declare the public API of this package.
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
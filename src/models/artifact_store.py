@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .prediction_model import CompiledForest
+
+# Default location of the versioned store, resolved from the project root so it
+# does not depend on the working directory.
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "artifacts", "models")
+
+
+def _file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelArtifactStore:
+    """
+    A versioned on-disk store of compiled models.
+
+    Each version is a directory holding one .npy file per node array plus a
+    manifest.json (version, feature list, per-array and overall checksums). The
+    arrays are loaded with np.load(mmap_mode='r'), so every process that loads
+    the same version shares one copy of the model pages through the OS page
+    cache. A LATEST file names the active version and is replaced atomically.
+    A version may also keep the sklearn estimator it was compiled from, which
+    scores large batches faster than the compiled arrays (see load_model).
+    """
+
+    MANIFEST = "manifest.json"
+    LATEST = "LATEST"
+    ESTIMATOR = "estimator.pickle"
+
+    def __init__(self, root=ARTIFACT_DIR, cache_size=4):
+        self.root = os.path.abspath(root)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, model: CompiledForest, version=None, metadata=None, activate=True, estimator=None) -> str:
+        """
+        Saves a compiled model as a new version.
+
+        Args:
+            model (CompiledForest): The model to save.
+            version (str, optional): Version name; defaults to the next 'vNNNN'.
+            estimator (optional): The fitted sklearn estimator the model was compiled from, pickled alongside.
+            metadata (dict, optional): Extra JSON-serializable fields for the manifest.
+            activate (bool): If True, point LATEST at the new version.
+
+        Returns:
+            str: The saved version name.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        version = version or self._next_version()
+        tmp_dir = tempfile.mkdtemp(prefix=f".{version}-", dir=self.root)
+        try:
+            os.chmod(tmp_dir, 0o755)
+            arrays = {}
+            for name, array in model.to_arrays().items():
+                file_name = f"{name}.npy"
+                np.save(os.path.join(tmp_dir, file_name), np.ascontiguousarray(array))
+                arrays[name] = {
+                    "file": file_name,
+                    "dtype": str(array.dtype),
+                    "shape": list(array.shape),
+                    "sha256": _file_sha256(os.path.join(tmp_dir, file_name)),
+                }
+            manifest = {
+                "version": version,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "model_type": type(model).__name__,
+                "feature_names": model.feature_names,
+                "n_features": model.n_features,
+                "max_depth": model.max_depth,
+                "arrays": arrays,
+                "checksum": self._combined_checksum(arrays),
+                "metadata": metadata or {},
+            }
+            if estimator is not None:
+                with open(os.path.join(tmp_dir, self.ESTIMATOR), "wb") as file:
+                    pickle.dump(estimator, file)
+                manifest["estimator"] = {
+                    "file": self.ESTIMATOR,
+                    "sha256": _file_sha256(os.path.join(tmp_dir, self.ESTIMATOR)),
+                }
+            with open(os.path.join(tmp_dir, self.MANIFEST), "w") as file:
+                json.dump(manifest, file, indent=2)
+            # Renaming a directory onto an existing one fails, so two writers can
+            # never publish the same version.
+            os.rename(tmp_dir, os.path.join(self.root, version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        if activate:
+            self.set_latest(version)
+        return version
+
+    def list_versions(self) -> list:
+        """Returns all saved versions, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.startswith(".") and os.path.isfile(os.path.join(self.root, name, self.MANIFEST))
+        )
+
+    def latest_version(self):
+        """Returns the version named by LATEST, or None if nothing has been activated."""
+        try:
+            with open(os.path.join(self.root, self.LATEST), "r") as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def set_latest(self, version: str):
+        """Atomically points LATEST at an existing version."""
+        if version not in self.list_versions():
+            raise ValueError(f"Unknown model version '{version}'")
+        fd, tmp_path = tempfile.mkstemp(prefix=".LATEST-", dir=self.root)
+        with os.fdopen(fd, "w") as file:
+            file.write(version)
+        os.replace(tmp_path, os.path.join(self.root, self.LATEST))
+
+    def read_manifest(self, version: str) -> dict:
+        with open(os.path.join(self.root, version, self.MANIFEST), "r") as file:
+            return json.load(file)
+
+    def load(self, version=None) -> CompiledForest:
+        """
+        Loads a version (LATEST by default) with memory-mapped arrays.
+
+        Loaded models are kept in a small LRU cache, so repeated loads of the same
+        version are free.
+        """
+        version = version or self.latest_version()
+        if version is None:
+            raise FileNotFoundError(f"No model version has been activated in {self.root}")
+        with self._lock:
+            if version in self._cache:
+                self._cache.move_to_end(version)
+                return self._cache[version]
+
+        manifest = self.read_manifest(version)
+        version_dir = os.path.join(self.root, version)
+        arrays = {
+            name: np.load(os.path.join(version_dir, spec["file"]), mmap_mode="r", allow_pickle=False)
+            for name, spec in manifest["arrays"].items()
+        }
+        model = CompiledForest.from_arrays(arrays, max_depth=manifest["max_depth"],
+                                           feature_names=manifest["feature_names"],
+                                           n_features=manifest.get("n_features"))
+        model.version = version
+
+        with self._lock:
+            self._cache[version] = model
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return model
+
+    def load_estimator(self, version=None):
+        """
+        Unpickles the sklearn estimator saved with a version (LATEST by default).
+
+        Returns:
+            The fitted estimator, or None when the version was saved without one
+            (e.g. a compacted forest).
+        """
+        version = version or self.latest_version()
+        if version is None:
+            raise FileNotFoundError(f"No model version has been activated in {self.root}")
+        spec = self.read_manifest(version).get("estimator")
+        if spec is None:
+            return None
+        with open(os.path.join(self.root, version, spec["file"]), "rb") as file:
+            estimator = pickle.load(file)
+        estimator.version = version
+        return estimator
+
+    def verify(self, version: str) -> bool:
+        """Recomputes every file checksum of a version and compares it to the manifest."""
+        manifest = self.read_manifest(version)
+        version_dir = os.path.join(self.root, version)
+        specs = list(manifest["arrays"].values())
+        if "estimator" in manifest:
+            specs.append(manifest["estimator"])
+        for spec in specs:
+            if _file_sha256(os.path.join(version_dir, spec["file"])) != spec["sha256"]:
+                return False
+        return self._combined_checksum(manifest["arrays"]) == manifest["checksum"]
+
+    def _next_version(self) -> str:
+        numbers = [int(name[1:]) for name in self.list_versions() if name[:1] == "v" and name[1:].isdigit()]
+        return f"v{max(numbers, default=0) + 1:04d}"
+
+    @staticmethod
+    def _combined_checksum(arrays: dict) -> str:
+        digest = hashlib.sha256()
+        for name in sorted(arrays):
+            digest.update(f"{name}:{arrays[name]['sha256']};".encode())
+        return digest.hexdigest()
+
+
+class HotSwapModel:
+    """
+    A model handle for long-running scorers that follows the store's LATEST version.
+
+    predict() checks LATEST at most once every `check_interval` seconds; when it
+    changes, the new version is loaded and swapped in with a single reference
+    assignment, so in-flight calls finish on the model they started with.
+    """
+
+    def __init__(self, store: ModelArtifactStore, check_interval: float = 5.0):
+        self.store = store
+        self.check_interval = check_interval
+        self.version = None
+        self._model = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    @property
+    def model(self) -> CompiledForest:
+        self.maybe_refresh()
+        return self._model
+
+    def refresh(self) -> bool:
+        """Loads LATEST if it differs from the current version. Returns True if a swap happened."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            latest = self.store.latest_version()
+            if latest is None or latest == self.version:
+                return False
+            model = self.store.load(latest)
+            self._model, self.version = model, latest
+            return True
+
+    def maybe_refresh(self) -> bool:
+        if time.monotonic() - self._last_check < self.check_interval:
+            return False
+        return self.refresh()
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from .artifact_store import ARTIFACT_DIR, ModelArtifactStore
+from .prediction_model import CompiledForest, compile_forest
+
+# Depth caps tried by default; None keeps the trees at full depth.
+DEFAULT_DEPTHS = (None, 16, 12, 10, 8, 6, 5, 4, 3)
+# Tree counts tried by default (clipped to the size of the forest, which is always tried).
+DEFAULT_TREE_COUNTS = (1, 3, 5, 10, 15, 20, 30, 50, 75)
+DEFAULT_TOLERANCE = 0.005
+
+REPORT_PATH = os.path.join(ARTIFACT_DIR, "compaction_report.json")
+
+
+def compact_forest(forest: CompiledForest, trees=None, max_depth=None) -> CompiledForest:
+    """
+    Builds a smaller CompiledForest from a subset of trees, cut off at a maximum depth.
+
+    Nodes below the cap are dropped and the nodes at the cap become leaves that
+    predict their class distribution, exactly as if the trees had stopped
+    growing there. With all trees and no cap, predictions equal the input's.
+
+    Parameters:
+        forest (CompiledForest): Forest to compact.
+        trees (list, optional): Indices of the trees to keep, in order; defaults to all.
+        max_depth (int, optional): Depth cap; None keeps the full depth.
+
+    Returns:
+        CompiledForest: A forest holding only the kept nodes.
+    """
+    trees = list(range(forest.n_trees)) if trees is None else [int(tree) for tree in trees]
+    if len(set(trees)) != len(trees):
+        raise ValueError("compact_forest needs distinct tree indices")
+    depth_cap = forest.max_depth if max_depth is None else min(int(max_depth), forest.max_depth)
+
+    kept, roots = [], []
+    offset = 0
+    depth = 0
+    for tree in trees:
+        # Collect the tree level by level; leaves point to themselves.
+        level = forest.roots[tree:tree + 1]
+        levels = [level]
+        for _ in range(depth_cap):
+            internal = level[forest.children[2 * level] != level]
+            if internal.size == 0:
+                break
+            level = forest.children[np.stack([2 * internal + 1, 2 * internal], axis=1).ravel()]
+            levels.append(level)
+        depth = max(depth, len(levels) - 1)
+        roots.append(offset)
+        offset += sum(len(nodes) for nodes in levels)
+        kept.extend(levels)
+
+    old = np.concatenate(kept)
+    new = np.arange(len(old), dtype=np.intp)
+    new_index = np.full(forest.n_nodes, -1, dtype=np.intp)
+    new_index[old] = new
+    left = new_index[forest.left[old]]
+    right = new_index[forest.right[old]]
+    # Nodes whose children were cut off become leaves.
+    cut = left < 0
+    left = np.where(cut, new, left)
+    right = np.where(cut, new, right)
+
+    return CompiledForest(
+        feature=np.where(cut, 0, forest.feature[old]),
+        threshold=np.where(cut, np.inf, forest.threshold[old]),
+        children=np.stack([right, left], axis=1).ravel(),
+        value=np.ascontiguousarray(forest.value[:, old]),
+        roots=np.asarray(roots, dtype=np.intp),
+        classes=forest.classes_,
+        max_depth=depth,
+        feature_names=forest.feature_names,
+        n_features=forest.n_features,
+    )
+
+
+def _tree_probabilities(forest, X, max_depth):
+    """Per-tree class probabilities with the trees cut at max_depth, shape (n_trees, n_rows, n_classes)."""
+    capped = CompiledForest.from_arrays(forest.to_arrays(), max_depth=max_depth, feature_names=forest.feature_names,
+                                        n_features=forest.n_features)
+    leaves = capped.apply(X)
+    return np.moveaxis(forest.value[:, leaves.T], 0, -1)
+
+
+def _greedy_tree_order(probabilities, y_index):
+    """
+    Orders trees by forward selection: each step adds the tree that makes the
+    ensemble so far most accurate, so any prefix of the order is a good subset.
+    """
+    remaining = list(range(probabilities.shape[0]))
+    total = np.zeros(probabilities.shape[1:], dtype=np.float64)
+    order = []
+    while remaining:
+        candidates = total + probabilities[remaining]
+        accuracy = (candidates.argmax(axis=2) == y_index).mean(axis=1)
+        # The first best tree wins ties, so the order is deterministic.
+        best = int(np.argmax(accuracy))
+        total = candidates[best]
+        order.append(remaining.pop(best))
+    return order
+
+
+def _latency_ms(model, X, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        model.predict(X)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000.0
+
+
+def compact(model, X_val, y_val, tolerance=DEFAULT_TOLERANCE, depths=DEFAULT_DEPTHS, tree_counts=DEFAULT_TREE_COUNTS,
+            selection_fraction=0.5, repeat=5, random_state=42):
+    """
+    Searches tree subsets and depth caps for the smallest forest within an accuracy budget.
+
+    The held-out rows are split in two. For every depth cap, trees are ordered
+    by greedy forward selection on the first part, and each prefix length in
+    `tree_counts` becomes a candidate. Every candidate is compacted, then
+    scored on the second part, which played no role in choosing it, and
+    timed on all held-out rows. A candidate fits the budget when its accuracy
+    is at most `tolerance` below the full forest's. The fitting candidate with
+    the fewest nodes (then the lowest latency) is chosen. The unmodified
+    forest is always a candidate, whatever `depths` and `tree_counts` hold, so
+    there is always a result.
+
+    Parameters:
+        model: CompiledForest or fitted RandomForestClassifier.
+        X_val (array-like): Held-out features, in the model's feature order (not training rows).
+        y_val (array-like): Held-out labels.
+        tolerance (float): Largest accepted drop in accuracy, e.g. 0.005 for half a point.
+        depths (tuple): Depth caps to try; None means full depth.
+        tree_counts (tuple): Numbers of trees to try.
+        selection_fraction (float): Share of the held-out rows used to order the trees.
+        repeat (int): Timing repetitions per candidate; the best time is reported.
+        random_state (int): Seed for splitting the held-out rows.
+
+    Returns:
+        dict: 'baseline' and 'best' report entries, all 'candidates' (n_trees, max_depth,
+        n_nodes, accuracy, accuracy_drop, latency_ms, speedup, fits) and the chosen 'model'.
+    """
+    forest = model if isinstance(model, CompiledForest) else compile_forest(model)
+    X_val = forest._validate(X_val)
+    y_val = np.asarray(y_val)
+    shuffled = np.random.default_rng(random_state).permutation(len(y_val))
+    n_select = int(round(len(y_val) * selection_fraction))
+    if not 0 < n_select < len(y_val):
+        raise ValueError("compact needs held-out rows both to select trees and to score them")
+    select, score = shuffled[:n_select], shuffled[n_select:]
+    X_select, y_select_index = X_val[select], np.searchsorted(forest.classes_, y_val[select])
+    X_score, y_score = X_val[score], y_val[score]
+
+    baseline_accuracy = float((forest.predict(X_score) == y_score).mean())
+    baseline_latency = _latency_ms(forest, X_val, repeat)
+    counts = sorted({count for count in tree_counts if count < forest.n_trees} | {forest.n_trees})
+
+    # The full forest fits by definition; the search below does not rebuild it.
+    candidates = [{
+        "n_trees": forest.n_trees,
+        "max_depth": forest.max_depth,
+        "n_nodes": forest.n_nodes,
+        "accuracy": baseline_accuracy,
+        "accuracy_drop": 0.0,
+        "latency_ms": baseline_latency,
+        "speedup": 1.0,
+        "fits": True,
+    }]
+    models = [forest]
+    for max_depth in depths:
+        if max_depth is not None and max_depth >= forest.max_depth:
+            continue
+        probabilities = _tree_probabilities(forest, X_select, max_depth or forest.max_depth)
+        order = _greedy_tree_order(probabilities, y_select_index)
+        for count in counts:
+            if max_depth is None and count == forest.n_trees:
+                continue
+            compacted = compact_forest(forest, order[:count], max_depth)
+            accuracy = float((compacted.predict(X_score) == y_score).mean())
+            latency = _latency_ms(compacted, X_val, repeat)
+            candidates.append({
+                "n_trees": count,
+                "max_depth": compacted.max_depth,
+                "n_nodes": compacted.n_nodes,
+                "accuracy": accuracy,
+                "accuracy_drop": baseline_accuracy - accuracy,
+                "latency_ms": latency,
+                "speedup": baseline_latency / latency if latency > 0 else None,
+                "fits": accuracy >= baseline_accuracy - tolerance,
+            })
+            models.append(compacted)
+
+    fitting = [i for i, candidate in enumerate(candidates) if candidate["fits"]]
+    best = min(fitting, key=lambda i: (candidates[i]["n_nodes"], candidates[i]["latency_ms"]))
+    return {
+        "tolerance": tolerance,
+        "baseline": {
+            "n_trees": forest.n_trees,
+            "max_depth": forest.max_depth,
+            "n_nodes": forest.n_nodes,
+            "accuracy": baseline_accuracy,
+            "latency_ms": baseline_latency,
+        },
+        "candidates": candidates,
+        "best": candidates[best],
+        "model": models[best],
+    }
+
+
+def save_compacted(result, store=None, source_version=None, report_path=REPORT_PATH, activate=True) -> str:
+    """
+    Saves the chosen compacted forest as a new store version and writes the trade-off report.
+
+    Returns:
+        str: The saved version name.
+    """
+    metadata = dict(result["best"], tolerance=result["tolerance"], baseline=result["baseline"],
+                    compacted_from=source_version)
+    version = (store or ModelArtifactStore()).save(result["model"], metadata=metadata, activate=activate)
+    if report_path:
+        report = {key: value for key, value in result.items() if key != "model"}
+        report["model_version"] = version
+        os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return version
+
+
+def main():
+    from sklearn.model_selection import train_test_split
+
+    from src.data import SnowflakeDB
+    from src.features import FeatureStore
+    from .training import load_training_features
+
+    parser = argparse.ArgumentParser(description="Compact the active BankNote forest within an accuracy budget.")
+    parser.add_argument("--version", default=None, help="Store version to compact (default: LATEST).")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Largest accepted accuracy drop on the held-out set.")
+    parser.add_argument("--report", default=REPORT_PATH)
+    parser.add_argument("--no-activate", action="store_true", help="Save without pointing LATEST at it.")
+    args = parser.parse_args()
+
+    store = ModelArtifactStore()
+    source_version = args.version or store.latest_version()
+    forest = store.load(source_version)
+
+    # The same held-out split that training reports its accuracy on.
+    df_featured = load_training_features(SnowflakeDB(), FeatureStore())
+    X = df_featured.drop(columns=["CLASS"])
+    _, X_test, _, y_test = train_test_split(X, df_featured["CLASS"], test_size=0.2, random_state=42)
+
+    result = compact(forest, X_test, y_test, tolerance=args.tolerance)
+    version = save_compacted(result, store, source_version, args.report, activate=not args.no_activate)
+    best, baseline = result["best"], result["baseline"]
+    print(f"Saved {version}: {best['n_trees']} trees, depth {best['max_depth']}, {best['n_nodes']} nodes "
+          f"(from {baseline['n_nodes']}); accuracy {best['accuracy']:.4f} vs {baseline['accuracy']:.4f}, "
+          f"{best['speedup']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
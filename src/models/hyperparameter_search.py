@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Value
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold
+
+from .artifact_store import ARTIFACT_DIR, ModelArtifactStore
+from .prediction_model import compile_forest
+from src.utils.shared_array import SharedArray
+
+DEFAULT_PARAM_GRID = {
+    "n_estimators": [50, 100, 200],
+    "max_depth": [None, 8, 16],
+    "min_samples_leaf": [1, 2, 4],
+    "max_features": ["sqrt", None],
+}
+
+
+# Per-worker state, set once by _init_worker.
+_worker = {}
+
+
+def _init_worker(x_spec, y_spec, best_score):
+    _worker["X"], _worker["x_shm"] = SharedArray.attach(x_spec)
+    _worker["y"], _worker["y_shm"] = SharedArray.attach(y_spec)
+    _worker["best_score"] = best_score
+
+
+def _evaluate(trial_id, params, cv, random_state, prune_margin):
+    """
+    Cross-validates one configuration inside a worker.
+
+    After each fold, the configuration is abandoned if its mean score so far is
+    more than `prune_margin` below the best mean score any finished trial has
+    reached.
+    """
+    X, y, best_score = _worker["X"], _worker["y"], _worker["best_score"]
+    started = time.perf_counter()
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state).split(X, y)
+    scores, fold_seconds = [], []
+    pruned = False
+    for train_idx, val_idx in folds:
+        fold_start = time.perf_counter()
+        model = RandomForestClassifier(random_state=random_state, n_jobs=1, **params)
+        model.fit(X[train_idx], y[train_idx])
+        scores.append(float((model.predict(X[val_idx]) == y[val_idx]).mean()))
+        fold_seconds.append(time.perf_counter() - fold_start)
+        if len(scores) < cv and np.mean(scores) < best_score.value - prune_margin:
+            pruned = True
+            break
+
+    mean_score = float(np.mean(scores))
+    if not pruned:
+        with best_score.get_lock():
+            best_score.value = max(best_score.value, mean_score)
+    return {
+        "trial": trial_id,
+        "params": params,
+        "fold_scores": scores,
+        "mean_score": mean_score,
+        "pruned": pruned,
+        "fold_seconds": fold_seconds,
+        "total_seconds": time.perf_counter() - started,
+    }
+
+
+def search(X, y, param_grid=None, n_iter=None, cv=5, n_jobs=None, prune_margin=0.02, random_state=42):
+    """
+    Runs a grid (or random, when n_iter is set) search with k-fold CV across a process pool.
+
+    The feature matrix and labels are copied once into shared memory and every
+    worker attaches to them, so nothing large is pickled per trial.
+
+    Parameters:
+        X (array-like): Feature matrix.
+        y (array-like): Labels.
+        param_grid (dict, optional): RandomForestClassifier parameters to search.
+        n_iter (int, optional): Number of sampled configurations; None searches the full grid.
+        cv (int): Number of folds.
+        n_jobs (int, optional): Worker processes; defaults to the CPU count.
+        prune_margin (float): How far below the best mean score a trial may fall before it is stopped.
+        random_state (int): Seed for folds, sampling and the forests.
+
+    Returns:
+        dict: 'best_params', 'best_score', 'model' (refit on all data) and a per-trial 'trials' report.
+    """
+    param_grid = param_grid or DEFAULT_PARAM_GRID
+    if n_iter:
+        candidates = list(ParameterSampler(param_grid, n_iter=n_iter, random_state=random_state))
+    else:
+        candidates = list(ParameterGrid(param_grid))
+
+    started = time.perf_counter()
+    shared_X = SharedArray(np.asarray(X, dtype=np.float64))
+    shared_y = SharedArray(np.asarray(y))
+    best_score = Value("d", -np.inf)
+    trials = []
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(shared_X.spec, shared_y.spec, best_score)) as pool:
+            futures = [
+                pool.submit(_evaluate, trial_id, params, cv, random_state, prune_margin)
+                for trial_id, params in enumerate(candidates)
+            ]
+            for future in as_completed(futures):
+                trials.append(future.result())
+    finally:
+        shared_X.close()
+        shared_y.close()
+
+    trials.sort(key=lambda trial: trial["trial"])
+    completed = [trial for trial in trials if not trial["pruned"]]
+    best = max(completed, key=lambda trial: trial["mean_score"])
+    search_seconds = time.perf_counter() - started
+
+    refit_start = time.perf_counter()
+    model = RandomForestClassifier(random_state=random_state, **best["params"]).fit(X, y)
+    return {
+        "best_params": best["params"],
+        "best_score": best["mean_score"],
+        "model": model,
+        "trials": trials,
+        "search_seconds": search_seconds,
+        "refit_seconds": time.perf_counter() - refit_start,
+    }
+
+
+def save_search_result(result, feature_names, report_path, model_path=None, store=None):
+    """
+    Writes the winning model (pickle and artifact store version) and the per-trial timing report.
+    """
+    if model_path:
+        with open(model_path, "wb") as f:
+            pickle.dump(result["model"], f)
+    version = (store or ModelArtifactStore()).save(
+        compile_forest(result["model"], feature_names=feature_names),
+        metadata={"cv_accuracy": result["best_score"], "params": result["best_params"]},
+        estimator=result["model"],
+    )
+    report = {key: value for key, value in result.items() if key != "model"}
+    report["model_version"] = version
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    return version
+
+
+def main():
+    from src.data import SnowflakeDB
+    from src.features import FeatureStore
+    from .training import load_training_features
+
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter search for the BankNote model.")
+    parser.add_argument("--n-iter", type=int, default=None, help="Sample this many configurations.")
+    parser.add_argument("--cv", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--prune-margin", type=float, default=0.02)
+    parser.add_argument("--report", default=os.path.join(ARTIFACT_DIR, "search_report.json"))
+    args = parser.parse_args()
+
+    # The same feature columns training and serving use; the source table also holds the ID watermark.
+    df_featured = load_training_features(SnowflakeDB(), FeatureStore())
+    X = df_featured.drop(columns=["CLASS"])
+    y = df_featured["CLASS"].to_numpy()
+
+    result = search(X, y, n_iter=args.n_iter, cv=args.cv, n_jobs=args.jobs,
+                    prune_margin=args.prune_margin)
+    version = save_search_result(result, list(X.columns), args.report,
+                                 model_path=os.path.join(ARTIFACT_DIR, "BankNote.pickle"))
+    print(f"Best CV accuracy {result['best_score']:.4f} with {result['best_params']}; saved as {version}")
+
+
+if __name__ == "__main__":
+    main()
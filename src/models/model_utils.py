@@ -0,0 +1,49 @@
+import os
+import pickle
+
+import pandas as pd
+
+from .artifact_store import ARTIFACT_DIR, ModelArtifactStore
+
+# The original pickled sklearn model, used until a version has been saved to the store.
+LEGACY_MODEL_PATH = os.path.join(ARTIFACT_DIR, "BankNote.pickle")
+
+
+def load_model(store=None, legacy_path=LEGACY_MODEL_PATH, version=None, compiled=False):
+    """
+    Loads the active model from the artifact store, falling back to the legacy pickle.
+
+    The compiled forest answers single rows and small batches about 10x faster
+    than sklearn, but sklearn's traversal wins from a few thousand rows on (4-6x
+    at 10k-100k rows, see benchmarks/baseline.json). Batch scoring therefore
+    gets the version's sklearn estimator when one was saved with it, and the
+    compiled forest otherwise (e.g. for compacted versions).
+
+    Args:
+        store (ModelArtifactStore, optional): Store to load from; defaults to artifacts/models.
+        legacy_path (str): Pickle to unpickle when the store has no active version.
+        version (str, optional): Store version to load; defaults to LATEST.
+        compiled (bool): Always return the CompiledForest, as the prediction server does.
+
+    Returns:
+        A fitted model exposing predict().
+    """
+    store = store or ModelArtifactStore()
+    version = version or store.latest_version()
+    if version is not None:
+        estimator = None if compiled else store.load_estimator(version)
+        return estimator if estimator is not None else store.load(version)
+    with open(legacy_path, 'rb') as f:
+        return pickle.load(f)
+
+
+def predict_features(model, X, feature_names):
+    """
+    Calls model.predict on a feature matrix, attaching column names for sklearn models.
+
+    sklearn estimators fitted on a DataFrame warn when given a bare array, while
+    CompiledForest accepts arrays directly, so only the former pay for a DataFrame.
+    """
+    if hasattr(model, "feature_names_in_"):
+        X = pd.DataFrame(X, columns=feature_names)
+    return model.predict(X)
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprints(values) -> np.ndarray:
+    """
+    Hashes each row of raw measurements (n_rows, n_columns) into a uint64 fingerprint.
+    """
+    return pd.util.hash_pandas_object(pd.DataFrame(values), index=False).to_numpy()
+
+
+class PredictionCache:
+    """
+    A bounded LRU cache of predictions keyed by a fingerprint of the raw measurements.
+
+    Entries belong to one model version: when predict() is called with a different
+    version the cache is cleared, so a new model never serves stale predictions.
+    Entries older than `ttl` seconds (if set) are treated as misses. Lookups are
+    done per batch: rows are deduplicated by fingerprint with NumPy first, and only
+    the distinct missing rows are passed to the predictor.
+    """
+
+    def __init__(self, max_size: int = 100_000, ttl: float = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.model_version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "model_version": self.model_version,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def predict(self, values, predict_fn, model_version) -> np.ndarray:
+        """
+        Returns predictions for each row, calling predict_fn only for uncached rows.
+
+        Args:
+            values (np.ndarray): Raw measurements, shape (n_rows, n_columns).
+            predict_fn (callable): Maps a subset of `values` rows to their predictions.
+            model_version: Identifies the model behind predict_fn; a change clears the cache.
+
+        Returns:
+            np.ndarray: One prediction per row of `values`.
+        """
+        values = np.asarray(values)
+        keys = fingerprints(values)
+        unique_keys, first_rows, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+        with self._lock:
+            if model_version != self.model_version:
+                if self.model_version is not None:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.model_version = model_version
+            cached = self._lookup(unique_keys.tolist())
+            missing = [i for i, value in enumerate(cached) if value is None]
+            missed_rows = int(np.isin(inverse, missing).sum()) if missing else 0
+            self.hits += len(keys) - missed_rows
+            self.misses += missed_rows
+
+        if missing:
+            computed = np.asarray(predict_fn(values[first_rows[missing]]))
+            for i, value in zip(missing, computed):
+                cached[i] = value
+            with self._lock:
+                if model_version == self.model_version:
+                    self._store(unique_keys[missing].tolist(), computed.tolist())
+        return np.asarray(cached)[inverse]
+
+    def _lookup(self, keys):
+        now = time.monotonic()
+        results = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                results.append(None)
+                continue
+            value, stored_at = entry
+            if self.ttl is not None and now - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                results.append(None)
+                continue
+            self._entries.move_to_end(key)
+            results.append(value)
+        return results
+
+    def _store(self, keys, values):
+        now = time.monotonic()
+        for key, value in zip(keys, values):
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
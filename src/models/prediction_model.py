@@ -0,0 +1,186 @@
+import numpy as np
+
+
+class CompiledForest:
+    """
+    A fitted RandomForestClassifier flattened into contiguous NumPy node arrays.
+
+    All trees share one set of node arrays; `roots` holds the index of each tree's
+    root. Leaves point to themselves as both children, so a batch can be pushed
+    down every tree at once for a fixed number of steps (the depth of the deepest
+    tree) without tracking which rows have already reached a leaf.
+
+    Rows are processed in blocks of `block_size` so the per-step index arrays stay
+    cache resident. The per-call overhead is a few NumPy operations per tree
+    level, which makes this much faster than sklearn for single rows and small
+    batches; for very large batches sklearn's compiled traversal remains faster.
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, classes, max_depth, feature_names=None,
+                 n_features=None):
+        # Arrays are used as given when they already have the expected dtype, so
+        # read-only memory-mapped arrays are never copied into private memory.
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        # Interleaved (right, left) children so that one gather at
+        # 2 * node + go_left replaces a where() over two gathers.
+        self.children = np.asarray(children, dtype=np.intp)
+        # Class-major leaf values, shape (n_classes, n_nodes), so leaf lookups
+        # gather scalars instead of whole rows.
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        # Width of the input rows; None (no names and no explicit width) skips the check.
+        if n_features is None and self.feature_names is not None:
+            n_features = len(self.feature_names)
+        self.n_features = int(n_features) if n_features is not None else None
+        # Set by ModelArtifactStore.load() to the version the arrays came from.
+        self.version = None
+
+    @property
+    def left(self) -> np.ndarray:
+        return self.children[1::2]
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.children[0::2]
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def apply(self, X, block_size: int = 256) -> np.ndarray:
+        """
+        Returns the leaf index reached in every tree, shape (n_rows, n_trees).
+        """
+        X = self._validate(X)
+        leaves = np.empty((X.shape[0], self.n_trees), dtype=np.intp)
+        for start in range(0, X.shape[0], block_size):
+            leaves[start:start + block_size] = self._traverse(X[start:start + block_size])
+        return leaves
+
+    def predict_proba(self, X, block_size: int = 256) -> np.ndarray:
+        """
+        Returns class probabilities averaged over all trees, like RandomForestClassifier.predict_proba.
+        """
+        X = self._validate(X)
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], block_size):
+            nodes = self._traverse(X[start:start + block_size])
+            for k, class_value in enumerate(self.value):
+                proba[start:start + block_size, k] = class_value[nodes].mean(axis=1)
+        return proba
+
+    def predict(self, X, block_size: int = 256) -> np.ndarray:
+        """
+        Returns the predicted class for each row, matching RandomForestClassifier.predict.
+        """
+        proba = self.predict_proba(X, block_size=block_size)
+        return self.classes_.take(np.argmax(proba, axis=1))
+
+    def to_arrays(self) -> dict:
+        """Returns the node arrays by name, e.g. for saving with np.save."""
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children": self.children,
+            "value": self.value,
+            "roots": self.roots,
+            "classes": self.classes_,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, max_depth: int, feature_names=None, n_features=None):
+        """Rebuilds a CompiledForest from the output of to_arrays()."""
+        return cls(
+            feature=arrays["feature"],
+            threshold=arrays["threshold"],
+            children=arrays["children"],
+            value=arrays["value"],
+            roots=arrays["roots"],
+            classes=arrays["classes"],
+            max_depth=max_depth,
+            feature_names=feature_names,
+            n_features=n_features,
+        )
+
+    def _validate(self, X) -> np.ndarray:
+        if self.feature_names is not None and hasattr(X, "columns"):
+            X = X[self.feature_names]
+        # sklearn casts inputs to float32 before comparing against the float64
+        # thresholds; doing the same keeps predictions identical.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        # A narrower row would make the flat gather in _traverse read the next row's values.
+        if X.ndim != 2 or (self.n_features is not None and X.shape[1] != self.n_features):
+            raise ValueError(f"X has {X.shape[-1]} features, but CompiledForest is expecting "
+                             f"{self.n_features} features as input.")
+        return X
+
+    def _traverse(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        # Work on flat arrays: row r of tree t lives at position r * n_trees + t.
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, self.n_trees)
+        nodes = np.tile(self.roots, n_rows)
+        X_flat = np.ascontiguousarray(X).ravel()
+        for _ in range(self.max_depth):
+            go_left = X_flat[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_left]
+        return nodes.reshape(n_rows, self.n_trees)
+
+
+def compile_forest(model, feature_names=None) -> CompiledForest:
+    """
+    Flattens a fitted sklearn RandomForestClassifier into a CompiledForest.
+
+    Parameters:
+        model: Fitted RandomForestClassifier (single output).
+        feature_names (list, optional): Column order the model was trained on.
+            Defaults to the model's feature_names_in_ when available.
+
+    Returns:
+        CompiledForest: Predictor returning the same predictions as the model.
+    """
+    if feature_names is None and hasattr(model, "feature_names_in_"):
+        feature_names = list(model.feature_names_in_)
+
+    features, thresholds, children, values, roots = [], [], [], [], []
+    max_depth = 0
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        node_ids = np.arange(offset, offset + n_nodes)
+        is_leaf = tree.children_left == -1
+
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+        left = np.where(is_leaf, node_ids, tree.children_left + offset)
+        right = np.where(is_leaf, node_ids, tree.children_right + offset)
+        children.append(np.stack([right, left], axis=1).ravel())
+
+        leaf_value = tree.value[:, 0, :]
+        values.append(leaf_value / leaf_value.sum(axis=1, keepdims=True))
+
+        roots.append(offset)
+        max_depth = max(max_depth, tree.max_depth)
+        offset += n_nodes
+
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.intp),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        children=np.concatenate(children).astype(np.intp),
+        value=np.ascontiguousarray(np.concatenate(values).T, dtype=np.float64),
+        roots=np.asarray(roots, dtype=np.intp),
+        classes=np.asarray(model.classes_),
+        max_depth=max_depth,
+        feature_names=feature_names,
+        n_features=model.n_features_in_,
+    )
@@ -1,33 +1,276 @@
 # import packages
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score
+import argparse
+import os
 import pickle
-from src.preprocessing import DataCleaning
-from src.features import FeatureCreation
+import time
+import tracemalloc
+
+from src.features import BASE_COLUMNS, FeatureCreation, FeatureStore, snapshot_id
 from src.data import SnowflakeDB
+from src.models import ModelArtifactStore, compile_forest
+from src.models.artifact_store import ARTIFACT_DIR
+from src.preprocessing import DataCleaning
+from src.utils import METRICS, get_logger
+
+logger = get_logger("models.training")
+
+SOURCE_TABLE = "BANK_NOTE_TB"
+PICKLE_PATH = os.path.join(ARTIFACT_DIR, "BankNote.pickle")
+LABEL_COLUMN = "CLASS"
+# Rows per chunk read in out-of-core training, and trees added per chunk in forest mode.
+INCREMENTAL_BATCH_SIZE = 100_000
+TREES_PER_CHUNK = 10
+# Accuracy drop accepted when compacting the published forest (see compaction.py); None publishes it whole.
+COMPACTION_TOLERANCE = None
+
+
+def load_training_features(snowflake, feature_store, force=False):
+    """
+    Returns the featurized training table, building it only when the source snapshot changed.
+
+    Parameters:
+        snowflake (SnowflakeDB): Connection to the source table.
+        feature_store (FeatureStore): Store holding one feature version per snapshot.
+        force (bool): Rebuild the features even if the snapshot's version exists.
+    """
+    # Features are cached per source snapshot, identified by a hash of the table's
+    # content, so in-place updates and deletes are noticed as well as appends.
+    columns = ", ".join(list(BASE_COLUMNS) + [LABEL_COLUMN])
+    row_count, content_hash = snowflake.execute_query(f"SELECT COUNT(*), HASH_AGG({columns}) FROM {SOURCE_TABLE}")[0]
+    snapshot = snapshot_id(SOURCE_TABLE, row_count, content_hash)
+    version = feature_store.version_for(snapshot)
+
+    if force or not feature_store.exists(version):
+        # read ori table from snowflake and build the features once
+        df = snowflake.read_table(table_name=SOURCE_TABLE)
+        feature_store.featurize_and_write(snapshot, df, keep_columns=[LABEL_COLUMN])
+    return feature_store.read_frame(version)
+
+
+def train(snowflake=None, feature_store=None, store=None, pickle_path=PICKLE_PATH,
+          compaction_tolerance=COMPACTION_TOLERANCE, rebuild_features=False):
+    """
+    Trains the random forest, writes the legacy pickle and publishes a compiled store version.
+
+    With a compaction tolerance, the published version is the smallest subset of
+    trees and depth cap whose accuracy on the test split stays within it.
+    rebuild_features recomputes the feature table even if it is cached.
+
+    Returns:
+        tuple: (classifier, test accuracy, artifact store version).
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+
+    # Access the snowflake connection details
+    snowflake = snowflake or SnowflakeDB()
+    df_featured = load_training_features(snowflake, feature_store or FeatureStore(), force=rebuild_features)
+    X = df_featured.drop(columns=["CLASS"])
+    y = df_featured['CLASS']
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    classifier = RandomForestClassifier(n_estimators=100)
+    classifier.fit(X_train, y_train)
+
+    y_pred = classifier.predict(X_test)
+
+    score = accuracy_score(y_test, y_pred)
+
+    if pickle_path:
+        with open(pickle_path, 'wb') as pickle_out:
+            pickle.dump(classifier, pickle_out)
+
+    # Publish a compiled, memory-mappable version for the scorers to pick up.
+    compiled = compile_forest(classifier, feature_names=list(X.columns))
+    if compaction_tolerance is not None:
+        from src.models.compaction import compact, save_compacted
+
+        result = compact(compiled, X_test, y_test, tolerance=compaction_tolerance)
+        version = save_compacted(result, store)
+        return classifier, score, version
+    version = (store or ModelArtifactStore()).save(compiled, metadata={"accuracy": score}, estimator=classifier)
+    return classifier, score, version
+
+
+def _incremental_estimator(mode, classes):
+    """Returns (model, fit_chunk) for an out-of-core training mode."""
+    if mode == "forest":
+        from sklearn.ensemble import RandomForestClassifier
+
+        model = RandomForestClassifier(n_estimators=0, warm_start=True)
+
+        def fit_chunk(X, y, trees=TREES_PER_CHUNK):
+            # With warm_start, fit() keeps the existing trees and grows the new ones on this chunk only.
+            model.n_estimators += trees
+            model.fit(X, y)
+
+        return model, fit_chunk
+    if mode == "sgd":
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler()
+        classifier = SGDClassifier(loss="log_loss")
+        model = Pipeline([("scale", scaler), ("classify", classifier)])
+
+        def fit_chunk(X, y, trees=None):
+            scaler.partial_fit(X)
+            classifier.partial_fit(scaler.transform(X), y, classes=classes)
+
+        return model, fit_chunk
+    raise ValueError(f"Unknown incremental training mode '{mode}'")
+
+
+def _reset_memory_peak() -> int:
+    """Starts a new tracemalloc peak and returns the memory traced so far."""
+    tracemalloc.reset_peak()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def train_incremental(snowflake=None, mode="forest", batch_size=INCREMENTAL_BATCH_SIZE,
+                      trees_per_chunk=TREES_PER_CHUNK, shuffle=True, store=None, pickle_path=PICKLE_PATH,
+                      trace_memory=False):
+    """
+    Trains out of core from chunked reads of the source table, holding one chunk in memory at a time.
+
+    Each chunk is cleaned and featurized on its own and then fed to the model:
+    in 'forest' mode a warm-started random forest grows `trees_per_chunk` new
+    trees on it, and in 'sgd' mode a scaled logistic-loss SGDClassifier is
+    updated with partial_fit. Before training on a chunk the current model
+    predicts it, so every chunk also reports accuracy on rows the model has not
+    seen. With `shuffle`, the warehouse returns the rows in random order, so
+    every chunk of a table stored sorted by class still holds all classes; a
+    forest chunk missing a class is carried over into the next one, once. With
+    `trace_memory`, each report entry holds the peak memory traced while
+    reading and fitting its chunk (carried rows included), above what was
+    allocated before it; tracing slows every allocation down, so it is off by
+    default and the entries hold None.
+
+    Parameters:
+        snowflake (SnowflakeDB, optional): Source connection.
+        mode (str): 'forest' or 'sgd'.
+        batch_size (int): Rows per chunk.
+        trees_per_chunk (int): Trees added per chunk in 'forest' mode.
+        shuffle (bool): Read the table in random order.
+        store (ModelArtifactStore, optional): Store the compiled forest is published to.
+        pickle_path (str, optional): Where to pickle the trained model.
+        trace_memory (bool): Trace the peak memory of every chunk with tracemalloc.
+
+    Returns:
+        tuple: (model, per-chunk report, artifact store version or None for 'sgd').
+    """
+    import numpy as np
+    import pandas as pd
+
+    snowflake = snowflake or SnowflakeDB()
+    columns = list(BASE_COLUMNS) + [LABEL_COLUMN]
+    classes = np.array([row[0] for row in snowflake.execute_query(
+        f"SELECT DISTINCT {LABEL_COLUMN} FROM {SOURCE_TABLE} WHERE {LABEL_COLUMN} IS NOT NULL ORDER BY 1")])
+    query = f"SELECT {', '.join(columns)} FROM {SOURCE_TABLE}" + (" ORDER BY RANDOM()" if shuffle else "")
+    model, fit_chunk = _incremental_estimator(mode, classes)
+
+    report, carried = [], None
+    trained = False
+    started = time.perf_counter()
+    # ru_maxrss only ever grows over the process, so memory is traced per chunk instead.
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        baseline_bytes = _reset_memory_peak() if trace_memory else None
+        chunks = snowflake.read_table(SOURCE_TABLE, batch_size=batch_size, query=query)
+        for i, chunk in enumerate(METRICS.iter_stage("train_read", chunks)):
+            chunk_started = time.perf_counter()
+            with METRICS.stage("train_clean", rows=len(chunk)):
+                chunk = DataCleaning.drop_incomplete(chunk, columns)
+                was_carried = carried is not None
+                if was_carried:
+                    chunk = pd.concat([carried, chunk], ignore_index=True)
+                    carried = None
+            with METRICS.stage("train_featurize", rows=len(chunk)):
+                X = FeatureCreation.main_feature_creation(chunk.drop(columns=[LABEL_COLUMN]), inplace=True)
+                y = chunk[LABEL_COLUMN].to_numpy()
+            if mode == "forest" and len(np.unique(y)) < len(classes):
+                if was_carried:
+                    # Carrying again would let the held rows grow with the table.
+                    raise Exception(f"Two consecutive chunks of {SOURCE_TABLE} lack a class of {list(classes)}; "
+                                    f"read it with shuffle=True or a larger batch_size")
+                carried = chunk
+                continue
 
-# Access the snowflake connection details
-snowflake = SnowflakeDB()
+            accuracy = float((model.predict(X) == y).mean()) if trained else None
+            with METRICS.stage("train_fit", rows=len(y)) as record:
+                fit_chunk(X, y, trees_per_chunk)
+            trained = True
+            seconds = time.perf_counter() - chunk_started
+            entry = {
+                "chunk": i,
+                "rows": len(y),
+                "fit_seconds": record.seconds,
+                "rows_per_second": len(y) / seconds if seconds > 0 else None,
+                "peak_memory_bytes": tracemalloc.get_traced_memory()[1] - baseline_bytes if trace_memory else None,
+                "accuracy_before_fit": accuracy,
+            }
+            if mode == "forest":
+                entry["n_estimators"] = model.n_estimators
+            report.append(entry)
+            memory = f", peak memory {entry['peak_memory_bytes'] / 2 ** 20:.1f} MiB" if trace_memory else ""
+            logger.info(f"Chunk {i}: {len(y)} rows at {entry['rows_per_second']:.0f} rows/s{memory}")
+            # Drop this chunk before taking the next baseline.
+            feature_names = list(X.columns)
+            del chunk, X, y
+            if trace_memory:
+                baseline_bytes = _reset_memory_peak()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
 
-# read ori table from snowflake
-df = snowflake.read_table(table_name="BANK_NOTE_TB")
+    if not trained:
+        raise Exception(f"No chunk of {SOURCE_TABLE} held every class {list(classes)}; nothing was trained")
+    if carried is not None:
+        logger.warning(f"Skipped the last {len(carried)} rows, which did not hold every class")
+    total_rows = sum(entry["rows"] for entry in report)
+    logger.info(f"Trained on {total_rows} rows in {len(report)} chunks, "
+                f"{total_rows / (time.perf_counter() - started):.0f} rows/s")
 
-# data cleaning
-df_cleaned = DataCleaning.add_realtime_unique_key(df)
-df_featured = FeatureCreation.main_feature_creation(df_cleaned)
-X = df_featured.drop(columns=["CLASS", "uniq_key"])
-y = df_featured['CLASS']
+    if pickle_path:
+        with open(pickle_path, 'wb') as pickle_out:
+            pickle.dump(model, pickle_out)
+    version = None
+    if mode == "forest":
+        version = (store or ModelArtifactStore()).save(
+            compile_forest(model, feature_names=feature_names),
+            metadata={"training": "incremental", "rows": total_rows, "chunks": len(report)},
+            estimator=model,
+        )
+    return model, report, version
 
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-classifier = RandomForestClassifier(n_estimators=100)
-classifier.fit(X_train, y_train)
+def main():
+    parser = argparse.ArgumentParser(description="Train the BankNote model.")
+    parser.add_argument("--incremental", choices=["forest", "sgd"], default=None,
+                        help="Train out of core from chunked reads with this model.")
+    parser.add_argument("--batch-size", type=int, default=INCREMENTAL_BATCH_SIZE)
+    parser.add_argument("--trees-per-chunk", type=int, default=TREES_PER_CHUNK)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Report each chunk's peak memory (tracing slows training down).")
+    parser.add_argument("--rebuild-features", action="store_true",
+                        help="Recompute the cached feature table even if the source looks unchanged.")
+    args = parser.parse_args()
 
-y_pred = classifier.predict(X_test)
+    if args.incremental:
+        _, report, version = train_incremental(mode=args.incremental, batch_size=args.batch_size,
+                                               trees_per_chunk=args.trees_per_chunk,
+                                               trace_memory=args.trace_memory)
+        print(f"Trained on {sum(entry['rows'] for entry in report)} rows in {len(report)} chunks; "
+              f"published model version {version}")
+        return
+    _, score, version = train(rebuild_features=args.rebuild_features)
+    print(f"Test accuracy {score:.4f}; published model version {version}")
 
-score = accuracy_score(y_test, y_pred)
 
-pickle_out = open('../../artifacts/models/BankNote.pickle', 'wb')
-pickle.dump(classifier, pickle_out)
-pickle_out.close()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
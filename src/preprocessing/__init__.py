@@ -1,9 +1,12 @@
 # src/preprocessing/__init__.py
+from src.utils.lazy import lazy_exports
 
-# Import the database connection class from db.py
-from .data_transformation import DataCleaning
+# Public names and the submodule defining each, imported on first access (PEP 562).
+_EXPORTS = {
+    # The data cleaning functions from data_transformation.py
+    "DataCleaning": ".data_transformation",
+}
 
 # Optional: Define __all__ to explicitly declare the public API of this package.
-__all__ = [
-    "DataCleaning"
-]
\ No newline at end of file
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -1,5 +1,13 @@
+import os
+
+import numpy as np
 import pandas as pd
-import uuid
+
+# Lowercase hex digits as ASCII codes, and the offsets of the 32 hex digits
+# within the canonical 36-character UUID string (hyphens at 8, 13, 18 and 23).
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_UUID_HEX_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
 
 class DataCleaning:
     """
@@ -7,17 +15,97 @@ class DataCleaning:
     """
 
     @staticmethod
-    def add_realtime_unique_key(df: pd.DataFrame) -> pd.DataFrame:
+    def random_keys(n_rows: int, key_format: str = "uuid"):
+        """
+        Generates random version-4 UUIDs in bulk from a single entropy draw.
+
+        Parameters:
+            n_rows (int): Number of keys to generate.
+            key_format (str): 'uuid' for canonical 36-character strings, or 'bytes'
+                for a compact fixed-width 16-byte binary (pyarrow) array.
+
+        Returns:
+            np.ndarray or pd.api.extensions.ExtensionArray: One key per row.
+        """
+        raw = np.frombuffer(os.urandom(16 * n_rows), dtype=np.uint8).reshape(n_rows, 16).copy()
+        # Set the version (4) and variant (RFC 4122) bits, as uuid.uuid4() does.
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+
+        if key_format == "bytes":
+            import pyarrow as pa
+            keys = pa.FixedSizeBinaryArray.from_buffers(pa.binary(16), n_rows, [None, pa.py_buffer(raw)])
+            return pd.arrays.ArrowExtensionArray(keys)
+        if key_format != "uuid":
+            raise ValueError(f"Unknown key format '{key_format}'")
+
+        chars = np.full((n_rows, 36), ord("-"), dtype=np.uint8)
+        digits = np.empty((n_rows, 32), dtype=np.uint8)
+        digits[:, 0::2] = _HEX_DIGITS[raw >> 4]
+        digits[:, 1::2] = _HEX_DIGITS[raw & 0x0F]
+        chars[:, _UUID_HEX_POSITIONS] = digits
+        return chars.view("S36").ravel().astype("U36")
+
+    @staticmethod
+    def content_keys(df: pd.DataFrame, columns=None) -> np.ndarray:
+        """
+        Hashes the given columns of each row into a deterministic 64-bit key.
+
+        Identical rows always get identical keys, so duplicates can be found with
+        a cheap integer comparison. Keys are signed int64 so they fit a BIGINT column.
+
+        Parameters:
+            df (pd.DataFrame): Rows to hash.
+            columns (list, optional): Columns to hash; defaults to all columns.
+
+        Returns:
+            np.ndarray: int64 key per row.
+        """
+        values = df if columns is None else df[list(columns)]
+        return pd.util.hash_pandas_object(values, index=False).to_numpy().view(np.int64)
+
+    @staticmethod
+    def add_realtime_unique_key(df: pd.DataFrame, mode: str = "random", key_format: str = "uuid",
+                                columns=None, inplace: bool = False) -> pd.DataFrame:
         """
         Adds a unique key to each row of the DataFrame for real-time transactional data.
-        The key is generated using uuid.uuid4(), ensuring a globally unique identifier for each transaction.
+        By default the key is a random version-4 UUID, generated for the whole frame at once.
 
         Parameters:
             df (pd.DataFrame): DataFrame containing real-time transactional data.
+            mode (str): 'random' for random UUIDs, or 'content' for a hash of the row's
+                values (see content_keys) so that duplicate rows share a key.
+            key_format (str): For random keys, 'uuid' strings or compact 16-byte 'bytes'.
+            columns (list, optional): For content keys, the columns to hash; defaults to all.
+            inplace (bool): If True, add the column to `df` itself rather than to a shallow copy.
 
         Returns:
             pd.DataFrame: DataFrame with an additional column 'uniq_key' containing the unique identifiers.
         """
-        df = df.copy()
-        df['uniq_key'] = [str(uuid.uuid4()) for _ in range(df.shape[0])]
-        return df
\ No newline at end of file
+        if mode == "random":
+            keys = DataCleaning.random_keys(df.shape[0], key_format)
+        elif mode == "content":
+            keys = DataCleaning.content_keys(df, columns)
+        else:
+            raise ValueError(f"Unknown key mode '{mode}'")
+        if not inplace:
+            df = df.copy(deep=False)
+        df['uniq_key'] = keys
+        return df
+
+    @staticmethod
+    def drop_incomplete(df: pd.DataFrame, columns=None) -> pd.DataFrame:
+        """
+        Drops rows with a missing value in any of the given columns.
+
+        Parameters:
+            df (pd.DataFrame): DataFrame to clean.
+            columns (list, optional): Columns that must be present; defaults to all.
+
+        Returns:
+            pd.DataFrame: The complete rows (`df` itself when nothing is missing).
+        """
+        missing = df[list(columns) if columns is not None else df.columns].isna().any(axis=1)
+        if not missing.any():
+            return df
+        return df[~missing]
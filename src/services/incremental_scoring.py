@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from src.data import WATERMARK_COLUMN, CheckpointStore
+from src.features import BASE_COLUMNS, FeatureEngine
+from src.models import predict_features
+from src.preprocessing import DataCleaning
+from src.utils import METRICS
+
+KEY_COLUMN = "ROW_KEY"
+# Checkpoint entry (per source table) holding the highest watermark ever sent to the target.
+PENDING_SUFFIX = ":written"
+
+
+class IncrementalScorer:
+    """
+    Scores only the source rows past the last checkpoint and writes them idempotently.
+
+    Rows are read in watermark order and chunk by chunk; after each chunk is
+    written the checkpoint advances to the chunk's largest watermark. A restart
+    resumes from that watermark inclusively, and the deterministic ROW_KEY makes
+    the re-read boundary rows (and any rows from a chunk that failed half way)
+    no-ops on the target, so a retry costs work proportional to the new data only.
+
+    Skipping existing keys takes an anti-join against the whole target, so it is
+    only done for rows that may already be there: those at or below the highest
+    watermark any earlier run sent to the target, which is recorded before each
+    write. Past it, chunks are plainly appended. Without a checkpoint or that
+    record (e.g. after the checkpoints were lost) every row is anti-joined.
+    """
+
+    def __init__(self, db, model, source_table="BANK_NOTE_TB", target_table="BANK_NOTE_PRED",
+                 watermark_column=WATERMARK_COLUMN, key_columns=None, batch_size=100_000, checkpoints=None,
+                 scorer=None):
+        self.db = db
+        self.model = model
+        # Optional ParallelScorer that featurizes and predicts chunks across processes.
+        self.scorer = scorer
+        self.source_table = source_table
+        self.target_table = target_table
+        self.watermark_column = watermark_column
+        # The watermark column identifies the source row; the measurements guard
+        # against watermarks that are not unique.
+        self.key_columns = list(key_columns) if key_columns else [watermark_column, *BASE_COLUMNS]
+        self.batch_size = batch_size
+        self.checkpoints = checkpoints or CheckpointStore(db)
+        self.engine = FeatureEngine()
+
+    def score(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Featurizes and predicts one chunk, returning the rows to write with their ROW_KEY."""
+        if self.scorer is not None:
+            scored = self.scorer.score_frame(chunk)
+        else:
+            with METRICS.stage("featurize", rows=len(chunk)):
+                features = self.engine.compute(chunk[list(BASE_COLUMNS)].to_numpy())
+                scored = pd.DataFrame(features, columns=self.engine.feature_names)
+            with METRICS.stage("predict", rows=len(chunk)):
+                scored['prediction'] = predict_features(self.model, features, self.engine.feature_names)
+        with METRICS.stage("clean", rows=len(chunk)):
+            scored[KEY_COLUMN] = DataCleaning.content_keys(chunk, self.key_columns)
+        return scored
+
+    def has_pending(self) -> bool:
+        """Whether the source holds rows past the checkpoint, checked with a single-row query."""
+        checkpoint = self.checkpoints.get(self.source_table)
+        query = f"SELECT 1 FROM {self.source_table}"
+        params = None
+        if checkpoint is not None:
+            query += f" WHERE {self.watermark_column} > %s"
+            params = (checkpoint,)
+        return bool(self.db.execute_query(query + " LIMIT 1", params))
+
+    def run(self) -> dict:
+        """
+        Processes every source row at or past the stored checkpoint.
+
+        Returns:
+            dict: Rows read, rows newly written and the final checkpoint.
+        """
+        checkpoint = self.checkpoints.get(self.source_table)
+        columns = ", ".join(dict.fromkeys([self.watermark_column, *BASE_COLUMNS, *self.key_columns]))
+        query = f"SELECT {columns} FROM {self.source_table}"
+        params = None
+        if checkpoint is not None:
+            query += f" WHERE {self.watermark_column} >= %s"
+            params = (checkpoint,)
+        query += f" ORDER BY {self.watermark_column}"
+
+        pending_key = f"{self.source_table}{PENDING_SUFFIX}"
+        written_up_to = self.checkpoints.get(pending_key) if checkpoint is not None else None
+        rows_read = rows_written = 0
+        chunks = self.db.read_table(self.source_table, batch_size=self.batch_size, query=query, params=params)
+        for chunk in METRICS.iter_stage("read", chunks):
+            if chunk.empty:
+                continue
+            scored = self.score(chunk)
+            watermarks = chunk[self.watermark_column]
+            if written_up_to is None:
+                overlap = np.ones(len(chunk), dtype=bool)
+            else:
+                overlap = (watermarks <= self._typed(written_up_to, watermarks)).to_numpy()
+            if written_up_to is None or not overlap.all():
+                # Recorded before writing, so a write that fails after committing is still covered.
+                self.checkpoints.set(pending_key, watermarks.max())
+            with METRICS.stage("write") as write:
+                write.rows = self._write(scored, overlap)
+            rows_written += write.rows
+            rows_read += len(chunk)
+            checkpoint = watermarks.max()
+            self.checkpoints.set(self.source_table, checkpoint)
+        return {"rows_read": rows_read, "rows_written": rows_written, "checkpoint": checkpoint}
+
+    def _write(self, scored, overlap) -> int:
+        """Anti-joins the rows that may already be in the target and appends the rest."""
+        written = 0
+        if overlap.any():
+            written += self.db.insert_missing(scored[overlap], self.target_table, key_column=KEY_COLUMN)
+        if not overlap.all():
+            fresh = scored[~overlap].drop_duplicates(subset=[KEY_COLUMN])
+            written += self.db.insert_dataframe(fresh, self.target_table, if_exists="append")
+        return written
+
+    @staticmethod
+    def _typed(watermark, like: pd.Series):
+        """Casts a stored (string) watermark to the dtype of a chunk's watermark column."""
+        return pd.Series([watermark]).astype(like.dtype).iloc[0]
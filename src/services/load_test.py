@@ -0,0 +1,79 @@
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def _post(url, payload, timeout):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def run_load_test(url, n_requests=1000, concurrency=16, rows_per_request=1, timeout=10.0, seed=0):
+    """
+    Sends prediction requests from `concurrency` client threads and measures latency.
+
+    Args:
+        url (str): The server's /predict URL.
+        n_requests (int): Total number of requests to send.
+        concurrency (int): Number of requests kept in flight.
+        rows_per_request (int): Rows in each request body.
+        timeout (float): Per-request timeout in seconds.
+        seed (int): Seed for the synthetic measurements.
+
+    Returns:
+        dict: Request and row throughput, error count and latency percentiles in milliseconds.
+    """
+    rng = np.random.default_rng(seed)
+    payloads = [{"rows": rng.normal(0, 4, (rows_per_request, 4)).round(4).tolist()} for _ in range(n_requests)]
+    latencies = np.empty(n_requests)
+    errors = []
+    lock = threading.Lock()
+
+    def send(i):
+        start = time.perf_counter()
+        try:
+            _post(url, payloads[i], timeout)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+        latencies[i] = time.perf_counter() - start
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(n_requests)))
+    elapsed = time.perf_counter() - started
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "rows_per_request": rows_per_request,
+        "errors": len(errors),
+        "elapsed_s": elapsed,
+        "requests_per_s": n_requests / elapsed,
+        "rows_per_s": n_requests * rows_per_request / elapsed,
+        "latency_ms": {"p50": p50, "p90": p90, "p99": p99, "max": latencies.max() * 1000},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the BankNote prediction server.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080/predict")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=1)
+    args = parser.parse_args()
+
+    report = run_load_test(args.url, args.requests, args.concurrency, args.rows)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.features import BASE_COLUMNS, FeatureEngine
+from src.models import ModelArtifactStore, load_model, predict_features
+from src.utils import METRICS, SharedArray
+
+# Per-worker state, set once by _init_worker: the model and the feature engine.
+_worker = {}
+
+
+def _init_worker(model, store_root, version):
+    if model is None:
+        # Loaded from the store rather than pickled from the parent: the version's
+        # sklearn estimator when it has one (faster on shard-sized batches),
+        # otherwise its memory-mapped tree arrays, shared by every worker.
+        model = load_model(ModelArtifactStore(root=store_root), version=version)
+    _worker["model"] = model
+    _worker["engine"] = FeatureEngine()
+
+
+def _score_shard(specs, start, stop):
+    """Featurizes and predicts rows [start, stop) of the shared batch in place, then detaches from it."""
+    attached = [SharedArray.attach(spec, writeable=True) for spec in specs]
+    handles = [shm for _, shm in attached]
+    try:
+        return _fill_shard(*(array for array, _ in attached), start, stop)
+    finally:
+        # Drop the views so the mappings can be released; the parent frees the blocks.
+        del attached
+        for shm in handles:
+            try:
+                shm.close()
+            except BufferError:
+                # A pending exception still references the views; they go with it.
+                pass
+
+
+def _fill_shard(values, features, predictions, start, stop):
+    engine = _worker["engine"]
+    shard_features = engine.compute(values[start:stop], out=features[:, start:stop])
+    predictions[start:stop] = predict_features(_worker["model"], shard_features, engine.feature_names)
+    return stop - start
+
+
+class ParallelScorer:
+    """
+    Scores large batches on all cores by splitting them into shards across a process pool.
+
+    Each batch is copied once into shared memory next to a shared feature block
+    and a preallocated prediction column. Workers receive only the block names
+    and a row range, write features and predictions for their shard in place,
+    and return a row count, so no rows are pickled either way; they detach from
+    the blocks as soon as their shard is written. The model is loaded once per
+    worker when the pool starts: for a store version, by each worker from the
+    store (see load_model), or, for a model object, by sending it once per
+    worker. Predictions come back in input order.
+    """
+
+    def __init__(self, model=None, store=None, version=None, n_workers=None, shard_rows=None):
+        if model is None and store is None:
+            raise ValueError("ParallelScorer needs a model or an artifact store")
+        self.engine = FeatureEngine()
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.shard_rows = shard_rows
+        if model is None:
+            version = version or store.latest_version()
+            model = store.load(version)
+            initargs = (None, store.root, version)
+        else:
+            initargs = (model, None, None)
+        self.model = model
+        self.version = getattr(model, "version", None)
+        self._prediction_dtype = np.asarray(getattr(model, "classes_", np.empty(0, dtype=np.int64))).dtype
+        self._pool = ProcessPoolExecutor(max_workers=self.n_workers, initializer=_init_worker, initargs=initargs)
+
+    def _shards(self, n_rows):
+        # A few shards per worker balance uneven progress without much scheduling overhead.
+        shard_rows = self.shard_rows or max(10_000, -(-n_rows // (self.n_workers * 4)))
+        return [(start, min(start + shard_rows, n_rows)) for start in range(0, n_rows, shard_rows)]
+
+    def score(self, values, out=None):
+        """
+        Featurizes and predicts a batch of raw measurements.
+
+        Args:
+            values (np.ndarray): Raw measurements in BASE_COLUMNS order, shape (n_rows, 4).
+            out (np.ndarray, optional): Preallocated prediction column of n_rows.
+
+        Returns:
+            tuple: (features of shape (n_rows, n_features), predictions of shape (n_rows,)).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n_rows = values.shape[0]
+        if out is None:
+            out = np.empty(n_rows, dtype=self._prediction_dtype)
+        features = np.empty((n_rows, len(self.engine.feature_names)), dtype=np.float64)
+        if n_rows == 0:
+            return features, out
+
+        shared_values = SharedArray(values)
+        shared_features = SharedArray(shape=(len(self.engine.feature_names), n_rows), dtype=np.float64)
+        shared_predictions = SharedArray(shape=(n_rows,), dtype=out.dtype)
+        try:
+            specs = (shared_values.spec, shared_features.spec, shared_predictions.spec)
+            futures = [self._pool.submit(_score_shard, specs, start, stop) for start, stop in self._shards(n_rows)]
+            scored = sum(future.result() for future in futures)
+            if scored != n_rows:
+                raise Exception(f"Scored {scored} of {n_rows} rows")
+            features[...] = shared_features.array.T
+            out[...] = shared_predictions.array
+        finally:
+            shared_values.close()
+            shared_features.close()
+            shared_predictions.close()
+        return features, out
+
+    def score_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Scores a DataFrame of measurements like prediction_service.score_frame.
+
+        Returns:
+            pd.DataFrame: Feature columns plus a 'prediction' column, ready to insert.
+        """
+        with METRICS.stage("predict_parallel", rows=len(df)):
+            features, predictions = self.score(df[list(BASE_COLUMNS)].to_numpy())
+        scored = pd.DataFrame(features, columns=self.engine.feature_names, copy=False)
+        scored['prediction'] = predictions
+        return scored
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,241 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from src.features import BASE_COLUMNS, FeatureEngine
+from src.models import HotSwapModel, ModelArtifactStore, PredictionCache, load_model, predict_features
+from src.utils import METRICS
+
+
+class MicroBatcher:
+    """
+    Collects small prediction requests into micro-batches for one vectorized model call.
+
+    A batch is dispatched as soon as it holds `max_batch_size` rows or the oldest
+    request in it has waited `max_wait_ms`, whichever comes first. Requests larger
+    than `max_batch_size` are scored on their own. With a PredictionCache, rows
+    seen before under the same model version skip feature creation and the model.
+    """
+
+    def __init__(self, model, max_batch_size: int = 256, max_wait_ms: float = 2.0, cache=None):
+        self.model = model
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.engine = FeatureEngine()
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        self._block = self.engine.allocate(max_batch_size)
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, values) -> Future:
+        """
+        Queues rows of raw measurements (shape (n_rows, 4), BASE_COLUMNS order).
+
+        Returns:
+            Future: Resolves to the array of predictions for these rows.
+        """
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(BASE_COLUMNS))
+        future = Future()
+        self._queue.put((values, future))
+        return future
+
+    def predict(self, values, timeout: float = None) -> np.ndarray:
+        return self.submit(values).result(timeout=timeout)
+
+    def close(self):
+        self._stopped.set()
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            n_rows = len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            while n_rows < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._stopped.set()
+                    break
+                batch.append(item)
+                n_rows += len(item[0])
+            self._score(batch, n_rows)
+
+    def _current_model(self):
+        """The model for one batch; a HotSwapModel is refreshed here, not halfway through scoring."""
+        return self.model.model if isinstance(self.model, HotSwapModel) else self.model
+
+    def _predict_values(self, values, model):
+        out = self._block if len(values) <= self.max_batch_size else None
+        features = self.engine.compute(values, out=out)
+        return np.asarray(predict_features(model, features, self.engine.feature_names))
+
+    def _score(self, batch, n_rows):
+        try:
+            values = batch[0][0] if len(batch) == 1 else np.concatenate([values for values, _ in batch])
+            METRICS.observe("batch_rows", n_rows)
+            with METRICS.stage("predict", rows=n_rows):
+                # The cache key and the predictions must come from the same model, even if
+                # a new version is published while this batch is being scored.
+                model = self._current_model()
+                if self.cache is not None:
+                    # Models without a version (e.g. a plain pickle) are never swapped, so
+                    # their identity is enough to tell them apart.
+                    version = getattr(model, "version", None) or id(model)
+                    predictions = self.cache.predict(values, lambda missing: self._predict_values(missing, model),
+                                                     model_version=version)
+                else:
+                    predictions = self._predict_values(values, model)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += n_rows
+        start = 0
+        for values, future in batch:
+            future.set_result(predictions[start:start + len(values)])
+            start += len(values)
+
+
+def parse_rows(payload) -> np.ndarray:
+    """
+    Converts a request payload into an (n_rows, 4) array.
+
+    Accepts a single row or {"rows": [...]}, where each row is either a list in
+    BASE_COLUMNS order or an object keyed by column name.
+    """
+    rows = payload["rows"] if isinstance(payload, dict) and "rows" in payload else [payload]
+    values = [
+        [row[col] for col in BASE_COLUMNS] if isinstance(row, dict) else row
+        for row in rows
+    ]
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 2 or values.shape[1] != len(BASE_COLUMNS):
+        raise ValueError(f"Each row needs {len(BASE_COLUMNS)} values: {', '.join(BASE_COLUMNS)}")
+    return values
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler: POST /predict scores rows, GET /health reports batching stats and
+    GET /metrics exposes the process metrics in Prometheus text format.
+    """
+
+    batcher: MicroBatcher = None
+    request_timeout = 30.0
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            values = parse_rows(json.loads(self.rfile.read(length)))
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        try:
+            predictions = self.batcher.predict(values, timeout=self.request_timeout)
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+            return
+        self._send(200, {
+            "predictions": predictions.tolist(),
+            "model_version": getattr(self.batcher.model, "version", None),
+        })
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            data = METRICS.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        if self.path != "/health":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        body = {"status": "ok", "batches": self.batcher.batches, "rows": self.batcher.rows}
+        if self.batcher.cache is not None:
+            body["cache"] = self.batcher.cache.stats()
+        self._send(200, body)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the latency being measured.
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class PredictionHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections under bursts of clients.
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def create_server(model, host="127.0.0.1", port=8080, max_batch_size=256, max_wait_ms=2.0, cache_size=0):
+    """
+    Builds a threaded HTTP prediction server backed by a MicroBatcher.
+
+    Returns:
+        PredictionHTTPServer: Call serve_forever() to run it; server.batcher holds the batcher.
+    """
+    cache = PredictionCache(max_size=cache_size) if cache_size else None
+    batcher = MicroBatcher(model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, cache=cache)
+    handler = type("BoundPredictionRequestHandler", (PredictionRequestHandler,), {"batcher": batcher})
+    server = PredictionHTTPServer((host, port), handler)
+    server.batcher = batcher
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching BankNote prediction server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--cache-size", type=int, default=100_000,
+                        help="Maximum cached predictions; 0 disables the cache.")
+    args = parser.parse_args()
+
+    store = ModelArtifactStore()
+    # Follow new model versions when the store has one; otherwise serve the legacy pickle.
+    model = HotSwapModel(store) if store.latest_version() else load_model(store)
+    server = create_server(model, args.host, args.port, args.max_batch_size, args.max_wait_ms, args.cache_size)
+    print(f"Serving predictions on http://{args.host}:{server.server_port}/predict")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.batcher.close()
+
+
+if __name__ == "__main__":
+    main()
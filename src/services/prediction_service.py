@@ -1,28 +1,259 @@
+import argparse
+import os
+
 from src.data import SnowflakeDB
 from src.preprocessing import DataCleaning
 from src.features import FeatureCreation
-import pickle
-# Access the snowflake connection details
-snowflake = SnowflakeDB()
+from src.models import ModelArtifactStore, load_model
+from src.utils import METRICS, Pipeline, get_logger, profile_if_enabled
+from src.services.incremental_scoring import IncrementalScorer
+from src.services.parallel_scoring import ParallelScorer
+
+logger = get_logger("services.prediction_service")
+
+SOURCE_TABLE = "BANK_NOTE_TB"
+TARGET_TABLE = "BANK_NOTE_PRED"
+FEATURE_COLUMNS = ['VARIANCE', 'SKEWNESS', 'CURTOSIS', 'ENTROPY']
+
+# Incremental mode scores only source rows past the last checkpointed ID and
+# skips rows already in the target, so a retried or repeated run never writes a
+# row twice (see incremental_scoring.py). It needs the source table's ID column,
+# which existing tables lack until they are backfilled, so it is opt-in
+# (--incremental). The other modes re-score everything the stream returns and
+# append it.
+INCREMENTAL = False
+
+# Streaming mode reads the stream in chunks sized to stay under MAX_MEMORY_MB and
+# writes each chunk back as soon as it is scored. Set to False to score the whole
+# stream as a single DataFrame.
+STREAMING = True
+MAX_MEMORY_MB = 256
+
+# In streaming mode, run read, clean, featurize, predict and write as concurrent
+# stages over bounded queues, so reading the next chunk and writing the previous
+# one overlap with scoring. PIPELINE_QUEUE_SIZE chunks may wait between stages.
+PIPELINED = True
+PIPELINE_QUEUE_SIZE = 2
+
+# Worker processes for sharded multi-core scoring (see parallel_scoring.py); 0 or
+# 1 scores in this process. Each streamed chunk is split across the workers, so
+# raise MAX_MEMORY_MB to give them multi-million-row chunks on large backlogs.
+WORKERS = 0
+
+# Upper bound on the bytes a single row occupies while it is in flight: the raw
+# float columns, the uniq_key string, the feature columns, the prediction and
+# the temporaries created by read_sql and write_pandas.
+BYTES_PER_ROW = 1024
+
+# Stage timings, row and byte counts and query latencies for the run are written
+# here (JSON lines; use a .prom path for Prometheus text). BANKNOTE_PROFILE=<file>
+# additionally records a sampling profile of the run.
+METRICS_PATH = os.environ.get(
+    "BANKNOTE_METRICS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "artifacts", "metrics",
+                 "prediction_service.jsonl"),
+)
+
+
+def batch_size_for_memory(max_memory_mb, bytes_per_row=BYTES_PER_ROW):
+    """
+    Returns the number of rows per chunk that keeps one in-flight chunk under max_memory_mb.
+    """
+    return max(1, int(max_memory_mb * 1024 * 1024) // bytes_per_row)
+
+
+def score_frame(df, model):
+    """
+    Runs cleaning, feature creation and prediction on one DataFrame.
+
+    Args:
+        df (pd.DataFrame): Rows holding at least FEATURE_COLUMNS.
+        model: Fitted estimator exposing predict().
+
+    Returns:
+        pd.DataFrame: Feature columns plus a 'prediction' column, ready to insert.
+    """
+    with METRICS.stage("clean", rows=len(df)):
+        df_cleaned = clean_frame(df)
+    with METRICS.stage("featurize", rows=len(df)):
+        new_data = featurize_frame(df_cleaned)
+    with METRICS.stage("predict", rows=len(df)):
+        return predict_frame(new_data, model)
+
+
+def clean_frame(df):
+    """Selects the measurement columns and adds the row key."""
+    return DataCleaning.add_realtime_unique_key(df[FEATURE_COLUMNS])
+
+
+def featurize_frame(df_cleaned):
+    """Adds the engineered features and drops the row key the model does not use."""
+    df_featured = FeatureCreation.main_feature_creation(df_cleaned, inplace=True)
+    return df_featured.drop(columns=["uniq_key"])
+
+
+def predict_frame(new_data, model):
+    """Adds the model's 'prediction' column."""
+    new_data['prediction'] = model.predict(new_data)
+    return new_data
+
+
+def score_stream(snowflake, model, max_memory_mb=MAX_MEMORY_MB, batch_size=None, scorer=None):
+    """
+    Scores the source stream chunk by chunk, inserting each chunk as soon as it is scored.
+
+    Only one chunk is alive at a time, so peak memory is bounded by the chunk size
+    rather than by the size of the backlog.
+
+    Args:
+        snowflake (SnowflakeDB): Connection used for both the read and the writes.
+        model: Fitted estimator exposing predict().
+        max_memory_mb (float): Memory ceiling for one in-flight chunk.
+        batch_size (int, optional): Explicit rows per chunk; overrides max_memory_mb.
+        scorer (ParallelScorer, optional): Scores each chunk across worker processes instead of with `model`.
+
+    Returns:
+        int: Total number of rows written.
+    """
+    batch_size = batch_size or batch_size_for_memory(max_memory_mb)
+    total_rows = 0
+    chunks = snowflake.read_table_arrow(table_name=SOURCE_TABLE, columns=FEATURE_COLUMNS, stream=True,
+                                        batch_size=batch_size)
+    for chunk in METRICS.iter_stage("read", chunks):
+        scored = scorer.score_frame(chunk) if scorer is not None else score_frame(chunk, model)
+        with METRICS.stage("write", rows=len(scored)):
+            total_rows += snowflake.insert_dataframe(scored, table_name=TARGET_TABLE, if_exists="append")
+        del chunk, scored
+    return total_rows
+
+
+def score_stream_pipelined(snowflake, model, max_memory_mb=MAX_MEMORY_MB, batch_size=None,
+                           queue_size=PIPELINE_QUEUE_SIZE):
+    """
+    Scores the source stream with read, clean, featurize, predict and write running
+    concurrently, each stage in its own thread, connected by bounded queues.
+
+    A stage that gets ahead blocks once its output queue is full, so at most
+    `queue_size` chunks wait between any two stages. The chunk size is chosen so
+    that every chunk that can be in flight at once fits in max_memory_mb.
+
+    Args:
+        snowflake (SnowflakeDB): Connection used for the read and the writes; enable
+            pooling so the reading and writing stages use separate connections.
+        model: Fitted estimator exposing predict().
+        max_memory_mb (float): Memory ceiling for all in-flight chunks together.
+        batch_size (int, optional): Explicit rows per chunk; overrides max_memory_mb.
+        queue_size (int): Chunks buffered between consecutive stages.
+
+    Returns:
+        int: Total number of rows written.
+    """
+    stages = [
+        ("clean", clean_frame),
+        ("featurize", featurize_frame),
+        ("predict", lambda df: predict_frame(df, model)),
+        ("write", lambda df: snowflake.insert_dataframe(df, table_name=TARGET_TABLE, if_exists="append")),
+    ]
+    # One chunk inside each stage (and the reader) plus full queues in front of every stage.
+    max_in_flight = len(stages) + 1 + len(stages) * queue_size
+    batch_size = batch_size or batch_size_for_memory(max_memory_mb / max_in_flight)
+    chunks = snowflake.read_table_arrow(table_name=SOURCE_TABLE, columns=FEATURE_COLUMNS, stream=True,
+                                        batch_size=batch_size)
+    return sum(Pipeline(chunks, stages, queue_size=queue_size).run())
+
+
+def score_incremental(snowflake, model, max_memory_mb=MAX_MEMORY_MB, scorer=None):
+    """
+    Scores the source rows past the checkpoint in chunks of at most max_memory_mb.
+
+    Returns:
+        int: Number of rows newly written.
+    """
+    incremental = IncrementalScorer(snowflake, model, source_table=SOURCE_TABLE, target_table=TARGET_TABLE,
+                                    batch_size=batch_size_for_memory(max_memory_mb), scorer=scorer)
+    return incremental.run()["rows_written"]
+
+
+def run(snowflake=None, model=None, streaming=STREAMING, pipelined=PIPELINED, max_memory_mb=MAX_MEMORY_MB,
+        metrics_path=METRICS_PATH, workers=WORKERS, incremental=INCREMENTAL):
+    """
+    Scores the source table (or its stream) into the target table.
+
+    Args:
+        snowflake (SnowflakeDB, optional): Connection to use; defaults to one built from the config file.
+        model (optional): Fitted estimator; defaults to the active artifact store version.
+        streaming (bool): Score chunk by chunk under max_memory_mb rather than in one DataFrame.
+        pipelined (bool): In streaming mode, overlap the stages (see score_stream_pipelined).
+        max_memory_mb (float): Memory ceiling for in-flight chunks.
+        metrics_path (str, optional): Where to write the run's metrics; None skips writing.
+        workers (int): Score each streamed chunk across this many processes (takes
+            precedence over pipelined).
+        incremental (bool): Score only rows past the checkpoint, idempotently (takes
+            precedence over streaming and pipelined).
+
+    Returns:
+        int: Total number of rows written.
+    """
+    # Access the snowflake connection details
+    snowflake = snowflake or SnowflakeDB()
+
+    # Load the active model version from the artifact store (its sklearn estimator, when saved, for batch speed)
+    store = version = None
+    if model is None:
+        store = ModelArtifactStore()
+        version = store.latest_version()
+        model = load_model(store, version=version)
+
+    def parallel_scorer():
+        # Workers load a store version themselves instead of each receiving a pickled model.
+        if version is not None:
+            return ParallelScorer(store=store, version=version, n_workers=workers)
+        return ParallelScorer(model, n_workers=workers)
 
-# read ori table from snowflake
-df = snowflake.read_table(table_name="BANK_NOTE_TB", stream=True)
-df = df[['VARIANCE', 'SKEWNESS', 'CURTOSIS', 'ENTROPY', 'CLASS']]
+    with profile_if_enabled():
+        if incremental and workers > 1:
+            with parallel_scorer() as scorer:
+                rows_written = score_incremental(snowflake, model, max_memory_mb=max_memory_mb, scorer=scorer)
+        elif incremental:
+            rows_written = score_incremental(snowflake, model, max_memory_mb=max_memory_mb)
+        elif streaming and workers > 1:
+            with parallel_scorer() as scorer:
+                rows_written = score_stream(snowflake, model, max_memory_mb=max_memory_mb, scorer=scorer)
+        elif streaming and pipelined:
+            if snowflake.pool is None:
+                snowflake.enable_pooling(min_size=1, max_size=2)
+            rows_written = score_stream_pipelined(snowflake, model, max_memory_mb=max_memory_mb)
+        elif streaming:
+            rows_written = score_stream(snowflake, model, max_memory_mb=max_memory_mb)
+        else:
+            # read ori table from snowflake
+            with METRICS.stage("read") as read:
+                df = snowflake.read_table(table_name=SOURCE_TABLE, stream=True)
+                read.rows = len(df)
+            new_data = score_frame(df, model)
+            with METRICS.stage("write", rows=len(new_data)):
+                rows_written = snowflake.insert_dataframe(new_data, table_name=TARGET_TABLE, if_exists="append")
 
-# data cleaning
-df_cleaned = DataCleaning.add_realtime_unique_key(df)
-df_featured = FeatureCreation.main_feature_creation(df_cleaned)
-new_data = df_featured.drop(columns=["CLASS", "uniq_key"])
+    logger.info(f"Scored {rows_written} rows.")
+    if metrics_path:
+        METRICS.write(metrics_path)
+        logger.info(f"Metrics written to {metrics_path}")
+    return rows_written
 
-# Load the saved model from the specified file path
-model_path = '../../artifacts/models/BankNote.pickle'
-with open(model_path, 'rb') as f:
-    model = pickle.load(f)
 
-# Make predictions on the new data
-predictions = model.predict(new_data)
+def main():
+    parser = argparse.ArgumentParser(description="Score new BankNote rows into the prediction table.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Score only the source rows past the checkpointed ID (needs the ID column).")
+    parser.add_argument("--batch", action="store_true", help="Score the whole stream as one DataFrame.")
+    parser.add_argument("--sequential", action="store_true", help="Stream without overlapping the stages.")
+    parser.add_argument("--max-memory-mb", type=float, default=MAX_MEMORY_MB)
+    parser.add_argument("--metrics", default=METRICS_PATH, help="Metrics output (.jsonl or .prom).")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Score chunks across this many processes.")
+    args = parser.parse_args()
+    run(streaming=not args.batch, pipelined=not args.sequential, max_memory_mb=args.max_memory_mb,
+        metrics_path=args.metrics, workers=args.workers, incremental=args.incremental or INCREMENTAL)
 
-# Assume new_data is your DataFrame and predictions is an array or list
-new_data['prediction'] = predictions
 
-snowflake.insert_dataframe(new_data, table_name="BANK_NOTE_PRED", if_exists="append")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+
+from src.utils import Scheduler, get_logger
+
+logger = get_logger("services.scheduled_jobs")
+
+STREAM_NAME = "BANK_NOTE_TB_STREAM"
+SCORING_POLL_SECONDS = 60.0
+SCORING_INTERVAL_SECONDS = 15 * 60.0
+RETRAIN_INTERVAL_SECONDS = 24 * 60 * 60.0
+
+
+def stream_has_data(db, stream=STREAM_NAME) -> bool:
+    """Asks Snowflake whether the stream holds unconsumed rows, without reading them."""
+    return bool(db.execute_query(f"SELECT SYSTEM$STREAM_HAS_DATA('{stream}')")[0][0])
+
+
+def rows_pending(db) -> bool:
+    """Whether the source table holds rows past the scoring checkpoint."""
+    from src.services.incremental_scoring import IncrementalScorer
+
+    return IncrementalScorer(db, model=None).has_pending()
+
+
+def run_scoring():
+    """Scores the stream with the prediction service."""
+    from src.services import prediction_service
+
+    prediction_service.run()
+
+
+def run_retraining():
+    """Retrains the model and publishes a new artifact store version."""
+    from src.models import training
+
+    training.train()
+
+
+def build_scheduler(db=None, max_concurrent=2, scoring_interval=SCORING_INTERVAL_SECONDS,
+                    scoring_poll=SCORING_POLL_SECONDS, retrain_interval=RETRAIN_INTERVAL_SECONDS) -> Scheduler:
+    """
+    Schedules scoring whenever there is new data to score (and at least every
+    `scoring_interval` seconds), and retraining every `retrain_interval` seconds.
+    New data means unconsumed stream rows, or rows past the scoring checkpoint
+    when the prediction service scores incrementally.
+    Neither job overlaps itself, including with runs started by other processes.
+    """
+    from src.services.prediction_service import INCREMENTAL
+
+    scheduler = Scheduler(max_concurrent=max_concurrent)
+    has_new_data = rows_pending if INCREMENTAL else stream_has_data
+    trigger = (lambda: has_new_data(db)) if db is not None else None
+    scheduler.add_job("scoring", run_scoring, interval=scoring_interval, trigger=trigger, poll_interval=scoring_poll)
+    scheduler.add_job("retraining", run_retraining, interval=retrain_interval)
+    return scheduler
+
+
+def main():
+    from src.data import SnowflakeDB
+
+    parser = argparse.ArgumentParser(description="Run the BankNote scoring and retraining jobs.")
+    parser.add_argument("--max-concurrent", type=int, default=2)
+    parser.add_argument("--scoring-interval", type=float, default=SCORING_INTERVAL_SECONDS)
+    parser.add_argument("--scoring-poll", type=float, default=SCORING_POLL_SECONDS)
+    parser.add_argument("--retrain-interval", type=float, default=RETRAIN_INTERVAL_SECONDS)
+    args = parser.parse_args()
+
+    scheduler = build_scheduler(SnowflakeDB(), args.max_concurrent, args.scoring_interval, args.scoring_poll,
+                                args.retrain_interval)
+    logger.info(f"Scheduling jobs: {', '.join(scheduler.jobs)}")
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+
+if __name__ == "__main__":
+    main()
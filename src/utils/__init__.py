@@ -0,0 +1,27 @@
+# src/utils/__init__.py
+from .lazy import lazy_exports
+
+# Public names and the submodule defining each, imported on first access (PEP 562).
+_EXPORTS = {
+    # The logging, metrics and profiling helpers from logger.py
+    "METRICS": ".logger",
+    "Metrics": ".logger",
+    "SamplingProfiler": ".logger",
+    "get_logger": ".logger",
+    "peak_memory_bytes": ".logger",
+    "profile_if_enabled": ".logger",
+    # The job scheduler and the bounded-queue stage pipeline from scheduler.py
+    "FileLock": ".scheduler",
+    "Job": ".scheduler",
+    "Pipeline": ".scheduler",
+    "PipelineError": ".scheduler",
+    "Scheduler": ".scheduler",
+    # The shared-memory NumPy array from shared_array.py
+    "SharedArray": ".shared_array",
+    # The PEP 562 lazy-export hooks from lazy.py
+    "lazy_exports": ".lazy",
+}
+
+# Optional: Define __all__ to explicitly declare the public API of this package.
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
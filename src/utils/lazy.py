@@ -0,0 +1,29 @@
+# src/utils/lazy.py
+import importlib
+import sys
+
+
+def lazy_exports(name, exports):
+    """
+    Builds the module-level __getattr__ and __dir__ of a package whose public
+    names are imported from their submodules on first access (PEP 562).
+
+    Parameters:
+        name (str): The package's __name__.
+        exports (dict): Public name -> relative submodule defining it, e.g. {"SnowflakeDB": ".db"}.
+
+    Returns:
+        tuple: (__getattr__, __dir__), to be assigned in the package's __init__.
+    """
+    def __getattr__(attr):
+        if attr not in exports:
+            raise AttributeError(f"module {name!r} has no attribute {attr!r}")
+        value = getattr(importlib.import_module(exports[attr], name), attr)
+        # Later lookups find the name in the package and skip this hook.
+        setattr(sys.modules[name], attr, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[name])) | set(exports))
+
+    return __getattr__, __dir__
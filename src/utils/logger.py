@@ -0,0 +1,354 @@
+# src/utils/logger.py
+import collections
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+METRIC_PREFIX = "banknote_"
+
+# Setting BANKNOTE_PROFILE to a file path turns on the sampling profiler in profile_if_enabled().
+PROFILE_ENV = "BANKNOTE_PROFILE"
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns a logger under the 'banknote' namespace.
+
+    The namespace gets a single stderr handler the first time this is called; the
+    level comes from the BANKNOTE_LOG_LEVEL environment variable (default INFO).
+    """
+    root = logging.getLogger("banknote")
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(os.environ.get("BANKNOTE_LOG_LEVEL", "INFO").upper())
+        root.propagate = False
+    return root.getChild(name)
+
+
+def peak_memory_bytes() -> int:
+    """Peak resident set size of this process so far (0 where the platform does not report it)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+_EXHAUSTED = object()
+
+
+class StageRecord:
+    """Mutable handle yielded by Metrics.stage(); set rows and bytes once they are known."""
+
+    __slots__ = ("name", "rows", "bytes", "seconds")
+
+    def __init__(self, name, rows=None, nbytes=None):
+        self.name = name
+        self.rows = rows
+        self.bytes = nbytes
+        self.seconds = None
+
+
+class Metrics:
+    """
+    A thread-safe registry of counters, gauges and duration summaries.
+
+    Recording a value is a dict update under a lock, cheap enough to leave on in
+    production. Series are identified by a name and optional labels, and the
+    registry exports as Prometheus text or JSON lines. When `event_path` is set,
+    every finished stage is also appended to that file as one JSON line.
+    """
+
+    def __init__(self, event_path: str = None):
+        self.event_path = event_path
+        self._lock = threading.Lock()
+        self._counters = collections.defaultdict(float)
+        self._gauges = {}
+        # (name, labels) -> [count, sum, min, max]
+        self._summaries = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def increment(self, name: str, value: float = 1, **labels):
+        """Adds `value` to a counter."""
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def set_max(self, name: str, value: float, **labels):
+        """Raises a gauge to `value` if it is higher, e.g. for peak memory."""
+        key = self._key(name, labels)
+        with self._lock:
+            if value > self._gauges.get(key, float("-inf")):
+                self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Records one observation (typically seconds) in a count/sum/min/max summary."""
+        key = self._key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                self._summaries[key] = [1, value, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                summary[2] = min(summary[2], value)
+                summary[3] = max(summary[3], value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observes the duration of the block under `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None, nbytes: int = None):
+        """
+        Times one pipeline stage (read, clean, featurize, predict, write, ...).
+
+        Yields a StageRecord whose `rows` and `bytes` may be filled in inside the
+        block. On exit the duration, row and byte counts and the process's peak
+        memory are recorded, labelled with the stage name.
+        """
+        record = StageRecord(name, rows, nbytes)
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - started
+            self.observe("stage_seconds", record.seconds, stage=name)
+            if record.rows is not None:
+                self.increment("stage_rows_total", record.rows, stage=name)
+            if record.bytes is not None:
+                self.increment("stage_bytes_total", record.bytes, stage=name)
+            peak = peak_memory_bytes()
+            self.set_max("peak_memory_bytes", peak)
+            if self.event_path:
+                self._write_event({
+                    "event": "stage",
+                    "stage": name,
+                    "seconds": record.seconds,
+                    "rows": record.rows,
+                    "bytes": record.bytes,
+                    "rows_per_sec": record.rows / record.seconds if record.rows and record.seconds else None,
+                    "peak_memory_bytes": peak,
+                    "timestamp": time.time(),
+                })
+
+    def iter_stage(self, name: str, iterable):
+        """
+        Yields from `iterable`, recording each item's production (e.g. fetching a
+        chunk) as one run of stage `name`, with len(item) as its rows.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name) as record:
+                item = next(iterator, _EXHAUSTED)
+                if item is not _EXHAUSTED and hasattr(item, "__len__"):
+                    record.rows = len(item)
+            if item is _EXHAUSTED:
+                return
+            yield item
+
+    def timed(self, name: str, **labels):
+        """Decorator form of timer()."""
+        def decorator(func):
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            wrapper.__name__ = func.__name__
+            wrapper.__doc__ = func.__doc__
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> list:
+        """
+        Returns every series as a dict with 'metric', 'type', 'labels' and its values.
+        Stages that counted rows also get a derived 'stage_rows_per_second' gauge.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            summaries = {key: list(value) for key, value in self._summaries.items()}
+
+        series = []
+        for (name, labels), value in counters.items():
+            series.append({"metric": name, "type": "counter", "labels": dict(labels), "value": value})
+        for (name, labels), value in gauges.items():
+            series.append({"metric": name, "type": "gauge", "labels": dict(labels), "value": value})
+        for (name, labels), (count, total, low, high) in summaries.items():
+            series.append({"metric": name, "type": "summary", "labels": dict(labels),
+                           "count": count, "sum": total, "min": low, "max": high})
+            rows = counters.get(("stage_rows_total", labels))
+            if name == "stage_seconds" and rows and total:
+                series.append({"metric": "stage_rows_per_second", "type": "gauge",
+                               "labels": dict(labels), "value": rows / total})
+        return series
+
+    def to_prometheus(self) -> str:
+        """Renders the registry in the Prometheus text exposition format."""
+        lines = []
+        typed = set()
+        for entry in sorted(self.snapshot(), key=lambda entry: (entry["metric"], sorted(entry["labels"].items()))):
+            name = METRIC_PREFIX + entry["metric"]
+            if name not in typed:
+                lines.append(f"# TYPE {name} {entry['type']}")
+                typed.add(name)
+            labels = ",".join(f'{key}="{value}"' for key, value in sorted(entry["labels"].items()))
+            labels = f"{{{labels}}}" if labels else ""
+            if entry["type"] == "summary":
+                lines.append(f"{name}_count{labels} {entry['count']}")
+                lines.append(f"{name}_sum{labels} {entry['sum']!r}")
+            else:
+                lines.append(f"{name}{labels} {entry['value']!r}")
+        return "\n".join(lines) + "\n"
+
+    def to_json_lines(self) -> str:
+        """Renders every series as one JSON object per line, stamped with the current time."""
+        now = time.time()
+        return "".join(json.dumps(dict(entry, timestamp=now)) + "\n" for entry in self.snapshot())
+
+    def write(self, path: str):
+        """Writes the registry to `path`: Prometheus text for a .prom file, JSON lines otherwise."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json_lines()
+        with open(path, "w") as file:
+            file.write(content)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+    def _write_event(self, event):
+        line = json.dumps(event) + "\n"
+        with self._lock:
+            with open(self.event_path, "a") as file:
+                file.write(line)
+
+
+# Process-wide registry used by the data, model and service modules.
+METRICS = Metrics()
+
+
+class SamplingProfiler:
+    """
+    A statistical profiler for a single run.
+
+    A background thread wakes every `interval` seconds and records the current
+    Python stack of the profiled thread, so the cost is a stack walk per sample
+    rather than a hook on every call. Samples are reported as the hottest
+    functions (own and cumulative share) and can be dumped as collapsed stacks
+    for flame graph tools.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[tuple(reversed(stack))] += 1
+
+    def hot_paths(self, top: int = 20) -> list:
+        """
+        Returns up to `top` functions ordered by own samples, with their own and
+        cumulative (anywhere on the stack) share of all samples.
+        """
+        total = sum(self.samples.values())
+        if not total:
+            return []
+        own = collections.Counter()
+        cumulative = collections.Counter()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for function in set(stack):
+                cumulative[function] += count
+        return [
+            {"function": function, "own": count / total, "cumulative": cumulative[function] / total}
+            for function, count in own.most_common(top)
+        ]
+
+    def dump(self, path: str, top: int = 20):
+        """
+        Writes collapsed stacks ('frame;frame;frame count' per line) to `path` and
+        a JSON hot-path summary next to it.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as file:
+            for stack, count in self.samples.most_common():
+                file.write(";".join(stack) + f" {count}\n")
+        with open(path + ".json", "w") as file:
+            json.dump({"samples": sum(self.samples.values()), "interval": self.interval,
+                       "hot_paths": self.hot_paths(top)}, file, indent=2)
+
+
+@contextmanager
+def profile_if_enabled(path: str = None, interval: float = 0.005):
+    """
+    Profiles the block when `path` is given or the BANKNOTE_PROFILE environment
+    variable names an output file; otherwise does nothing.
+    """
+    path = path or os.environ.get(PROFILE_ENV)
+    if not path:
+        yield None
+        return
+    profiler = SamplingProfiler(interval).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        profiler.dump(path)
+        get_logger("profiler").info("Wrote %d samples to %s", sum(profiler.samples.values()), path)
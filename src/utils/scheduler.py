@@ -0,0 +1,332 @@
+# src/utils/scheduler.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .logger import METRICS, get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = get_logger("utils.scheduler")
+
+# Lock files live next to the project so every process on the host agrees on them.
+LOCK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "artifacts", "locks")
+
+
+class FileLock:
+    """
+    A non-blocking, cross-process exclusive lock on a file.
+
+    Uses flock(), which the OS releases when the holder exits, so a crashed run
+    never leaves a stale lock behind. On platforms without fcntl the lock file is
+    created exclusively instead and removed on release.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._fd = None
+
+    def acquire(self) -> bool:
+        """Takes the lock if it is free; returns False immediately if another holder has it."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if fcntl is None:
+            try:
+                self._fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                return False
+            return True
+        fd = os.open(self.path, os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        if fcntl is None:
+            os.close(self._fd)
+            os.remove(self.path)
+        else:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+    @property
+    def locked(self) -> bool:
+        return self._fd is not None
+
+
+class Job:
+    """
+    A named unit of work run by the Scheduler on an interval, a trigger, or both.
+
+    Attributes:
+        name (str): Unique job name; also names the job's lock file.
+        func (callable): Called with no arguments for each run.
+        interval (float, optional): Seconds between runs (measured from run starts).
+        trigger (callable, optional): Polled every `poll_interval` seconds; a truthy
+            result starts a run (e.g. "the source stream has new rows").
+        poll_interval (float): Seconds between trigger checks.
+    """
+
+    def __init__(self, name, func, interval=None, trigger=None, poll_interval=30.0, lock_path=None):
+        if interval is None and trigger is None:
+            raise ValueError(f"Job '{name}' needs an interval or a trigger")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.trigger = trigger
+        self.poll_interval = poll_interval
+        self.lock = FileLock(lock_path or os.path.join(LOCK_DIR, f"{name}.lock"))
+        self.running = False
+        self.last_started = None
+        self.last_polled = None
+        self.last_error = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+
+    def is_due(self, now: float) -> bool:
+        if self.interval is not None and (self.last_started is None or now - self.last_started >= self.interval):
+            return True
+        if self.trigger is not None and (self.last_polled is None or now - self.last_polled >= self.poll_interval):
+            self.last_polled = now
+            try:
+                return bool(self.trigger())
+            except Exception as e:
+                logger.error(f"Trigger for job '{self.name}' failed: {e}")
+        return False
+
+
+class Scheduler:
+    """
+    Runs jobs on intervals or triggers with overlap prevention and a concurrency bound.
+
+    A job never overlaps itself: a run that comes due while the previous one is
+    still going (in this process, or in any other process holding the job's file
+    lock, e.g. a leftover cron entry) is skipped. At most `max_concurrent` jobs
+    run at once; due jobs wait for a free slot.
+    """
+
+    def __init__(self, max_concurrent: int = 2, tick: float = 1.0):
+        self.max_concurrent = max_concurrent
+        self.tick = tick
+        self.jobs = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="job")
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_job(self, name, func, interval=None, trigger=None, poll_interval=30.0, lock_path=None) -> Job:
+        """Registers a job; see Job for the arguments."""
+        if name in self.jobs:
+            raise ValueError(f"Job '{name}' is already scheduled")
+        job = Job(name, func, interval, trigger, poll_interval, lock_path)
+        self.jobs[name] = job
+        return job
+
+    def run_pending(self, now: float = None) -> list:
+        """
+        Starts every due job that is not already running, while slots are free.
+
+        Returns:
+            list: Names of the jobs started.
+        """
+        now = time.monotonic() if now is None else now
+        started = []
+        for job in self.jobs.values():
+            with self._lock:
+                if job.running:
+                    if job.interval is not None and now - job.last_started >= job.interval:
+                        job.skipped += 1
+                        job.last_started = now
+                        logger.warning(f"Job '{job.name}' is still running; skipping this run.")
+                    continue
+            # Take a slot before checking, so a fired trigger is never lost to a full scheduler.
+            if not self._slots.acquire(blocking=False):
+                break
+            if not job.is_due(now):
+                self._slots.release()
+                continue
+            if not job.lock.acquire():
+                self._slots.release()
+                job.skipped += 1
+                job.last_started = now
+                logger.warning(f"Job '{job.name}' is locked by another process; skipping this run.")
+                continue
+            with self._lock:
+                job.running = True
+                job.last_started = now
+            self._executor.submit(self._run_job, job)
+            started.append(job.name)
+        return started
+
+    def _run_job(self, job):
+        try:
+            with METRICS.stage(f"job:{job.name}"):
+                job.func()
+            job.runs += 1
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = e
+            METRICS.increment("job_failures_total", job=job.name)
+            logger.error(f"Job '{job.name}' failed: {e}")
+        finally:
+            job.lock.release()
+            with self._lock:
+                job.running = False
+            self._slots.release()
+
+    def run_forever(self):
+        """Checks for due jobs every `tick` seconds until stop() is called."""
+        while not self._stop.is_set():
+            self.run_pending()
+            self._stop.wait(self.tick)
+
+    def start(self):
+        """Runs the scheduler loop in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="scheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True):
+        """Stops scheduling new runs and, if `wait`, waits for running jobs to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=wait)
+
+
+class PipelineError(Exception):
+    """Raised by Pipeline.run() when a stage fails; the original error is the __cause__."""
+
+
+_DONE = object()
+
+
+class Pipeline:
+    """
+    Runs a source and a chain of stages concurrently, connected by bounded queues.
+
+    Each stage runs in its own thread(s) and hands its output to the next through
+    a queue of at most `queue_size` items. A fast stage blocks once its output
+    queue is full (backpressure), so memory stays bounded at roughly
+    queue_size items per stage while I/O-bound stages (read, write) overlap with
+    CPU-bound ones (featurize, predict). NumPy, pandas and the database drivers
+    release the GIL during their heavy work, which is what lets the threads overlap.
+
+    Stages are (name, func) or (name, func, workers) tuples; func maps one item to
+    the next stage's item. With workers > 1 the stage's output order may differ
+    from its input order. The first error stops the whole pipeline and is
+    re-raised from run().
+    """
+
+    def __init__(self, source, stages, queue_size: int = 2, source_name: str = "read"):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.source = source
+        self.source_name = source_name
+        self.stages = [stage if len(stage) == 3 else (*stage, 1) for stage in stages]
+        self.queue_size = queue_size
+        self._stop = threading.Event()
+        self._errors = []
+
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, name, error):
+        self._errors.append((name, error))
+        self._stop.set()
+
+    def _produce(self, out_queue, consumers):
+        try:
+            for item in METRICS.iter_stage(self.source_name, self.source):
+                if not self._put(out_queue, item):
+                    return
+        except Exception as e:
+            self._fail(self.source_name, e)
+        finally:
+            for _ in range(consumers):
+                self._put(out_queue, _DONE)
+
+    def _work(self, name, func, in_queue, out_queue, consumers, finished, results):
+        try:
+            while True:
+                item = self._get(in_queue)
+                if item is _DONE:
+                    break
+                with METRICS.stage(name) as record:
+                    output = func(item)
+                    if hasattr(item, "__len__"):
+                        record.rows = len(item)
+                if out_queue is None:
+                    results.append(output)
+                elif not self._put(out_queue, output):
+                    break
+        except Exception as e:
+            self._fail(name, e)
+        finally:
+            # The stage's last worker to finish tells the next stage's workers to stop.
+            with finished["lock"]:
+                finished["count"] += 1
+                last = finished["count"] == finished["workers"]
+            if last and out_queue is not None:
+                for _ in range(consumers):
+                    self._put(out_queue, _DONE)
+
+    def run(self) -> list:
+        """
+        Runs the pipeline to completion.
+
+        Returns:
+            list: The last stage's output for every item.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results = []
+        threads = [threading.Thread(target=self._produce, args=(queues[0], self.stages[0][2]),
+                                    name=f"pipeline-{self.source_name}", daemon=True)]
+        for i, (name, func, workers) in enumerate(self.stages):
+            out_queue = queues[i + 1] if i + 1 < len(self.stages) else None
+            consumers = self.stages[i + 1][2] if out_queue is not None else 0
+            finished = {"lock": threading.Lock(), "count": 0, "workers": workers}
+            for _ in range(workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(name, func, queues[i], out_queue, consumers, finished, results),
+                    name=f"pipeline-{name}", daemon=True))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            name, error = self._errors[0]
+            raise PipelineError(f"Pipeline stage '{name}' failed: {error}") from error
+        return results
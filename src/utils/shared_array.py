@@ -0,0 +1,40 @@
+# src/utils/shared_array.py
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArray:
+    """
+    A NumPy array placed in a named shared-memory block.
+
+    Only (name, shape, dtype) is pickled to worker processes, which attach to the
+    same pages instead of receiving a copy of the data.
+    """
+
+    def __init__(self, array: np.ndarray = None, shape=None, dtype=None):
+        if array is not None:
+            array = np.ascontiguousarray(array)
+            shape, dtype = array.shape, array.dtype
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        self._shm = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        self.spec = (self._shm.name, tuple(shape), dtype.str)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        if array is not None:
+            self.array[...] = array
+
+    @staticmethod
+    def attach(spec, writeable=False):
+        """Returns (array, handle) for a spec; keep the handle alive while using the array."""
+        name, shape, dtype = spec
+        shm = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        array.flags.writeable = writeable
+        return array, shm
+
+    def close(self):
+        # Drop our view first; the buffer cannot be released while it is exported.
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
@@ -0,0 +1,92 @@
+import json
+import threading
+import urllib.request
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.features import FeatureEngine
+from src.models import compile_forest
+from src.services.load_test import run_load_test
+from src.services.prediction_server import create_server
+
+
+@pytest.fixture(scope="module")
+def model():
+    rng = np.random.default_rng(0)
+    values = rng.normal(0, 4, (400, 4))
+    engine = FeatureEngine()
+    forest = RandomForestClassifier(n_estimators=10, random_state=0)
+    forest.fit(engine.compute(values), (values[:, 0] > 0).astype(int))
+    return compile_forest(forest, feature_names=engine.feature_names)
+
+
+@pytest.fixture(params=[0, 1000], ids=["uncached", "cached"])
+def server(request, model):
+    server = create_server(model, port=0, max_batch_size=32, max_wait_ms=5, cache_size=request.param)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.batcher.close()
+
+
+def _post(server, payload):
+    url = f"http://127.0.0.1:{server.server_port}/predict"
+    request = urllib.request.Request(url, data=json.dumps(payload).encode())
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def test_server_scores_single_and_batched_rows(server, model):
+    rows = [[3.6216, 8.6661, -2.8073, -0.44699], [-1.3971, 3.3191, -1.3927, -1.9948]]
+    expected = model.predict(FeatureEngine().compute(np.array(rows))).tolist()
+
+    assert _post(server, {"rows": rows})["predictions"] == expected
+    single = dict(zip(["VARIANCE", "SKEWNESS", "CURTOSIS", "ENTROPY"], rows[1]))
+    assert _post(server, single)["predictions"] == expected[1:]
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+        metrics = response.read().decode()
+    assert 'banknote_stage_seconds_count{stage="predict"}' in metrics
+
+
+def test_concurrent_requests_share_micro_batches(server):
+    report = run_load_test(f"http://127.0.0.1:{server.server_port}/predict", n_requests=200, concurrency=16)
+
+    assert report["errors"] == 0
+    assert server.batcher.rows == 200
+    assert server.batcher.batches < 200
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+
+
+def test_cached_batcher_follows_a_hot_swap_on_an_all_hit_workload(tmp_path):
+    from src.models import CompiledForest, HotSwapModel, ModelArtifactStore, PredictionCache
+    from src.services.prediction_server import MicroBatcher
+
+    def constant_forest(label):
+        # A single leaf predicting `label` for every row.
+        value = np.zeros((2, 1))
+        value[label] = 1.0
+        return CompiledForest(feature=[0], threshold=[np.inf], children=[0, 0], value=value, roots=[0],
+                              classes=np.array([0, 1]), max_depth=0, feature_names=FeatureEngine().feature_names)
+
+    store = ModelArtifactStore(root=str(tmp_path / "store"))
+    store.save(constant_forest(0))
+    hot = HotSwapModel(store, check_interval=0)
+    batcher = MicroBatcher(hot, max_wait_ms=0, cache=PredictionCache())
+    rows = np.random.default_rng(1).normal(0, 4, (5, 4))
+    try:
+        for _ in range(3):
+            assert batcher.predict(rows, timeout=5).tolist() == [0] * 5
+        store.save(constant_forest(1))
+        # Every row is cached under v0001, yet the new version is picked up.
+        assert batcher.predict(rows, timeout=5).tolist() == [1] * 5
+        assert hot.version == "v0002"
+        # A partial miss caches the new model's outputs under the new version.
+        mixed = np.vstack([rows, rows[:2] + 100])
+        assert batcher.predict(mixed, timeout=5).tolist() == [1] * 7
+    finally:
+        batcher.close()
@@ -0,0 +1,372 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from src.data import ConnectionPool, MySQLConnector, PoolTimeoutError, SnowflakeDB
+from src.data import local_backend
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "warehouse.db")
+    connection = local_backend.connect(path)
+    connection.execute("CREATE TABLE BANK_NOTE_TB (VARIANCE FLOAT, SKEWNESS FLOAT, CURTOSIS FLOAT, "
+                       "ENTROPY FLOAT, CLASS INT)")
+    connection.executemany("INSERT INTO BANK_NOTE_TB VALUES (?, ?, ?, ?, ?)",
+                           [(i * 0.5, -i * 0.25, i * 0.1, -1.5, i % 2) for i in range(100)])
+    connection.close()
+    return path
+
+
+def test_pool_reuses_connections_across_threads(db_path):
+    opened = []
+
+    def factory():
+        opened.append(local_backend.connect(db_path))
+        return opened[-1]
+
+    db = SnowflakeDB(pool=ConnectionPool(factory, min_size=1, max_size=3))
+    results = []
+
+    def worker():
+        for _ in range(20):
+            results.append(db.execute_query("SELECT COUNT(*) FROM BANK_NOTE_TB WHERE CLASS = %s", (1,))[0][0])
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [50] * 120
+    assert len(opened) <= 3
+    chunks = list(db.read_table("BANK_NOTE_TB", batch_size=30))
+    assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+    assert db.pool.idle == db.pool.size
+
+
+def test_pool_checkout_timeout_and_dead_connection_replacement(db_path):
+    pool = ConnectionPool(lambda: local_backend.connect(db_path), min_size=0, max_size=1,
+                          timeout=0.05, validate_interval=0)
+    first = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+
+    first.close()
+    pool.release(first)
+    with pool.connection() as connection:
+        assert connection is not first
+        assert connection.execute("SELECT 1").fetchone() == (1,)
+    assert pool.size == 1
+
+
+def test_closing_a_chunked_read_early_returns_its_connection(db_path):
+    db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path), max_size=1, timeout=0.05))
+    chunks = db.read_table("BANK_NOTE_TB", batch_size=10)
+    next(chunks)
+    chunks.close()
+    assert db.pool.idle == db.pool.size == 1
+    assert db.execute_query("SELECT COUNT(*) FROM BANK_NOTE_TB")[0][0] == 100
+
+
+def test_mysql_connector_context_manager_returns_wrapper(db_path):
+    connector = MySQLConnector("localhost", "user", "password", "bank_note",
+                               pool=ConnectionPool(lambda: local_backend.connect(db_path)))
+    with connector as db:
+        assert db is connector
+        rows = db.execute_query("SELECT CLASS FROM BANK_NOTE_TB LIMIT 2")
+    assert rows == [{"CLASS": 0}, {"CLASS": 1}]
+
+
+def test_mysql_stream_query_batches_and_executemany_insert(db_path):
+    connector = MySQLConnector("localhost", "user", "password", "bank_note",
+                               pool=ConnectionPool(lambda: local_backend.connect(db_path), max_size=2))
+    query = "SELECT VARIANCE, CLASS FROM BANK_NOTE_TB WHERE CLASS = %s"
+
+    batches = list(connector.stream_query(query, (1,), batch_size=20))
+    assert [len(batch) for batch in batches] == [20, 20, 10]
+    assert batches[0][0] == (0.5, 1)
+    arrays = next(connector.stream_query(query, (1,), batch_size=100, output="numpy"))
+    assert arrays["VARIANCE"].dtype == "float64" and arrays["CLASS"].sum() == 50
+
+    # Abandoning a stream part-way releases its connection.
+    stream = connector.stream_query(query, (0,), batch_size=5)
+    next(stream)
+    stream.close()
+    assert connector.pool.idle == connector.pool.size
+    connector.execute_query("CREATE TABLE COPY_TB (VARIANCE FLOAT, CLASS INT)")
+    # Streaming from one pooled connection while inserting through another.
+    chunks = connector.stream_query(query, (1,), batch_size=15, output="pandas")
+    assert connector.insert_rows("COPY_TB", chunks, batch_size=7) == 50
+    assert connector.insert_rows("COPY_TB", [(1.0, 3), (2.0, None)], columns=["VARIANCE", "CLASS"]) == 2
+    assert connector.execute_query("SELECT COUNT(*) AS N, SUM(CLASS) AS S FROM COPY_TB") == [{"N": 52, "S": 53}]
+
+    with pytest.raises(Exception, match="no such table"):
+        connector.execute_query("SELECT * FROM MISSING_TB")
+
+
+def test_arrow_read_path_projects_columns_and_slices_batches(db_path):
+    db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path)))
+
+    frames = list(db.read_table_arrow("BANK_NOTE_TB", columns=["VARIANCE", "CLASS"], batch_size=40))
+    assert [len(frame) for frame in frames] == [40, 40, 20]
+    assert list(frames[0].columns) == ["VARIANCE", "CLASS"]
+    assert frames[2]["VARIANCE"].iloc[-1] == 49.5
+
+    arrays = next(db.read_table_arrow("BANK_NOTE_TB", columns=["ENTROPY"], output="numpy"))
+    assert arrays["ENTROPY"].dtype == "float64" and len(arrays["ENTROPY"]) == 100
+
+
+def test_insert_dataframe_uses_schema_types_and_caches_tables(db_path):
+    db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path)))
+    SnowflakeDB.forget_tables()
+    scored = db.read_table("BANK_NOTE_TB", columns=["VARIANCE", "SKEWNESS", "CURTOSIS", "ENTROPY"])
+    for name in ["product_feature", "sum_feature", "ratio_feature", "complex_feature"]:
+        scored[name] = 1.5
+    scored["prediction"] = 1
+
+    assert db.insert_dataframe(scored, "BANK_NOTE_PRED") == 100
+    types = {row[1]: row[2] for row in db.execute_query("PRAGMA table_info(BANK_NOTE_PRED)")}
+    assert types["ratio_feature"] == "FLOAT" and types["prediction"] == "INT"
+
+    # The table is now cached as existing, so a drop behind our back is not noticed...
+    db.execute_query("DROP TABLE BANK_NOTE_PRED")
+    with pytest.raises(Exception, match="no such table"):
+        db.insert_dataframe(scored, "BANK_NOTE_PRED")
+    # ...until the cache is cleared.
+    SnowflakeDB.forget_tables()
+    assert db.insert_dataframe(scored.iloc[:10], "BANK_NOTE_PRED") == 10
+
+
+def test_bulk_update_and_delete_from_dataframe_run_one_set_based_statement(db_path):
+    db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path)))
+    db.execute_query("CREATE TABLE LABELS_TB AS SELECT rowid AS ID, CLASS FROM BANK_NOTE_TB")
+
+    corrections = pd.DataFrame({"ID": [1, 2, 2, 500], "CLASS": [7, 8, 9, 7]})
+    assert db.update_from_dataframe(corrections, "LABELS_TB", ["ID"]) == 2
+    assert db.execute_query("SELECT ID, CLASS FROM LABELS_TB WHERE ID <= 3 ORDER BY ID") == [(1, 7), (2, 9), (3, 0)]
+
+    assert db.delete_from_dataframe(pd.DataFrame({"ID": list(range(1, 11)) + [500]}), "LABELS_TB") == 10
+    assert db.execute_query("SELECT COUNT(*) FROM LABELS_TB") == [(90,)]
+    # Staging tables are dropped again.
+    assert db.execute_query("SELECT COUNT(*) FROM sqlite_temp_master WHERE name LIKE 'LABELS_TB_STAGE_%'") == [(0,)]
+
+    db.update_table("LABELS_TB", {"CLASS": "x'; DROP TABLE LABELS_TB; --"}, {"ID": 11})
+    db.delete_from_table("LABELS_TB", "ID = %s", (12,))
+    assert db.execute_query("SELECT CLASS FROM LABELS_TB WHERE ID IN (11, 12)") == [("x'; DROP TABLE LABELS_TB; --",)]
+
+
+def test_stage_and_copy_uploads_parquet_chunks_in_one_copy(tmp_path):
+    from src.data.bulk_loader import stage_and_copy
+
+    statements = []
+
+    class RecordingCursor:
+        def execute(self, sql, params=None):
+            statements.append(sql)
+            if sql.startswith("PUT"):
+                path = sql.split("'file://")[1].split("'")[0]
+                assert pd.read_parquet(path).shape[1] == 2
+
+        def fetchall(self):
+            return [("f", "LOADED", 4, 4), ("g", "LOADED", 3, 3)]
+
+        def close(self):
+            pass
+
+    class RecordingConnection:
+        def cursor(self):
+            return RecordingCursor()
+
+    df = pd.DataFrame({"VARIANCE": [0.5] * 10, "prediction": [1] * 10})
+    assert stage_and_copy(RecordingConnection(), df, "BANK_NOTE_PRED", chunk_rows=4, parallel=2) == 7
+    assert sum(sql.startswith("PUT") for sql in statements) == 3
+    assert [sql for sql in statements if sql.startswith("COPY")] == [statements[-1]]
+
+
+def test_incremental_scoring_resumes_from_checkpoint_without_duplicates(db_path):
+    from sklearn.dummy import DummyClassifier
+    from src.services.incremental_scoring import IncrementalScorer
+
+    db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path)))
+    SnowflakeDB.forget_tables()
+    db.execute_query("CREATE TABLE SOURCE_TB AS SELECT rowid AS ID, * FROM BANK_NOTE_TB")
+    model = DummyClassifier(strategy="constant", constant=1).fit([[0] * 8], [1])
+    scorer = IncrementalScorer(db, model, source_table="SOURCE_TB", batch_size=30)
+
+    assert scorer.run() == {"rows_read": 100, "rows_written": 100, "checkpoint": 100}
+    # A re-run only re-reads the boundary row and writes nothing.
+    assert scorer.run()["rows_written"] == 0
+
+    db.execute_query("INSERT INTO SOURCE_TB VALUES (101, 1.0, 2.0, 3.0, 4.0, 1), (102, 2.0, 3.0, 4.0, 5.0, 0)")
+    anti_joined = []
+    insert_missing = db.insert_missing
+    db.insert_missing = lambda df, *args, **kwargs: anti_joined.append(len(df)) or insert_missing(df, *args, **kwargs)
+    assert scorer.run() == {"rows_read": 3, "rows_written": 2, "checkpoint": 102}
+    # Only the re-read boundary row is checked against the target; the new rows are appended.
+    assert anti_joined == [1]
+    del db.insert_missing
+
+    # Losing the checkpoint re-scores everything but still writes no duplicates.
+    db.execute_query("DELETE FROM SCORING_CHECKPOINTS")
+    assert scorer.run()["rows_written"] == 0
+    assert db.execute_query("SELECT COUNT(*), COUNT(DISTINCT ROW_KEY) FROM BANK_NOTE_PRED") == [(102, 102)]
+
+
+def test_prediction_service_retry_after_a_failed_write_adds_no_duplicates(db_path, monkeypatch):
+    from sklearn.dummy import DummyClassifier
+    from src.services import prediction_service
+
+    db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path)))
+    SnowflakeDB.forget_tables()
+    # BANK_NOTE_TB with the warehouse-assigned ID watermark declared in models.py.
+    db.execute_query("CREATE TABLE SOURCE_COPY AS SELECT * FROM BANK_NOTE_TB")
+    db.execute_query("DROP TABLE BANK_NOTE_TB")
+    db.execute_query("CREATE TABLE BANK_NOTE_TB (ID INTEGER PRIMARY KEY AUTOINCREMENT, VARIANCE FLOAT, "
+                     "SKEWNESS FLOAT, CURTOSIS FLOAT, ENTROPY FLOAT, CLASS INT)")
+    db.execute_query("INSERT INTO BANK_NOTE_TB (VARIANCE, SKEWNESS, CURTOSIS, ENTROPY, CLASS) "
+                     "SELECT * FROM SOURCE_COPY")
+    model = DummyClassifier(strategy="constant", constant=1).fit([[0] * 8], [1])
+    # About 40 rows per chunk.
+    max_memory_mb = 40 * prediction_service.BYTES_PER_ROW / 2 ** 20
+
+    insert_missing = db.insert_missing
+    calls = []
+
+    def failing_insert(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise Exception("connection reset")
+        return insert_missing(*args, **kwargs)
+
+    monkeypatch.setattr(db, "insert_missing", failing_insert)
+    with pytest.raises(Exception, match="connection reset"):
+        prediction_service.run(db, model, max_memory_mb=max_memory_mb, metrics_path=None, incremental=True)
+    monkeypatch.setattr(db, "insert_missing", insert_missing)
+
+    # The retry resumes after the first chunk, and a further run finds nothing new.
+    assert prediction_service.run(db, model, max_memory_mb=max_memory_mb, metrics_path=None, incremental=True) == 60
+    assert prediction_service.run(db, model, max_memory_mb=max_memory_mb, metrics_path=None, incremental=True) == 0
+    assert db.execute_query("SELECT COUNT(*), COUNT(DISTINCT ROW_KEY) FROM BANK_NOTE_PRED") == [(100, 100)]
+
+    db.execute_query("INSERT INTO BANK_NOTE_TB (VARIANCE, SKEWNESS, CURTOSIS, ENTROPY, CLASS) "
+                     "VALUES (9.0, 9.0, 9.0, 9.0, 1)")
+    assert prediction_service.run(db, model, max_memory_mb=max_memory_mb, metrics_path=None, incremental=True) == 1
+
+
+def test_metrics_record_query_latency_io_and_stage_events(db_path, tmp_path):
+    from src.utils import METRICS, Metrics, SamplingProfiler
+
+    METRICS.reset()
+    db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path), max_size=1))
+    db.execute_query("SELECT COUNT(*) FROM BANK_NOTE_TB")
+    assert sum(len(chunk) for chunk in db.read_table("BANK_NOTE_TB", batch_size=40)) == 100
+    db.insert_dataframe(pd.DataFrame({"A": [1.0, 2.0]}), "METRICS_TB")
+
+    series = {(entry["metric"], tuple(entry["labels"].items())): entry for entry in METRICS.snapshot()}
+    assert series[("query_seconds", (("backend", "snowflake"),))]["count"] == 1
+    assert series[("rows_read_total", (("backend", "snowflake"),))]["value"] == 100
+    assert series[("rows_written_total", (("backend", "snowflake"),))]["value"] == 2
+    assert 'banknote_rows_read_total{backend="snowflake"} 100.0' in METRICS.to_prometheus()
+
+    events = tmp_path / "events.jsonl"
+    metrics = Metrics(event_path=str(events))
+    with SamplingProfiler(interval=0.001) as profiler:
+        with metrics.stage("featurize") as record:
+            sum(i * i for i in range(300_000))
+            record.rows = 300_000
+    event = pd.read_json(events, lines=True).iloc[0]
+    assert event["stage"] == "featurize" and event["rows_per_sec"] > 0
+    assert any(entry["metric"] == "stage_rows_per_second" for entry in metrics.snapshot())
+    assert profiler.hot_paths() and profiler.hot_paths()[0]["cumulative"] > 0
+
+
+def test_migration_plan_reads_all_schemas_once_and_combines_alters():
+    from src.data import BANKNOTE_PRED_TABLE, BANKNOTE_SOURCE_TABLE, MigrationManager
+
+    class RecordingDB:
+        def __init__(self, source_columns=tuple(BANKNOTE_SOURCE_TABLE["columns"])):
+            self.queries, self.scripts = [], []
+            self.source_columns = source_columns
+
+        def execute_query(self, query, params=None):
+            self.queries.append((query, params))
+            pred = [("BANK_NOTE_PRED", col, "NUMBER" if spec["type"] in ("INT", "BIGINT") else spec["type"], None)
+                    for col, spec in BANKNOTE_PRED_TABLE["columns"].items()
+                    if col not in ("sum_feature", "ratio_feature")]
+            pred[0] = ("BANK_NOTE_PRED", "VARIANCE", "TEXT", None)
+            # The source table matches its definition once AUTOINCREMENT is ignored.
+            source = [("BANK_NOTE_TB", col, "NUMBER" if col in ("ID", "CLASS") else "FLOAT", None)
+                      for col in self.source_columns]
+            return pred + [("BANK_NOTE_PRED", "LEGACY", "TEXT", None), ("BANK_NOTE_PRED", "OLD", "TEXT", None)] + source
+
+        def execute_script(self, statements):
+            self.scripts.append(statements)
+
+    db = RecordingDB()
+    manager = MigrationManager(db)
+    planned = manager.migrate(dry_run=True)
+
+    assert len(db.queries) == 1 and "ORIGINAL_DATA" in db.queries[0][1]
+    assert db.scripts == []
+    assert planned == [
+        "CREATE TABLE original_data (variance FLOAT, skewness FLOAT, curtosis FLOAT, entropy FLOAT, class INT)",
+        "ALTER TABLE BANK_NOTE_PRED ADD COLUMN sum_feature FLOAT, ratio_feature FLOAT",
+        "ALTER TABLE BANK_NOTE_PRED DROP COLUMN legacy, old",
+        "ALTER TABLE BANK_NOTE_PRED ALTER COLUMN variance TYPE FLOAT, COLUMN variance DROP DEFAULT",
+        "CREATE TABLE SCORING_CHECKPOINTS (SOURCE_TABLE VARCHAR, WATERMARK VARCHAR, UPDATED_AT TIMESTAMP_NTZ)",
+    ]
+
+    assert manager.migrate() == planned
+    assert db.scripts == [planned] and len(db.queries) == 2
+
+    # An existing source table without the ID watermark is not given an AUTOINCREMENT column.
+    legacy_source = RecordingDB(source_columns=("VARIANCE", "SKEWNESS", "CURTOSIS", "ENTROPY", "CLASS"))
+    assert MigrationManager(legacy_source).migrate(dry_run=True) == planned
+
+
+def test_read_csv_uses_schema_dtypes_and_a_binary_cache(tmp_path):
+    import numpy as np
+    from src.data import read_csv
+
+    frame = pd.DataFrame({"variance": [3.6, -1.4, 0.25], "skewness": [8.6, 3.3, 1.0], "curtosis": [-2.8, -1.3, 0.5],
+                          "entropy": [-0.4, -1.9, -1.5], "class": [0, 1, 1]})
+    frame.to_csv(tmp_path / "notes.csv", index=False)
+
+    parsed = read_csv("notes.csv", base_path=str(tmp_path), compact=True)
+    assert parsed["variance"].dtype == np.float32 and parsed["class"].dtype == np.int8
+    cached = read_csv("notes.csv", base_path=str(tmp_path), compact=True)
+    assert not cached["variance"].to_numpy().flags.owndata
+    assert list(cached.dtypes) == list(parsed.dtypes)
+    np.testing.assert_array_equal(cached.to_numpy(), parsed.to_numpy())
+
+    # A cache hit is writable like a miss, and writing to it leaves the cache intact.
+    cached.loc[0, "variance"] = 100.0
+    cached["class"] += 1
+    assert cached.loc[0, "variance"] == 100.0 and list(cached["class"]) == [1, 2, 2]
+    np.testing.assert_array_equal(read_csv("notes.csv", base_path=str(tmp_path), compact=True).to_numpy(),
+                                  parsed.to_numpy())
+
+    frame.iloc[:2].to_csv(tmp_path / "notes.csv", index=False)
+    assert len(read_csv("notes.csv", base_path=str(tmp_path), compact=True)) == 2
+    assert read_csv("notes.csv", base_path=str(tmp_path))["class"].dtype == np.int64
+    chunks = read_csv("notes.csv", base_path=str(tmp_path), chunksize=1)
+    assert [len(chunk) for chunk in chunks] == [1, 1]
+
+
+def test_importing_the_data_layer_loads_no_driver_or_config():
+    import os
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "from src.data import SnowflakeDB, MigrationManager\n"
+        "SnowflakeDB()\n"
+        "import src.services.prediction_service, src.models.training\n"
+        "heavy = [m for m in ('snowflake.connector', 'mysql.connector', 'yaml', 'sklearn') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=project_root)
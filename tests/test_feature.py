@@ -0,0 +1,135 @@
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.features import FeatureCreation, FeatureEngine, FeatureStore, snapshot_id
+from src.preprocessing import DataCleaning
+
+
+def _sample_frame(n_rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "VARIANCE": rng.normal(0, 3, n_rows),
+        "SKEWNESS": rng.normal(2, 6, n_rows),
+        "CURTOSIS": rng.normal(1, 4, n_rows),
+        "ENTROPY": rng.normal(-1, 2, n_rows),
+        "CLASS": rng.integers(0, 2, n_rows),
+    })
+
+
+def _chained_features(df):
+    df = FeatureCreation.add_product_feature(df)
+    df = FeatureCreation.add_sum_feature(df)
+    df = FeatureCreation.add_ratio_feature(df)
+    return FeatureCreation.add_complex_feature(df)
+
+
+def test_fused_features_match_chained_methods():
+    df = _sample_frame()
+    expected = _chained_features(df)
+    result = FeatureCreation.main_feature_creation(df)
+
+    assert list(result.columns) == list(expected.columns)
+    np.testing.assert_allclose(result.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+    assert "product_feature" not in df.columns
+
+
+def test_sum_feature_skips_missing_measurements_like_pandas():
+    df = _sample_frame(20)
+    df.loc[3, "ENTROPY"] = np.nan
+    df.loc[7, ["VARIANCE", "SKEWNESS", "CURTOSIS", "ENTROPY"]] = np.nan
+    df.loc[9, "SKEWNESS"] = np.inf
+    expected = df[["VARIANCE", "SKEWNESS", "CURTOSIS", "ENTROPY"]].sum(axis=1)
+    result = FeatureCreation.main_feature_creation(df)
+
+    np.testing.assert_array_equal(result["sum_feature"], expected)
+    assert result.loc[7, "sum_feature"] == 0.0 and np.isfinite(result.loc[3, "sum_feature"])
+    np.testing.assert_allclose(result.to_numpy(dtype=float), _chained_features(df).to_numpy(dtype=float))
+
+
+def test_inplace_mode_mutates_input():
+    df = _sample_frame(10)
+    result = FeatureCreation.main_feature_creation(df, inplace=True)
+
+    assert result is df
+    assert "complex_feature" in df.columns
+
+
+def test_compute_reuses_preallocated_block():
+    df = _sample_frame(50)
+    engine = FeatureEngine()
+    block = engine.allocate(64)
+    matrix = engine.compute(df[["VARIANCE", "SKEWNESS", "CURTOSIS", "ENTROPY"]].to_numpy(), out=block)
+
+    assert matrix.shape == (50, len(engine.feature_names))
+    assert np.shares_memory(matrix, block)
+    expected = _chained_features(df)[engine.feature_names].to_numpy()
+    np.testing.assert_allclose(matrix, expected)
+
+
+def test_random_keys_are_unique_uuid4_strings_and_compact_bytes():
+    df = _sample_frame(1000)
+    keyed = DataCleaning.add_realtime_unique_key(df)
+
+    assert "uniq_key" not in df.columns
+    assert keyed["uniq_key"].nunique() == 1000
+    assert {uuid.UUID(key).version for key in keyed["uniq_key"].head(20)} == {4}
+
+    compact = DataCleaning.add_realtime_unique_key(df, key_format="bytes")
+    assert compact["uniq_key"].nunique() == 1000
+    assert uuid.UUID(bytes=compact["uniq_key"].iloc[0]).version == 4
+
+
+def test_content_keys_match_for_duplicate_rows():
+    df = _sample_frame(100)
+    df = pd.concat([df, df.iloc[:10]], ignore_index=True)
+    keyed = DataCleaning.add_realtime_unique_key(df, mode="content", columns=["VARIANCE", "SKEWNESS"], inplace=True)
+
+    assert keyed is df
+    assert keyed["uniq_key"].dtype == np.int64
+    assert keyed["uniq_key"].duplicated().sum() == 10
+
+
+def test_feature_store_versions_memory_maps_and_appends(tmp_path):
+    store = FeatureStore(root=tmp_path)
+    raw = _sample_frame(200)
+    version = store.featurize_and_write(snapshot_id("BANK_NOTE_TB", 200), raw.iloc[:150], keep_columns=["CLASS"])
+
+    assert version.endswith(store.definition_hash)
+    arrays = store.read(version, columns=["ratio_feature"])
+    assert isinstance(arrays["ratio_feature"], np.memmap)
+
+    assert store.featurize_and_append(version, raw.iloc[150:], keep_columns=["CLASS"]) == 200
+    expected = FeatureCreation.main_feature_creation(raw)
+    frame = store.read_frame(version)
+    assert list(frame.columns) == FeatureEngine().feature_names + ["CLASS"]
+    np.testing.assert_allclose(frame["complex_feature"], expected["complex_feature"])
+
+    store.compact(version)
+    assert len(store.read_manifest(version)["segments"]) == 1
+    assert FeatureStore(root=tmp_path, engine=FeatureEngine(["sum_feature"])).definition_hash != store.definition_hash
+
+
+def test_benchmark_reports_each_stage_and_flags_regressions():
+    from benchmarks import compare_to_baseline, faster_predictor, run_benchmarks, synthetic_banknotes
+
+    synthetic = synthetic_banknotes(2000, seed=1)
+    assert list(synthetic.columns) == ["VARIANCE", "SKEWNESS", "CURTOSIS", "ENTROPY", "CLASS"]
+    assert 0.3 < synthetic["CLASS"].mean() < 0.6
+
+    report = run_benchmarks(sizes=[300], stages=["main_feature_creation", "read_csv"], repeat=1)
+    assert [(entry["stage"], entry["rows"]) for entry in report["results"]] == [
+        ("main_feature_creation", 300), ("read_csv", 300)]
+    assert compare_to_baseline(report, report) == []
+
+    faster = {"results": [dict(entry, seconds=entry["seconds"] / 10) for entry in report["results"]]}
+    regressions = compare_to_baseline(report, faster, tolerance=0.25, min_seconds=0)
+    assert {regression["metric"] for regression in regressions} == {"seconds"}
+
+    timings = {"results": [{"stage": "predict", "rows": 10, "seconds": 0.02},
+                           {"stage": "predict_compiled", "rows": 10, "seconds": 0.01},
+                           {"stage": "predict", "rows": 10_000, "seconds": 0.04},
+                           {"stage": "predict_compiled", "rows": 10_000, "seconds": 0.08},
+                           {"stage": "predict", "rows": 99, "seconds": 0.01}]}
+    assert faster_predictor(timings) == {10: "predict_compiled", 10_000: "predict"}
@@ -0,0 +1,282 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.features import FeatureCreation
+from src.models import HotSwapModel, ModelArtifactStore, PredictionCache, compile_forest
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "raw", "BankNote_Authentication.csv")
+
+
+@pytest.fixture(scope="module")
+def banknote_features():
+    df = pd.read_csv(DATA_PATH)
+    df.columns = [col.upper() for col in df.columns]
+    df_featured = FeatureCreation.main_feature_creation(df)
+    X = df_featured.drop(columns=["CLASS"])
+    y = df_featured["CLASS"]
+    return X, y
+
+
+@pytest.fixture(scope="module")
+def forest(banknote_features):
+    X, y = banknote_features
+    return RandomForestClassifier(n_estimators=25, random_state=0).fit(X, y)
+
+
+def test_compiled_forest_matches_sklearn(forest, banknote_features):
+    X, _ = banknote_features
+    noisy = X + np.random.default_rng(0).normal(0, 0.5, X.shape)
+    compiled = compile_forest(forest)
+
+    np.testing.assert_array_equal(compiled.predict(noisy), forest.predict(noisy))
+    np.testing.assert_allclose(compiled.predict_proba(noisy, block_size=97), forest.predict_proba(noisy))
+
+
+def test_compiled_forest_single_row_and_column_order(forest, banknote_features):
+    X, _ = banknote_features
+    compiled = compile_forest(forest)
+    row = X.iloc[[3]]
+
+    assert compiled.predict(row[row.columns[::-1]])[0] == forest.predict(row)[0]
+    assert compiled.predict(row.to_numpy()[0]).shape == (1,)
+
+    # Like sklearn, a width mismatch is rejected instead of reading into the next row.
+    with pytest.raises(ValueError, match="features"):
+        compiled.predict(X.to_numpy()[:, :-1])
+    with pytest.raises(ValueError, match="features"):
+        compiled.predict(np.hstack([X.to_numpy(), X.to_numpy()[:, :1]]))
+
+
+def test_artifact_store_roundtrip_and_hot_swap(tmp_path, forest, banknote_features):
+    X, _ = banknote_features
+    store = ModelArtifactStore(root=tmp_path)
+    compiled = compile_forest(forest)
+
+    v1 = store.save(compiled)
+    handle = HotSwapModel(store, check_interval=0)
+    loaded = store.load(v1)
+
+    assert not loaded.threshold.flags.writeable and not loaded.children.flags.owndata
+    assert store.load() is loaded
+    assert store.verify(v1)
+    assert store.read_manifest(v1)["feature_names"] == list(X.columns)
+    assert loaded.n_features == X.shape[1]
+    np.testing.assert_array_equal(loaded.predict(X), forest.predict(X))
+
+    v2 = store.save(compiled)
+    assert handle.version == v1
+    handle.predict(X.iloc[:1])
+    assert handle.version == v2 == store.latest_version()
+
+
+def test_load_model_prefers_the_saved_estimator_for_batch_scoring(tmp_path, forest, banknote_features):
+    from src.models import CompiledForest, load_model
+
+    X, _ = banknote_features
+    store = ModelArtifactStore(root=tmp_path)
+    compiled = compile_forest(forest)
+
+    bare = store.save(compiled)
+    assert store.load_estimator(bare) is None and isinstance(load_model(store), CompiledForest)
+
+    with_estimator = store.save(compiled, estimator=forest)
+    assert store.verify(with_estimator)
+    batch_model = load_model(store)
+    assert not isinstance(batch_model, CompiledForest) and batch_model.version == with_estimator
+    np.testing.assert_array_equal(batch_model.predict(X), forest.predict(X))
+    assert load_model(store, compiled=True) is store.load(with_estimator)
+    assert isinstance(load_model(store, version=bare), CompiledForest)
+
+
+def test_prediction_cache_serves_repeats_and_invalidates_on_new_version():
+    calls = []
+
+    def predict_fn(values):
+        calls.append(len(values))
+        return (values[:, 0] > 0).astype(int)
+
+    cache = PredictionCache(max_size=3)
+    values = np.array([[1.0, 2, 3, 4], [-1.0, 2, 3, 4], [1.0, 2, 3, 4]])
+
+    np.testing.assert_array_equal(cache.predict(values, predict_fn, "v1"), [1, 0, 1])
+    np.testing.assert_array_equal(cache.predict(values[:2], predict_fn, "v1"), [1, 0])
+    assert calls == [2]
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 3
+
+    cache.predict(np.array([[2.0, 0, 0, 0], [3.0, 0, 0, 0]]), predict_fn, "v1")
+    assert len(cache) == 3 and cache.evictions == 1
+
+    cache.predict(values, predict_fn, "v2")
+    assert calls[-1] == 2 and cache.invalidations == 1
+
+
+def test_parallel_search_reports_every_trial_and_refits_winner(banknote_features):
+    from src.models.hyperparameter_search import search
+
+    X, y = banknote_features
+    grid = {"n_estimators": [1, 10], "max_depth": [1, 6]}
+    result = search(X, y.to_numpy(), param_grid=grid, cv=3, n_jobs=2, prune_margin=0.0)
+
+    assert [trial["trial"] for trial in result["trials"]] == [0, 1, 2, 3]
+    completed = [trial for trial in result["trials"] if not trial["pruned"]]
+    assert result["best_score"] == max(trial["mean_score"] for trial in completed)
+    assert result["best_params"]["max_depth"] == 6
+    assert all(len(trial["fold_seconds"]) == len(trial["fold_scores"]) for trial in result["trials"])
+    assert list(result["model"].feature_names_in_) == list(X.columns)
+
+
+def test_parallel_scorer_matches_serial_scoring_in_input_order(tmp_path, forest, banknote_features):
+    from src.features import BASE_COLUMNS, FeatureEngine
+    from src.services.parallel_scoring import ParallelScorer
+
+    X, _ = banknote_features
+    raw = X[list(BASE_COLUMNS)]
+    raw = pd.concat([raw] * 8, ignore_index=True) + np.random.default_rng(1).normal(0, 0.2, (len(raw) * 8, 4))
+    expected = forest.predict(FeatureEngine().transform(raw)[X.columns])
+
+    with ParallelScorer(forest, n_workers=2, shard_rows=1000) as scorer:
+        out = np.full(len(raw), -1)
+        features, predictions = scorer.score(raw.to_numpy(), out=out)
+        assert predictions is out
+        np.testing.assert_array_equal(predictions, expected)
+        np.testing.assert_allclose(features, FeatureEngine().compute(raw.to_numpy()))
+        # A second batch reuses the warm workers.
+        assert (scorer.score_frame(raw.iloc[:500])["prediction"].to_numpy() == expected[:500]).all()
+
+    store = ModelArtifactStore(root=tmp_path)
+    compiled = compile_forest(forest)
+    store.save(compiled)
+    with ParallelScorer(store=store, n_workers=2, shard_rows=3000) as scorer:
+        np.testing.assert_array_equal(scorer.score(raw.to_numpy())[1], compiled.predict(features))
+
+
+def test_scoring_a_shard_detaches_from_the_shared_blocks(forest, banknote_features):
+    from src.features import BASE_COLUMNS, FeatureEngine
+    from src.services import parallel_scoring
+    from src.utils import SharedArray
+
+    X, _ = banknote_features
+    values = X[list(BASE_COLUMNS)].to_numpy()
+    parallel_scoring._init_worker(forest, None, None)
+    blocks = [SharedArray(values), SharedArray(shape=(len(FeatureEngine().feature_names), len(values)),
+                                               dtype=np.float64),
+              SharedArray(shape=(len(values),), dtype=np.int64)]
+    try:
+        assert parallel_scoring._score_shard(tuple(block.spec for block in blocks), 0, 100) == 100
+        np.testing.assert_array_equal(blocks[2].array[:100], forest.predict(X.iloc[:100]))
+        # Only the parent's own mapping of each block is left.
+        with open("/proc/self/maps") as maps:
+            mapped = maps.read()
+        assert all(mapped.count(block.spec[0]) == 1 for block in blocks)
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def test_compaction_keeps_predictions_and_picks_the_smallest_forest_in_budget(tmp_path, banknote_features):
+    from sklearn.model_selection import train_test_split
+    from src.models import compact, compact_forest
+    from src.models.compaction import save_compacted
+
+    X, y = banknote_features
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=0)
+    compiled = compile_forest(RandomForestClassifier(n_estimators=30, random_state=0).fit(X_train, y_train))
+
+    np.testing.assert_array_equal(compact_forest(compiled).predict(X_test), compiled.predict(X_test))
+    # A depth cap predicts with the class distribution of the nodes at the cap.
+    capped = compact_forest(compiled, trees=[4, 2], max_depth=3)
+    assert capped.n_trees == 2 and capped.max_depth == 3 and capped.n_nodes <= 2 * 15
+    np.testing.assert_allclose(capped.predict_proba(X_test), (
+        compact_forest(compiled, [4], 3).predict_proba(X_test) + compact_forest(compiled, [2], 3).predict_proba(X_test)
+    ) / 2)
+
+    result = compact(compiled, X_test, y_test, tolerance=0.01, depths=(None, 6, 3), tree_counts=(1, 5, 10), repeat=1)
+    assert len(result["candidates"]) == 3 * 4
+    fitting = [c for c in result["candidates"] if c["fits"]]
+    assert result["best"] == min(fitting, key=lambda c: (c["n_nodes"], c["latency_ms"]))
+    assert result["best"]["accuracy"] >= result["baseline"]["accuracy"] - 0.01
+    assert result["model"].n_nodes == result["best"]["n_nodes"] < compiled.n_nodes
+
+    store = ModelArtifactStore(root=str(tmp_path / "store"))
+    version = save_compacted(result, store, report_path=str(tmp_path / "report.json"))
+    assert store.read_manifest(version)["metadata"]["n_trees"] == result["best"]["n_trees"]
+    np.testing.assert_array_equal(store.load(version).predict(X_test), result["model"].predict(X_test))
+
+    # Without None in depths, a forest no deeper than every cap is still returned whole.
+    shallow = compact_forest(compiled, max_depth=3)
+    result = compact(shallow, X_test, y_test, depths=(6, 3), tree_counts=(1, 5), repeat=1)
+    assert len(result["candidates"]) == 1 and result["model"] is shallow
+
+
+def test_training_features_are_rebuilt_when_source_rows_change_in_place(tmp_path):
+    from src.data import ConnectionPool, SnowflakeDB, local_backend
+    from src.features import FeatureStore
+    from src.models.training import load_training_features
+
+    db_path = str(tmp_path / "warehouse.db")
+    df = pd.read_csv(DATA_PATH).head(50)
+    df.columns = [col.upper() for col in df.columns]
+    connection = local_backend.connect(db_path)
+    df.to_sql("BANK_NOTE_TB", connection, index=False)
+    connection.close()
+    db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path)))
+    feature_store = FeatureStore(root=str(tmp_path / "features"))
+    builds = []
+    featurize_and_write = feature_store.featurize_and_write
+    feature_store.featurize_and_write = lambda *args, **kwargs: builds.append(1) or featurize_and_write(*args, **kwargs)
+
+    first = load_training_features(db, feature_store)
+    load_training_features(db, feature_store)
+    assert len(builds) == 1
+
+    # Same row count, different content: a new snapshot.
+    db.execute_query("UPDATE BANK_NOTE_TB SET CLASS = 1 - CLASS WHERE rowid = 1")
+    updated = load_training_features(db, feature_store)
+    assert len(builds) == 2 and len(feature_store.list_versions()) == 2
+    assert updated["CLASS"].iloc[0] == 1 - first["CLASS"].iloc[0]
+
+    assert len(load_training_features(db, feature_store, force=True)) == 50
+    assert len(builds) == 3
+
+
+@pytest.mark.parametrize("mode", ["forest", "sgd"])
+def test_incremental_training_reads_class_sorted_table_in_chunks(tmp_path, mode):
+    from src.data import ConnectionPool, SnowflakeDB, local_backend
+    from src.models.training import train_incremental
+
+    db_path = str(tmp_path / "warehouse.db")
+    df = pd.read_csv(DATA_PATH)
+    df.columns = [col.upper() for col in df.columns]
+    df.loc[5, "ENTROPY"] = np.nan
+    connection = local_backend.connect(db_path)
+    # Stored sorted by class, as the source CSV is.
+    df.sort_values("CLASS").to_sql("BANK_NOTE_TB", connection, index=False)
+    connection.close()
+    db = SnowflakeDB(pool=ConnectionPool(lambda: local_backend.connect(db_path)))
+    store = ModelArtifactStore(root=str(tmp_path / "store"))
+
+    model, report, version = train_incremental(db, mode=mode, batch_size=300, trees_per_chunk=4, store=store,
+                                               pickle_path=str(tmp_path / "model.pickle"), trace_memory=mode == "sgd")
+
+    assert sum(entry["rows"] for entry in report) == len(df) - 1
+    assert all(entry["rows"] <= 600 and entry["rows_per_second"] > 0 for entry in report)
+    assert report[0]["accuracy_before_fit"] is None and report[-1]["accuracy_before_fit"] > 0.9
+    if mode == "sgd":
+        # Measured per chunk, not as the process-lifetime peak.
+        assert all(0 < entry["peak_memory_bytes"] < 64 * 2 ** 20 for entry in report)
+    else:
+        # Tracing is opt-in.
+        assert all(entry["peak_memory_bytes"] is None for entry in report)
+    if mode == "forest":
+        assert model.n_estimators == 4 * len(report) == store.load(version).n_trees
+    else:
+        assert version is None
+
+    if mode == "forest":
+        # Read in stored order, the first two chunks hold only class 0: the carry is not grown further.
+        with pytest.raises(Exception, match="consecutive chunks"):
+            train_incremental(db, mode=mode, batch_size=300, shuffle=False, store=store, pickle_path=None)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from src.utils import FileLock, Pipeline, PipelineError, Scheduler
+
+
+def test_pipeline_overlaps_stages_with_bounded_queues():
+    in_flight = []
+    lock = threading.Lock()
+    produced = []
+
+    def source():
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    def slow_write(item):
+        with lock:
+            # Items read but not yet written: at most one per stage plus the queues.
+            in_flight.append(len(produced) - item)
+        time.sleep(0.01)
+        return item * 10
+
+    stages = [("featurize", lambda item: item + 1), ("predict", lambda item: item - 1), ("write", slow_write)]
+    started = time.perf_counter()
+    results = Pipeline(source(), stages, queue_size=1).run()
+
+    assert results == [i * 10 for i in range(20)]
+    assert max(in_flight) <= len(stages) + 1 + len(stages) * 1
+    assert time.perf_counter() - started < 20 * 0.01 * 2
+
+
+def test_pipeline_stops_and_reraises_on_stage_failure():
+    def predict(item):
+        if item == 3:
+            raise ValueError("bad chunk")
+        return item
+
+    with pytest.raises(PipelineError, match="predict") as error:
+        Pipeline(iter(range(1000)), [("predict", predict), ("write", lambda item: item)]).run()
+    assert isinstance(error.value.__cause__, ValueError)
+
+
+def test_scheduler_prevents_overlap_and_bounds_concurrency(tmp_path):
+    release = threading.Event()
+    running = []
+
+    def job():
+        running.append(1)
+        release.wait(5)
+
+    scheduler = Scheduler(max_concurrent=1)
+    slow = scheduler.add_job("slow", job, interval=10, lock_path=str(tmp_path / "slow.lock"))
+    other = scheduler.add_job("other", job, trigger=lambda: True, poll_interval=0,
+                              lock_path=str(tmp_path / "other.lock"))
+
+    assert scheduler.run_pending(now=0) == ["slow"]
+    assert scheduler.run_pending(now=10) == []
+    assert slow.skipped == 1
+
+    external = FileLock(str(tmp_path / "other.lock"))
+    assert external.acquire()
+    release.set()
+    scheduler.stop()
+    scheduler = Scheduler(max_concurrent=2)
+    scheduler.jobs["other"] = other
+    assert scheduler.run_pending(now=20) == []
+    assert other.skipped == 1
+
+    external.release()
+    assert scheduler.run_pending(now=21) == ["other"]
+    scheduler.stop()
+    assert slow.runs == 1 and other.runs == 1